@@ -20,6 +20,7 @@
 """Control the dbus service from the command line."""
 
 import argparse
+import json
 import logging
 import os
 import subprocess
@@ -48,6 +49,10 @@ class Commands(Enum):
     RESUME = "resume"
     TOGGLE_SUSPEND = "toggle-suspend"
     HELLO = "hello"
+    STATS = "stats"
+    ENABLE_PROFILING = "enable-profiling"
+    DISABLE_PROFILING = "disable-profiling"
+    PROFILE = "profile"
     QUIT = "quit"
 
 
@@ -193,6 +198,18 @@ class InputRemapperControlBin:
         if command == Commands.HELLO.value:
             self._hello()
 
+        if command == Commands.STATS.value:
+            self._stats()
+
+        if command == Commands.ENABLE_PROFILING.value:
+            self._set_profiling(device, True)
+
+        if command == Commands.DISABLE_PROFILING.value:
+            self._set_profiling(device, False)
+
+        if command == Commands.PROFILE.value:
+            self._profile(device)
+
         if command == Commands.QUIT.value:
             self._quit()
 
@@ -200,6 +217,18 @@ class InputRemapperControlBin:
         response = self.daemon.hello("hello")
         logger.info('Daemon answered with "%s"', response)
 
+    def _stats(self):
+        stats = json.loads(self.daemon.get_stats())
+        print(json.dumps(stats, indent=2))
+
+    def _set_profiling(self, device: str, enabled: bool) -> None:
+        group = self._load_group(device)
+        self.daemon.set_profiling(group.key, enabled)
+
+    def _profile(self, device: str) -> None:
+        group = self._load_group(device)
+        print(self.daemon.get_profile(group.key))
+
     def _load_config(self, config_dir: str) -> None:
         path = os.path.abspath(
             os.path.expanduser(os.path.join(config_dir, "config.json"))
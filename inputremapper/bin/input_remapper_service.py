@@ -24,7 +24,7 @@ import sys
 from argparse import ArgumentParser
 
 from inputremapper.configs.global_config import GlobalConfig
-from inputremapper.injection.global_uinputs import GlobalUInputs, UInput
+from inputremapper.injection.global_uinputs import GlobalUInputs, RawUInput
 from inputremapper.injection.mapping_handlers.mapping_parser import MappingParser
 from inputremapper.logging.logger import logger
 
@@ -48,6 +48,21 @@ class InputRemapperServiceBin:
             help="Don't display version information",
             default=False,
         )
+        parser.add_argument(
+            "--injector-pool",
+            type=int,
+            dest="injector_pool",
+            help="Keep this many idle injector processes around, to start injecting "
+            "faster",
+            default=0,
+        )
+        parser.add_argument(
+            "--compile-macros",
+            action="store_true",
+            dest="compile_macros",
+            help="Run macros as flat programs instead of trees of tasks",
+            default=False,
+        )
 
         options = parser.parse_args(sys.argv[1:])
 
@@ -55,14 +70,24 @@ class InputRemapperServiceBin:
 
         # import input-remapper stuff after setting the log verbosity
         from inputremapper.daemon import Daemon
+        from inputremapper.injection.mapping_handlers.macro_handler import (
+            MacroHandler,
+        )
 
         if not options.hide_info:
             logger.log_info("input-remapper-service")
 
+        MacroHandler.compile_macros = options.compile_macros
+
         global_config = GlobalConfig()
-        global_uinputs = GlobalUInputs(UInput)
+        global_uinputs = GlobalUInputs(RawUInput)
         mapping_parser = MappingParser(global_uinputs)
 
-        daemon = Daemon(global_config, global_uinputs, mapping_parser)
+        daemon = Daemon(
+            global_config,
+            global_uinputs,
+            mapping_parser,
+            injector_pool_size=options.injector_pool,
+        )
         daemon.publish()
         daemon.run()
@@ -119,8 +119,15 @@ class MissingOutputAxisError(ValueError):
 class MacroError(ValueError):
     """Macro syntax errors."""
 
-    def __init__(self, symbol: Optional[str] = None, msg="Error while parsing a macro"):
+    def __init__(
+        self,
+        symbol: Optional[str] = None,
+        msg="Error while parsing a macro",
+        position: Optional[int] = None,
+    ):
         self.symbol = symbol
+        # Where in the symbol the error was found, if known
+        self.position = position
         super().__init__(msg)
 
 
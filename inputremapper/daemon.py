@@ -44,7 +44,7 @@ from inputremapper.configs.preset import Preset
 from inputremapper.groups import groups
 from inputremapper.injection.global_uinputs import GlobalUInputs
 from inputremapper.injection.injector import Injector, InjectorState
-from inputremapper.injection.macros.macro import macro_variables
+from inputremapper.injection.injector_pool import InjectorPool
 from inputremapper.injection.mapping_handlers.mapping_parser import MappingParser
 from inputremapper.logging.logger import logger
 from inputremapper.user import UserUtils
@@ -137,6 +137,12 @@ class DaemonProxy(Protocol):  # pragma: no cover
 
     def hello(self, out: str) -> str: ...
 
+    def get_stats(self) -> str: ...
+
+    def set_profiling(self, group_key: str, enabled: bool) -> None: ...
+
+    def get_profile(self, group_key: str) -> str: ...
+
     def quit(self) -> None: ...
 
 
@@ -191,6 +197,17 @@ class Daemon:
                     <arg type='s' name='out' direction='in'/>
                     <arg type='s' name='response' direction='out'/>
                 </method>
+                <method name='get_stats'>
+                    <arg type='s' name='response' direction='out'/>
+                </method>
+                <method name='set_profiling'>
+                    <arg type='s' name='group_key' direction='in'/>
+                    <arg type='b' name='enabled' direction='in'/>
+                </method>
+                <method name='get_profile'>
+                    <arg type='s' name='group_key' direction='in'/>
+                    <arg type='s' name='response' direction='out'/>
+                </method>
                 <method name='quit'>
                 </method>
             </interface>
@@ -202,8 +219,16 @@ class Daemon:
         global_config: GlobalConfig,
         global_uinputs: GlobalUInputs,
         mapping_parser: MappingParser,
+        injector_pool_size: int = 0,
     ) -> None:
-        """Constructs the daemon."""
+        """Constructs the daemon.
+
+        Parameters
+        ----------
+        injector_pool_size
+            how many idle injector processes to keep around, to start injections
+            faster
+        """
         logger.debug("Creating daemon")
 
         self.global_config = global_config
@@ -231,8 +256,10 @@ class Daemon:
 
         atexit.register(self.stop_all)
 
-        # initialize stuff that is needed alongside the daemon process
-        macro_variables.start()
+        # fork after everything is created that the injectors share with the daemon
+        self.injector_pool = InjectorPool(mapping_parser, injector_pool_size)
+        self.injector_pool.fill()
+        atexit.register(self.injector_pool.close)
 
     @classmethod
     def connect(cls, fallback: bool = True) -> Optional[DaemonProxy]:
@@ -536,6 +563,7 @@ class Daemon:
 
     def _start_injecting_internal(self, group_key: str, preset_name: str) -> bool:
         logger.info('Request to start injecting for "%s"', group_key)
+        requested_at = time.monotonic()
 
         self.refresh(group_key)
 
@@ -564,6 +592,7 @@ class Daemon:
         # The service cannot use `xmodmap -pke` because it's running via
         # systemd.
         xmodmap_path = os.path.join(self.config_dir, "xmodmap.json")
+        xmodmap = None
         try:
             with open(xmodmap_path, "r") as file:
                 # do this for each injection to make sure it is up to
@@ -598,15 +627,29 @@ class Daemon:
             # as the only gamepad they'll ever care about.
             self.global_uinputs.prepare_single(mapping.target_uinput)
 
-        if self.injectors.get(group_key) is not None:
+        injector = self.injectors.get(group_key)
+        if injector is not None and injector.get_state() == InjectorState.RUNNING:
+            # Keep the grabbed devices, this is much faster than starting over
+            if injector.replace_preset(preset, xmodmap):
+                return True
+
+        if injector is not None:
             self.stop_injecting(group_key)
 
+        injector = self.injector_pool.take(group, preset, xmodmap, requested_at)
+        if injector is not None:
+            self.injectors[group.key] = injector
+            # replace it, while the injector starts
+            self.injector_pool.fill()
+            return True
+
         try:
             injector = Injector(
                 group,
                 preset,
                 self.mapping_parser,
             )
+            injector.requested_at = requested_at
             logger.debug(
                 'Starting injector process for "%s", "%s"', group.name, preset.name
             )
@@ -617,6 +660,8 @@ class Daemon:
             # some earlier version
             return False
 
+        # New uinputs might have been created, which the idle injectors don't have
+        self.injector_pool.fill()
         return True
 
     def stop_all(self) -> None:
@@ -630,6 +675,36 @@ class Daemon:
         logger.info('Received "%s" from client', out)
         return out
 
+    def get_stats(self) -> str:
+        """Get the latency histograms of all running injections as json.
+
+        Indexed by group key, then by device hash, then by the kind of handler.
+        """
+        stats = {
+            group_key: injector.get_stats()
+            for group_key, injector in self.injectors.items()
+            if injector.get_state() == InjectorState.RUNNING
+        }
+        return json.dumps(stats)
+
+    def set_profiling(self, group_key: str, enabled: bool) -> None:
+        """Start or stop measuring how often and how long each handler is called."""
+        injector = self.injectors.get(group_key)
+        if injector is None or injector.get_state() != InjectorState.RUNNING:
+            logger.error('No injection is running for "%s"', group_key)
+            return
+
+        injector.set_profiling(enabled)
+
+    def get_profile(self, group_key: str) -> str:
+        """Get the tree of handlers, and how often and how long they were called."""
+        injector = self.injectors.get(group_key)
+        if injector is None or injector.get_state() != InjectorState.RUNNING:
+            logger.error('No injection is running for "%s"', group_key)
+            return ""
+
+        return injector.get_profile()
+
     def quit(self) -> None:
         """Stop the process."""
         # Beware, that stop_all will also be called via atexit.register(self.stop_all)
@@ -63,3 +63,10 @@ class DataManagementError(Error):
 
     def __init__(self, msg: str):
         super().__init__(msg)
+
+
+class InvalidRecording(Error):
+    """A file can not be replayed, because it is not an event recording."""
+
+    def __init__(self, msg: str):
+        super().__init__(msg)
@@ -38,6 +38,7 @@ different input-events into simple on/off events and sends them to the gui.
 
 from __future__ import annotations
 
+from typing import Optional
 
 import evdev
 from evdev.ecodes import EV_ABS
@@ -49,7 +50,7 @@ from inputremapper.input_event import InputEvent
 from inputremapper.ipc.pipe import Pipe
 from inputremapper.logging.logger import logger
 from inputremapper.injection.mapping_handlers.mapping_handler import MappingHandler
-from inputremapper.injection.mapping_handlers.abs_util import calculate_trigger_point
+from inputremapper.injection.mapping_handlers.abs_util import AbsInfoSnapshots
 
 # received by the reader-service
 CMD_TERMINATE = "terminate"
@@ -65,8 +66,13 @@ MSG_STATUS = "status"
 class ForwardToUIHandler(MappingHandler):
     """Implements the MappingHandler protocol. Sends all events into the pipe."""
 
-    def __init__(self, pipe: Pipe):
+    def __init__(
+        self,
+        pipe: Pipe,
+        absinfo_snapshots: Optional[AbsInfoSnapshots] = None,
+    ):
         self.pipe = pipe
+        self._absinfo_snapshots = absinfo_snapshots or AbsInfoSnapshots()
         self._last_event = InputEvent.from_tuple((99, 99, 99))
 
     def notify(
@@ -86,7 +92,7 @@ class ForwardToUIHandler(MappingHandler):
         # Because joysticks aren't as precise, they wiggle and their value might not be
         # centered around 0, they need special treatment
         if event.type == EV_ABS:
-            threshold, mid_point = calculate_trigger_point(
+            threshold, mid_point = self._absinfo_snapshots.get_trigger_point(
                 event,
                 DEFAULT_ABS_ANALOG_THRESHOLD_MAGNITUDE,
                 source,
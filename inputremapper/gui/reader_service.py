@@ -57,12 +57,15 @@ from inputremapper.configs.mapping import Mapping, KnownUinput
 from inputremapper.groups import _Groups, _Group
 from inputremapper.injection.event_reader import EventReader
 from inputremapper.injection.global_uinputs import GlobalUInputs
+from inputremapper.injection.latency import LatencyStats
 from inputremapper.injection.mapping_handlers.abs_to_btn_handler import AbsToBtnHandler
+from inputremapper.injection.mapping_handlers.abs_util import AbsInfoSnapshots
 from inputremapper.injection.mapping_handlers.mapping_handler import (
     NotifyCallback,
     MappingHandler,
 )
 from inputremapper.injection.mapping_handlers.rel_to_btn_handler import RelToBtnHandler
+from inputremapper.injection.tick_scheduler import TickScheduler
 from inputremapper.input_event import InputEvent
 from inputremapper.ipc.pipe import Pipe
 from inputremapper.logging.logger import logger
@@ -304,7 +307,7 @@ class ReaderService:
 
         Instead of sending the events to an uinput they will be sent to the frontend.
         """
-        context_dummy = ContextDummy()
+        context_dummy = ContextDummy(self.global_uinputs)
         # create a context for each source
         for device in sources:
             device_hash = get_device_hash(device)
@@ -318,7 +321,10 @@ class ReaderService:
                 )
                 context_dummy.add_handler(
                     input_config,
-                    ForwardToUIHandler(self._results_pipe),
+                    ForwardToUIHandler(
+                        self._results_pipe,
+                        context_dummy.absinfo_snapshots,
+                    ),
                 )
 
             for ev_code in capabilities.get(EV_ABS) or ():
@@ -338,8 +344,14 @@ class ReaderService:
                     InputCombination([input_config]),
                     mapping,
                     self.global_uinputs,
+                    context=context_dummy,
+                )
+                handler.set_sub_handler(
+                    ForwardToUIHandler(
+                        self._results_pipe,
+                        context_dummy.absinfo_snapshots,
+                    )
                 )
-                handler.set_sub_handler(ForwardToUIHandler(self._results_pipe))
                 context_dummy.add_handler(input_config, handler)
 
                 # negative direction
@@ -353,8 +365,14 @@ class ReaderService:
                     InputCombination([input_config]),
                     mapping,
                     self.global_uinputs,
+                    context=context_dummy,
+                )
+                handler.set_sub_handler(
+                    ForwardToUIHandler(
+                        self._results_pipe,
+                        context_dummy.absinfo_snapshots,
+                    )
                 )
-                handler.set_sub_handler(ForwardToUIHandler(self._results_pipe))
                 context_dummy.add_handler(input_config, handler)
 
             for ev_code in capabilities.get(EV_REL) or ():
@@ -376,8 +394,14 @@ class ReaderService:
                     InputCombination([input_config]),
                     mapping,
                     self.global_uinputs,
+                    context=context_dummy,
+                )
+                handler.set_sub_handler(
+                    ForwardToUIHandler(
+                        self._results_pipe,
+                        context_dummy.absinfo_snapshots,
+                    )
                 )
-                handler.set_sub_handler(ForwardToUIHandler(self._results_pipe))
                 context_dummy.add_handler(input_config, handler)
 
                 # negative direction
@@ -395,8 +419,14 @@ class ReaderService:
                     InputCombination([input_config]),
                     mapping,
                     self.global_uinputs,
+                    context=context_dummy,
+                )
+                handler.set_sub_handler(
+                    ForwardToUIHandler(
+                        self._results_pipe,
+                        context_dummy.absinfo_snapshots,
+                    )
                 )
-                handler.set_sub_handler(ForwardToUIHandler(self._results_pipe))
                 context_dummy.add_handler(input_config, handler)
 
         return context_dummy
@@ -410,12 +440,20 @@ class ForwardDummy(evdev.UInput):
     def write(*_):
         pass
 
+    @staticmethod
+    def syn():
+        pass
+
 
 class ContextDummy:
     """Used for the reader so that no events are actually written to any uinput."""
 
-    def __init__(self):
+    def __init__(self, global_uinputs: GlobalUInputs):
         self.listeners = set()
+        self.global_uinputs = global_uinputs
+        self.absinfo_snapshots = AbsInfoSnapshots()
+        self.latency_stats = LatencyStats()
+        self.tick_scheduler = TickScheduler(global_uinputs)
         self._notify_callbacks = defaultdict(list)
         self.forward_dummy = ForwardDummy()
 
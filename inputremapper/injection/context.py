@@ -23,11 +23,17 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import List, Dict, Set, Hashable
+from types import MappingProxyType
+from typing import List, Dict, Set, Mapping, Optional, Sequence, Tuple
 
 import evdev
 
 from inputremapper.configs.preset import Preset
+from inputremapper.injection.global_uinputs import GlobalUInputs
+from inputremapper.injection.latency import LatencyStats
+from inputremapper.injection.mapping_handlers.abs_util import AbsInfoSnapshots
+from inputremapper.injection.mapping_handlers.combination_handler import KeyStates
+from inputremapper.injection.mapping_handlers.handler_profiler import HandlerProfiler
 from inputremapper.injection.mapping_handlers.mapping_handler import (
     EventListener,
     NotifyCallback,
@@ -36,11 +42,21 @@ from inputremapper.injection.mapping_handlers.mapping_parser import (
     MappingParser,
     EventPipelines,
 )
+from inputremapper.injection.tick_scheduler import TickScheduler
 from inputremapper.input_event import InputEvent
 from inputremapper.logging.logger import logger
 from inputremapper.utils import DeviceHash
 
 
+def get_dispatch_key(origin_index: int, type_: int, code: int) -> int:
+    """Combine the index of the origin device, type and code into a single int.
+
+    Types are < 0x20 and codes are < 0x300 (see linux/input-event-codes.h), so they
+    both fit into 16 bits.
+    """
+    return (origin_index << 32) | (type_ << 16) | code
+
+
 class Context:
     """Stores injection-process wide information.
 
@@ -67,13 +83,27 @@ class Context:
         The preset holds all Mappings for the injection process
     listeners : Set[EventListener]
         A set of callbacks which receive all events
-    callbacks : Dict[Tuple[int, int], List[NotifyCallback]]
-        All entry points to the event pipeline sorted by InputEvent.type_and_code
+    global_uinputs : GlobalUInputs
+        Where the output of the handlers goes to
+    absinfo_snapshots : AbsInfoSnapshots
+        The limits of the EV_ABS axes of the source devices, read after grabbing them
+    latency_stats : LatencyStats
+        How long it takes until events are injected
+    _notify_callbacks : Mapping[int, Tuple[NotifyCallback, ...]]
+        All entry points to the event pipeline, indexed by get_dispatch_key. Built
+        once and never modified afterward.
     """
 
     listeners: Set[EventListener]
-    _notify_callbacks: Dict[Hashable, List[NotifyCallback]]
+    global_uinputs: GlobalUInputs
+    absinfo_snapshots: AbsInfoSnapshots
+    latency_stats: LatencyStats
+    tick_scheduler: TickScheduler
+    key_states: KeyStates
+    _notify_callbacks: Mapping[int, Tuple[NotifyCallback, ...]]
+    _origin_indices: Mapping[Optional[DeviceHash], int]
     _handlers: EventPipelines
+    _profiler: Optional[HandlerProfiler]
     _forward_devices: Dict[DeviceHash, evdev.UInput]
     _source_devices: Dict[DeviceHash, evdev.InputDevice]
 
@@ -91,31 +121,95 @@ class Context:
             logger.warning("source_devices not set")
 
         self.listeners = set()
+        self.global_uinputs = mapping_parser.global_uinputs
         self._source_devices = source_devices
         self._forward_devices = forward_devices
-        self._notify_callbacks = defaultdict(list)
+        self.absinfo_snapshots = AbsInfoSnapshots(source_devices)
+        self.latency_stats = LatencyStats()
+        self.tick_scheduler = TickScheduler(self.global_uinputs)
+        self.key_states = KeyStates()
         self._handlers = mapping_parser.parse_mappings(preset, self)
+        self._profiler = None
 
         self._create_callbacks()
 
     def reset(self) -> None:
         """Call the reset method for each handler in the context."""
-        for handlers in self._handlers.values():
-            for handler in handlers:
-                handler.reset()
+        with self.global_uinputs.frame():
+            for handlers in self._handlers.values():
+                for handler in handlers:
+                    handler.reset()
+
+    def set_profiling(self, enabled: bool) -> None:
+        """Start or stop counting calls of the handlers, and the time spent in them."""
+        if enabled == (self._profiler is not None):
+            return
+
+        if enabled:
+            self._profiler = HandlerProfiler(
+                handler for handlers in self._handlers.values() for handler in handlers
+            )
+            self._profiler.enable()
+        else:
+            assert self._profiler is not None
+            self._profiler.disable()
+            self._profiler = None
+
+        # The dispatch index holds on to the notify methods
+        self._create_callbacks()
+
+    def is_profiling(self) -> bool:
+        """If calls of the handlers are being counted."""
+        return self._profiler is not None
+
+    def get_profile(self) -> str:
+        """Get the tree of handlers, and how often and how long they were called."""
+        if self._profiler is None:
+            return "Profiling is not enabled"
+
+        return self._profiler.format()
 
     def _create_callbacks(self) -> None:
-        """Add the notify method from all _handlers to self.callbacks."""
+        """Compile the notify methods from all _handlers into the dispatch index."""
+        origin_indices: Dict[Optional[DeviceHash], int] = {}
+        notify_callbacks: Dict[int, List[NotifyCallback]] = defaultdict(list)
         for input_config, handler_list in self._handlers.items():
-            input_match_hash = input_config.input_match_hash
-            logger.debug("Adding NotifyCallback for %s", input_match_hash)
-            self._notify_callbacks[input_match_hash].extend(
+            origin_hash = input_config.origin_hash
+            origin_index = origin_indices.setdefault(origin_hash, len(origin_indices))
+            dispatch_key = get_dispatch_key(
+                origin_index,
+                input_config.type,
+                input_config.code,
+            )
+            logger.debug(
+                "Adding NotifyCallback for %s as %s",
+                input_config.input_match_hash,
+                hex(dispatch_key),
+            )
+            notify_callbacks[dispatch_key].extend(
                 handler.notify for handler in handler_list
             )
 
-    def get_notify_callbacks(self, input_event: InputEvent) -> List[NotifyCallback]:
-        input_match_hash = input_event.input_match_hash
-        return self._notify_callbacks[input_match_hash]
+        self._origin_indices = MappingProxyType(origin_indices)
+        self._notify_callbacks = MappingProxyType(
+            {key: tuple(callbacks) for key, callbacks in notify_callbacks.items()}
+        )
+
+    def get_notify_callbacks(
+        self,
+        input_event: InputEvent,
+    ) -> Sequence[NotifyCallback]:
+        origin_index = self._origin_indices.get(input_event.origin_hash)
+        if origin_index is None:
+            # Nothing is mapped for this device, the event will be forwarded
+            return ()
+
+        dispatch_key = get_dispatch_key(
+            origin_index,
+            input_event.type,
+            input_event.code,
+        )
+        return self._notify_callbacks.get(dispatch_key, ())
 
     def get_forward_uinput(self, origin_hash: DeviceHash) -> evdev.UInput:
         """Get the "forward" uinput events from the given origin should go into."""
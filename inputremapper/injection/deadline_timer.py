@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Timeouts that are restarted by each new event."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, Optional
+
+from inputremapper.injection.latency import LatencyOrigin, latency_origin
+
+
+class DeadlineTimer:
+    """Calls the callback once no push happened for the duration of the timeout.
+
+    Pushing the deadline forward only stores a number. The underlying TimerHandle
+    is replaced only when it fires and finds that the deadline has moved in the
+    meantime, which happens at most once per timeout. A mouse that reports 1000
+    events per second therefore doesn't create any tasks or timers per event, and
+    doesn't wake the process up between its events.
+
+    The latency of whatever the callback writes is measured from the event of the
+    most recent push, just like the timeout.
+    """
+
+    def __init__(self, timeout: float, callback: Callable[[], None]) -> None:
+        self._timeout = timeout
+        self._callback = callback
+        self._deadline = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._origin: Optional[LatencyOrigin] = None
+
+    def push(self) -> None:
+        """Start the timer, or restart the timeout if it is already running."""
+        loop = asyncio.get_running_loop()
+        self._deadline = loop.time() + self._timeout
+        self._origin = latency_origin.get()
+        if self._handle is None:
+            self._handle = loop.call_at(self._deadline, self._expire)
+
+    def cancel(self) -> None:
+        """Stop the timer without calling the callback."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        self._origin = None
+
+    def is_running(self) -> bool:
+        return self._handle is not None
+
+    def _expire(self) -> None:
+        assert self._handle is not None
+        if self._handle.when() < self._deadline:
+            # Pushed since the handle was scheduled
+            loop = asyncio.get_running_loop()
+            self._handle = loop.call_at(self._deadline, self._expire)
+            return
+
+        self._handle = None
+        token = latency_origin.set(self._origin)
+        self._origin = None
+        try:
+            self._callback()
+        finally:
+            latency_origin.reset(token)
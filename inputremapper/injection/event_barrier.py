@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Lets listeners hold events back from the mapping handlers."""
+
+import asyncio
+
+
+class EventBarrier:
+    """Keeps an event away from the mapping handlers until a listener reacted to it.
+
+    A listener returns an EventBarrier to the EventReader if it wants to react to the
+    event before the handlers get it. For example, if_single injects a modifier
+    before the key that was just pressed is mapped or forwarded, so that it can be
+    capitalized. The EventReader waits until the barrier is released.
+
+    Make sure to release every barrier that was handed to the EventReader, otherwise
+    the event will never arrive at the handlers.
+    """
+
+    def __init__(self) -> None:
+        self._released = asyncio.Event()
+
+    def release(self) -> None:
+        """Let the event continue to the handlers."""
+        self._released.set()
+
+    def release_after_this_step(self) -> None:
+        """Release the barrier once the current coroutine has to wait for something.
+
+        Anything that the caller does synchronously until then, like injecting the
+        first key of a macro, happens before the handlers see the event.
+        """
+        asyncio.get_running_loop().call_soon(self._released.set)
+
+    def is_released(self) -> bool:
+        return self._released.is_set()
+
+    async def wait(self) -> None:
+        await self._released.wait()
@@ -23,10 +23,20 @@
 import asyncio
 import os
 import traceback
-from typing import AsyncIterator, Protocol, Set, List
+from typing import AsyncIterator, Protocol, Set, List, Optional, Sequence
 
 import evdev
-
+from evdev.ecodes import EV_SYN, SYN_REPORT
+
+from inputremapper.injection.event_recording import EventRecorder
+from inputremapper.injection.global_uinputs import GlobalUInputs
+from inputremapper.injection.latency import (
+    FORWARDED,
+    LatencyOrigin,
+    LatencyStats,
+    get_handler_kind,
+    latency_origin,
+)
 from inputremapper.injection.mapping_handlers.mapping_handler import (
     EventListener,
     NotifyCallback,
@@ -35,13 +45,22 @@ from inputremapper.input_event import InputEvent
 from inputremapper.logging.logger import logger
 from inputremapper.utils import get_device_hash, DeviceHash
 
+# All events between two SYN_REPORTs, including the terminating SYN_REPORT. The
+# kernel reports changes that happened at the same time as one frame.
+EventFrame = List[evdev.InputEvent]
+
 
 class Context(Protocol):
     listeners: Set[EventListener]
+    global_uinputs: GlobalUInputs
+    latency_stats: LatencyStats
 
     def reset(self): ...
 
-    def get_notify_callbacks(self, input_event: InputEvent) -> List[NotifyCallback]: ...
+    def get_notify_callbacks(
+        self,
+        input_event: InputEvent,
+    ) -> Sequence[NotifyCallback]: ...
 
     def get_forward_uinput(self, origin_hash: DeviceHash) -> evdev.UInput: ...
 
@@ -62,6 +81,7 @@ class EventReader:
         context: Context,
         source: evdev.InputDevice,
         stop_event: asyncio.Event,
+        recorder: Optional[EventRecorder] = None,
     ) -> None:
         """Initialize all mapping_handlers
 
@@ -69,17 +89,23 @@ class EventReader:
         ----------
         source
             where to read keycodes from
+        recorder
+            if set, all frames that are read from the source are recorded
         """
         self._device_hash = get_device_hash(source)
         self._source = source
         self.context = context
         self.stop_event = stop_event
+        self._recorder = recorder
+        # The most recent frame that was handed over to the event loop
+        self._pending_frame: Optional[asyncio.Future] = None
 
     def stop(self):
         """Stop the reader."""
         self.stop_event.set()
 
-    async def read_loop(self) -> AsyncIterator[evdev.InputEvent]:
+    async def read_loop(self) -> AsyncIterator[EventFrame]:
+        """Yield frames of events, as they were reported by the kernel."""
         stop_task = asyncio.Task(self.stop_event.wait())
         loop = asyncio.get_running_loop()
         events_ready = asyncio.Event()
@@ -95,7 +121,7 @@ class EventReader:
             if fd_broken:
                 # happens when the device is unplugged while reading, causing 100% cpu
                 # usage because events_ready.set is called repeatedly forever,
-                # while read_loop will hang at self._source.read_one().
+                # while read_loop will hang at self._source.read().
                 logger.error("fd broke, was the device unplugged?")
 
             if stop_task.done() or fd_broken:
@@ -106,8 +132,44 @@ class EventReader:
                 return
 
             events_ready.clear()
-            while event := self._source.read_one():
-                yield event
+            for frame in self._split_frames(self._read_available()):
+                yield frame
+
+    def _read_available(self) -> List[evdev.InputEvent]:
+        """Drain everything that is currently buffered for the fd."""
+        events: List[evdev.InputEvent] = []
+        while True:
+            # read() fetches multiple events with a single syscall
+            try:
+                batch = list(self._source.read())
+            except BlockingIOError:
+                break
+
+            if not batch:
+                break
+
+            events.extend(batch)
+
+        return events
+
+    @staticmethod
+    def _split_frames(events: List[evdev.InputEvent]) -> List[EventFrame]:
+        """Group events into frames that end with a SYN_REPORT."""
+        frames: List[EventFrame] = []
+        frame: EventFrame = []
+        for event in events:
+            frame.append(event)
+            if event.type == EV_SYN and event.code == SYN_REPORT:
+                frames.append(frame)
+                frame = []
+
+        if frame:
+            # The kernel only wakes readers up after a SYN_REPORT, so this doesn't
+            # happen usually. Don't hold those events back until the next frame
+            # arrives though.
+            frames.append(frame)
+
+        return frames
 
     def send_to_handlers(self, event: InputEvent) -> bool:
         """Send the event to the NotifyCallbacks.
@@ -121,11 +183,20 @@ class EventReader:
             return False
 
         handled = False
-        notify_callbacks = self.context.get_notify_callbacks(event)
-
-        if notify_callbacks:
-            for notify_callback in notify_callbacks:
+        for notify_callback in self.context.get_notify_callbacks(event):
+            # Whatever the handler writes, now or later, is recorded under its name
+            token = latency_origin.set(
+                LatencyOrigin(
+                    self.context.latency_stats,
+                    self._device_hash,
+                    get_handler_kind(notify_callback),
+                    event,
+                )
+            )
+            try:
                 handled = notify_callback(event, source=self._source) | handled
+            finally:
+                latency_origin.reset(token)
 
         return handled
 
@@ -139,43 +210,113 @@ class EventReader:
 
         for listener in self.context.listeners.copy():
             # use a copy, since the listeners might remove themselves from the set
-
-            await listener(event)
-
-            # Running macros have priority, give them a head-start for processing the
-            # event.  If if_single injects a modifier, this modifier should be active
-            # before the next handler injects an "a" or something, so that it is
-            # possible to capitalize it via if_single.
-            # 1. Event from keyboard arrives (e.g. an "a")
-            # 2. the listener for if_single is called
-            # 3. if_single decides runs then (e.g. injects shift_L)
-            # 4. The original event is forwarded (or whatever it is supposed to do)
-            # 5. Capitalized "A" is injected.
-            # So make sure to call the listeners before notifying the handlers.
-            for _ in range(5):
-                await asyncio.sleep(0)
+            barrier = await listener(event)
+
+            if barrier is not None:
+                # Running macros have priority, the listener wants to react to the
+                # event before it is handled. If if_single injects a modifier, this
+                # modifier should be active before the next handler injects an "a" or
+                # something, so that it is possible to capitalize it via if_single.
+                # 1. Event from keyboard arrives (e.g. an "a")
+                # 2. the listener for if_single is called and returns a barrier
+                # 3. if_single decides runs then (e.g. injects shift_L), and releases
+                #    the barrier
+                # 4. The original event is forwarded (or whatever it is supposed to do)
+                # 5. Capitalized "A" is injected.
+                # So make sure to call the listeners before notifying the handlers.
+                await barrier.wait()
 
     def forward(self, event: InputEvent) -> None:
         """Forward an event, which injects it unmodified."""
         forward_to = self.context.get_forward_uinput(self._device_hash)
         logger.write(event, forward_to)
-        forward_to.write(*event.event_tuple)
 
-    async def handle(self, event: InputEvent) -> None:
+        if event.type == EV_SYN:
+            self.context.global_uinputs.forward(
+                forward_to,
+                (event.type, event.code, event.value),
+            )
+            return
+
+        token = latency_origin.set(
+            LatencyOrigin(
+                self.context.latency_stats,
+                self._device_hash,
+                FORWARDED,
+                event,
+            )
+        )
+        try:
+            self.context.global_uinputs.forward(
+                forward_to,
+                (event.type, event.code, event.value),
+            )
+        finally:
+            latency_origin.reset(token)
+
+    def handle_sync(self, event: InputEvent) -> None:
+        """Notify the handlers and forward the event if nobody took care of it."""
         if event.type == evdev.ecodes.EV_KEY and event.value == 2:
             # button-hold event. Environments (gnome, etc.) create them on
             # their own for the injection-fake-device if the release event
             # won't appear, no need to forward or map them.
             return
 
-        await self.send_to_listeners(event)
-
         handled = self.send_to_handlers(event)
 
         if not handled:
             # no handler took care of it, forward it
             self.forward(event)
 
+    async def handle(self, event: InputEvent) -> None:
+        if self.context.listeners and not (
+            event.type == evdev.ecodes.EV_KEY and event.value == 2
+        ):
+            await self.send_to_listeners(event)
+
+        # Not within a frame. Each event is handled on its own here, and forwarded
+        # events need the SYN_REPORTs of the source, otherwise a frame of the source
+        # would be split into one frame for each event.
+        self.handle_sync(event)
+
+    def handle_frame_sync(self, frame: List[InputEvent]) -> None:
+        """Handle all events of a frame without any asyncio round trips.
+
+        Everything that is injected as a result of it is written as a single frame.
+        """
+        with self.context.global_uinputs.frame():
+            for event in frame:
+                self.handle_sync(event)
+
+    async def handle_frame(self, frame: List[InputEvent]) -> None:
+        """Handle all events of a frame in the order in which they arrived."""
+        for event in frame:
+            await self.handle(event)
+
+    def _can_handle_synchronously(self) -> bool:
+        """If the next frame can skip the listeners and the event loop entirely.
+
+        Only macros like if_single or mod_tap register listeners. Without them, the
+        common case of plain remappings doesn't need to wait for anything. While an
+        earlier frame is still held back by listeners, the next frames are handed to
+        the event loop as well, like every frame was before. They don't wait for it
+        though, mod_tap for example needs to see its trigger being released while it
+        holds other keys back.
+        """
+        if self.context.listeners:
+            return False
+
+        return self._pending_frame is None or self._pending_frame.done()
+
+    def _record(self, frame: List[evdev.InputEvent]) -> None:
+        """Append the frame to the recording, without ever breaking the injection."""
+        assert self._recorder is not None
+        try:
+            self._recorder.record(frame)
+        except Exception as e:
+            logger.error("Stopping the recording, because it failed with %s", e)
+            self._recorder = None
+
     async def run(self):
         """Start doing things.
 
@@ -188,17 +329,27 @@ class EventReader:
             self._source.fd,
         )
 
-        async for event in self.read_loop():
+        async for frame in self.read_loop():
+            if self._recorder is not None:
+                self._record(frame)
+
             try:
+                input_events = [
+                    InputEvent.from_event(event, origin_hash=self._device_hash)
+                    for event in frame
+                ]
+
+                if self._can_handle_synchronously():
+                    self.handle_frame_sync(input_events)
+                    continue
+
                 # Fire and forget, so that handlers and listeners can take their time,
                 # if they want to wait for something special to happen.
-                asyncio.ensure_future(
-                    self.handle(
-                        InputEvent.from_event(event, origin_hash=self._device_hash)
-                    )
+                self._pending_frame = asyncio.ensure_future(
+                    self.handle_frame(input_events)
                 )
             except Exception as e:
-                logger.error("Handling event %s failed with %s", event, type(e))
+                logger.error("Handling frame %s failed with %s", frame, type(e))
                 traceback.print_exception(e)
 
         self.context.reset()
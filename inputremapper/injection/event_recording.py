@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""A compact binary format to record the events of a device and to replay them."""
+
+import struct
+from typing import BinaryIO, Iterable, List
+
+import evdev
+
+from inputremapper.exceptions import InvalidRecording
+
+MAGIC = b"IRREC\x01"
+
+# sec, usec, type, code, value. Like struct input_event, but with a fixed size and
+# byte order, so that recordings can be replayed on any machine.
+_RECORD = struct.Struct("<qIHHi")
+
+
+class EventRecorder:
+    """Appends the frames of an EventReader to a file.
+
+    Each event takes 20 bytes.
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        self._file = file
+        self._file.write(MAGIC)
+
+    def record(self, frame: Iterable[evdev.InputEvent]) -> None:
+        """Write all events of the frame with a single write."""
+        self._file.write(
+            b"".join(
+                _RECORD.pack(event.sec, event.usec, event.type, event.code, event.value)
+                for event in frame
+            )
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_recording(file: BinaryIO) -> List[evdev.InputEvent]:
+    """Read all events of a recording, in the order in which they were recorded."""
+    if file.read(len(MAGIC)) != MAGIC:
+        raise InvalidRecording("Not an input-remapper event recording")
+
+    data = file.read()
+    if len(data) % _RECORD.size != 0:
+        raise InvalidRecording("The recording is truncated")
+
+    return [
+        evdev.InputEvent(sec, usec, type_, code, value)
+        for sec, usec, type_, code, value in _RECORD.iter_unpack(data)
+    ]
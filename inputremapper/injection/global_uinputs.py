@@ -17,12 +17,28 @@
 # You should have received a copy of the GNU General Public License
 # along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Dict, Union, Tuple, Optional, List, Type
+import os
+import struct
+from contextlib import contextmanager
+from typing import (
+    Dict,
+    FrozenSet,
+    Union,
+    Tuple,
+    Optional,
+    List,
+    Type,
+    Iterator,
+    Mapping,
+    Sequence,
+)
 
 import evdev
+from evdev.ecodes import EV_SYN, SYN_REPORT
 
 import inputremapper.exceptions
 import inputremapper.utils
+from inputremapper.injection.latency import LatencyOrigin, latency_origin
 from inputremapper.logging.logger import logger
 
 MIN_ABS = -(2**15)  # -32768
@@ -59,8 +75,43 @@ DEFAULT_UINPUTS["keyboard + mouse"] = {
 }
 
 
+def _to_code_sets(capabilities: Mapping) -> Dict[int, FrozenSet[int]]:
+    """Turn a capabilities dict into frozensets of codes, for O(1) lookups.
+
+    EV_ABS capabilities may contain (code, AbsInfo) tuples, only the codes are kept.
+    """
+    return {
+        type_: frozenset(code[0] if isinstance(code, tuple) else code for code in codes)
+        for type_, codes in capabilities.items()
+    }
+
+
+# The same as DEFAULT_UINPUTS, but with frozensets of codes
+_DEFAULT_UINPUT_CODES: Dict[str, Dict[int, FrozenSet[int]]] = {
+    name: _to_code_sets(capabilities) for name, capabilities in DEFAULT_UINPUTS.items()
+}
+
+
+def _map_events_to_default_uinputs() -> Dict[Tuple[int, int], Tuple[str, ...]]:
+    """Map each (type, code) to the names of all default uinputs that can emit it."""
+    result: Dict[Tuple[int, int], Tuple[str, ...]] = {}
+    for name, code_sets in _DEFAULT_UINPUT_CODES.items():
+        for type_, codes in code_sets.items():
+            for code in codes:
+                result[(type_, code)] = (*result.get((type_, code), ()), name)
+
+    return result
+
+
+_FITTING_DEFAULT_UINPUTS = _map_events_to_default_uinputs()
+
+# struct input_event from linux/input.h. The timeval is left empty, the kernel
+# timestamps injected events itself.
+_INPUT_EVENT = struct.Struct("llHHi")
+
+
 class UInput(evdev.UInput):
-    _capabilities_cache: Optional[Dict] = None
+    _capabilities_cache: Optional[Dict[int, FrozenSet[int]]] = None
 
     def __init__(self, *args, **kwargs):
         name = kwargs["name"]
@@ -73,11 +124,67 @@ class UInput(evdev.UInput):
         Wrong events might be injected if the group mappings are wrong,
         """
         # this will never change, so we cache it since evdev runs an expensive loop to
-        # gather the capabilities. (can_emit is called regularly)
+        # gather the capabilities. (can_emit is called for each injected event)
         if self._capabilities_cache is None:
-            self._capabilities_cache = self.capabilities(absinfo=False)
+            self._capabilities_cache = _to_code_sets(self.capabilities(absinfo=False))
+
+        codes = self._capabilities_cache.get(event[0])
+        return codes is not None and event[1] in codes
+
+    def write_frame(self, events: Sequence[Tuple[int, int, int]]) -> None:
+        """Write all events, followed by a single SYN_REPORT."""
+        for event in events:
+            self.write(*event)
+
+        self.syn()
+
+
+class RawUInput(UInput):
+    """UInput that writes whole frames to its fd with a single syscall.
+
+    python-evdev needs one call for each event, plus one for the SYN_REPORT. If
+    writing to the fd directly fails, this falls back to python-evdev.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buffer = bytearray(_INPUT_EVENT.size * 16)
+        self._buffer_view = memoryview(self._buffer)
+        self._raw_writes_failed = False
+
+    def write_frame(self, events: Sequence[Tuple[int, int, int]]) -> None:
+        """Write all events, followed by a single SYN_REPORT."""
+        if self._raw_writes_failed:
+            super().write_frame(events)
+            return
+
+        size = _INPUT_EVENT.size * (len(events) + 1)
+        if size > len(self._buffer):
+            self._buffer = bytearray(size * 2)
+            self._buffer_view = memoryview(self._buffer)
+
+        offset = 0
+        for type_, code, value in events:
+            _INPUT_EVENT.pack_into(self._buffer, offset, 0, 0, type_, code, value)
+            offset += _INPUT_EVENT.size
+
+        _INPUT_EVENT.pack_into(self._buffer, offset, 0, 0, EV_SYN, SYN_REPORT, 0)
+
+        try:
+            written = os.write(self.fd, self._buffer_view[:size])
+        except OSError as error:
+            logger.error(
+                'Writing to "%s" failed with "%s", falling back to python-evdev',
+                self.name,
+                error,
+            )
+            self._raw_writes_failed = True
+            super().write_frame(events)
+            return
 
-        return event[1] in self._capabilities_cache.get(event[0], [])
+        if written < size:
+            # The kernel stopped in the middle of the frame, write the rest
+            super().write_frame(events[written // _INPUT_EVENT.size :])
 
 
 class FrontendUInput:
@@ -104,23 +211,25 @@ class GlobalUInputs:
         self.devices: Dict[str, Union[UInput, FrontendUInput]] = {}
         self._uinput_factory = uinput_factory
 
+        # See `frame`
+        self._frame_depth = 0
+        self._pending_writes: List[
+            Tuple[evdev.UInput, Tuple[int, int, int], Optional[LatencyOrigin]]
+        ] = []
+
     def __iter__(self):
         return iter(uinput for _, uinput in self.devices.items())
 
     @staticmethod
     def can_default_uinput_emit(target: str, type_: int, code: int) -> bool:
         """Check if the uinput with the target name is capable of the event."""
-        capabilities = DEFAULT_UINPUTS.get(target, {}).get(type_)
-        return capabilities is not None and code in capabilities
+        codes = _DEFAULT_UINPUT_CODES.get(target, {}).get(type_)
+        return codes is not None and code in codes
 
     @staticmethod
     def find_fitting_default_uinputs(type_: int, code: int) -> List[str]:
         """Find the names of default uinputs that are able to emit this event."""
-        return [
-            uinput
-            for uinput in DEFAULT_UINPUTS
-            if code in DEFAULT_UINPUTS[uinput].get(type_, [])
-        ]
+        return list(_FITTING_DEFAULT_UINPUTS.get((type_, code), ()))
 
     def reset(self):
         self.devices = {}
@@ -169,7 +278,106 @@ class GlobalUInputs:
         assert not isinstance(event[2], bool) and isinstance(event[2], int)
 
         logger.write(event, uinput)
-        uinput.write(*event)
+
+        origin = latency_origin.get()
+        if self._frame_depth > 0:
+            self._pending_writes.append((uinput, event, origin))
+            return
+
+        self._write_frame(uinput, (event,))
+        if origin is not None:
+            origin.record()
+
+    def forward(
+        self,
+        uinput: evdev.UInput,
+        event: Tuple[int, int, int],
+        sync: bool = False,
+    ) -> None:
+        """Write an event that is passed through unmodified, like from the reader.
+
+        The SYN_REPORTs of the source device are usually forwarded as well, so
+        nothing is synced unless `sync` is True. Within a frame, the frame takes care
+        of it.
+        """
+        origin = latency_origin.get()
+        if self._frame_depth == 0:
+            uinput.write(*event)
+            if sync:
+                uinput.syn()
+            if origin is not None:
+                origin.record()
+            return
+
+        if event[0] == EV_SYN and event[1] == SYN_REPORT:
+            # The frame ends with a SYN_REPORT anyway
+            return
+
+        self._pending_writes.append((uinput, event, origin))
+
+    @contextmanager
+    def frame(self) -> Iterator[None]:
+        """Collect all writes, and write them together once the block ends.
+
+        Each uinput gets one SYN_REPORT at the end, so that for example diagonal
+        mouse movements or both kinds of wheel events arrive at the same time. If
+        writes to different uinputs alternate, they are synced in between to keep
+        their order.
+        Frames can be nested, the outermost frame writes everything.
+
+        Don't await anything inside the block. Everything that is written in the
+        meantime, from anywhere, would be delayed.
+
+        The latency of the events that caused the writes is recorded once everything
+        is written.
+        """
+        self._frame_depth += 1
+        try:
+            yield
+        finally:
+            self._frame_depth -= 1
+            if self._frame_depth == 0:
+                self._flush()
+
+    def _flush(self) -> None:
+        """Write all pending events, in the order in which they were written."""
+        if not self._pending_writes:
+            return
+
+        pending_writes = self._pending_writes
+        self._pending_writes = []
+
+        # Sync before switching to another uinput, otherwise the events of this
+        # uinput would appear after the ones of the other uinput.
+        run_uinput = pending_writes[0][0]
+        run: List[Tuple[int, int, int]] = []
+        for uinput, event, _ in pending_writes:
+            if uinput is not run_uinput:
+                self._write_frame(run_uinput, run)
+                run_uinput = uinput
+                run = []
+
+            run.append(event)
+
+        self._write_frame(run_uinput, run)
+
+        for _, _, origin in pending_writes:
+            if origin is not None:
+                origin.record()
+
+    @staticmethod
+    def _write_frame(
+        uinput: evdev.UInput,
+        events: Sequence[Tuple[int, int, int]],
+    ) -> None:
+        if isinstance(uinput, UInput):
+            uinput.write_frame(events)
+            return
+
+        # For example the forwarding uinputs
+        for event in events:
+            uinput.write(*event)
+
         uinput.syn()
 
     def get_uinput(self, name: str) -> Optional[evdev.UInput]:
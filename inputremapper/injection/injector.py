@@ -24,16 +24,20 @@ from __future__ import annotations
 import asyncio
 import enum
 import multiprocessing
+import signal
 import sys
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from multiprocessing.connection import Connection
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import evdev
 
 from inputremapper.configs.input_config import InputCombination, InputConfig
+from inputremapper.configs.keyboard_layout import keyboard_layout
+from inputremapper.configs.mapping import Mapping
 from inputremapper.configs.preset import Preset
 from inputremapper.groups import (
     _Group,
@@ -56,6 +60,12 @@ DEV_NAME = "input-remapper"
 # messages sent to the injector process
 class InjectorCommand(str, enum.Enum):
     CLOSE = "CLOSE"
+    STATS = "STATS"
+    ENABLE_PROFILING = "ENABLE_PROFILING"
+    DISABLE_PROFILING = "DISABLE_PROFILING"
+    PROFILE = "PROFILE"
+    REPLACE_PRESET = "REPLACE_PRESET"
+    START = "START"
 
 
 # messages the injector process reports back to the service
@@ -108,6 +118,36 @@ def get_forward_phys(source: evdev.InputDevice) -> str:
     return DEV_NAME
 
 
+def dump_preset(preset: Preset) -> List[Dict]:
+    """Turn the mappings into dicts, to send them to the injection process."""
+    mappings = []
+    for mapping in preset:
+        mapping_dict = mapping.dict(exclude_defaults=True)
+        mapping_dict["input_combination"] = mapping.input_combination.to_config()
+        mappings.append(mapping_dict)
+
+    return mappings
+
+
+def load_preset(mappings: List[Dict], xmodmap: Optional[Dict]) -> Preset:
+    """Create a preset from the result of dump_preset.
+
+    Parameters
+    ----------
+    xmodmap
+        symbols of the users keyboard layout, if they changed since the
+        process was started
+    """
+    if xmodmap is not None:
+        keyboard_layout.update(xmodmap)
+
+    preset: Preset = Preset()
+    for mapping_dict in mappings:
+        preset.add(Mapping(**mapping_dict))
+
+    return preset
+
+
 @dataclass(frozen=True)
 class InjectorStateMessage:
     message_type = MessageType.injector_state
@@ -132,10 +172,17 @@ class Injector(multiprocessing.Process):
     preset: Preset
     context: Optional[Context]
     _devices: List[evdev.InputDevice]
+    _sources: Dict[DeviceHash, evdev.InputDevice]
+    _forward_devices: Dict[DeviceHash, evdev.UInput]
     _state: InjectorState
     _msg_pipe: Tuple[Connection, Connection]
     _event_readers: List[EventReader]
     _stop_event: asyncio.Event
+    # If it waits in the InjectorPool for a group and a preset
+    _idle: bool
+    # time.monotonic() of when the injection was requested, to log how long it took
+    # until it was running
+    requested_at: Optional[float]
 
     regrab_timeout = 0.2
 
@@ -164,9 +211,22 @@ class Injector(multiprocessing.Process):
         self.context = None  # only needed inside the injection process
 
         self._event_readers = []
+        self._idle = False
+        self.requested_at = None
 
         super().__init__(name=group.key)
 
+    @classmethod
+    def create_idle(cls, mapping_parser: MappingParser) -> Injector:
+        """Create an injector that waits for assign to be called once it is started.
+
+        Used by the InjectorPool.
+        """
+        group = _Group(paths=[], names=["idle"], types=[], key="idle")
+        injector = cls(group, Preset(), mapping_parser)
+        injector._idle = True
+        return injector
+
     """Functions to interact with the running process."""
 
     def get_state(self) -> InjectorState:
@@ -177,7 +237,10 @@ class Injector(multiprocessing.Process):
         # before we try to we try to guess anything lets check if there is a message
         state = self._state
         while self._msg_pipe[1].poll():
-            state = self._msg_pipe[1].recv()
+            msg = self._msg_pipe[1].recv()
+            if isinstance(msg, InjectorState):
+                # Otherwise, it is a late answer to get_stats
+                state = msg
 
         # figure out what is going on step by step
         alive = self.is_alive()
@@ -205,6 +268,109 @@ class Injector(multiprocessing.Process):
         self._state = state
         return self._state
 
+    def _request(
+        self,
+        command: InjectorCommand,
+        *args: Any,
+        timeout: float = 1,
+    ) -> Any:
+        """Send the command to the injection process and wait for its answer.
+
+        Returns None if the process didn't answer.
+        """
+        if not self.is_alive():
+            return None
+
+        self._msg_pipe[1].send((command, *args) if args else command)
+
+        deadline = time.time() + timeout
+        while self._msg_pipe[1].poll(max(0.0, deadline - time.time())):
+            msg = self._msg_pipe[1].recv()
+            if isinstance(msg, InjectorState):
+                self._state = msg
+                continue
+
+            return msg
+
+        logger.error('The injector for "%s" did not answer %s', self.group.key, command)
+        return None
+
+    def get_stats(self) -> Dict:
+        """Ask the injection process for its latency histograms.
+
+        Can be safely called from the main process.
+        """
+        return self._request(InjectorCommand.STATS) or {}
+
+    def set_profiling(self, enabled: bool) -> None:
+        """Start or stop measuring the handlers of the injection process.
+
+        Can be safely called from the main process.
+        """
+        if enabled:
+            self._request(InjectorCommand.ENABLE_PROFILING)
+        else:
+            self._request(InjectorCommand.DISABLE_PROFILING)
+
+    def get_profile(self) -> str:
+        """Get the tree of handlers, and how often and how long they were called.
+
+        Can be safely called from the main process.
+        """
+        return self._request(InjectorCommand.PROFILE) or ""
+
+    def assign(
+        self,
+        group: _Group,
+        preset: Preset,
+        xmodmap: Optional[Dict] = None,
+    ) -> None:
+        """Tell an injector from create_idle what to inject.
+
+        Can be safely called from the main process.
+        """
+        assert self._idle
+        self._idle = False
+        self.group = group
+        self.preset = preset
+        self.name = group.key
+        self._msg_pipe[1].send(
+            (
+                InjectorCommand.START,
+                group.dumps(),
+                dump_preset(preset),
+                xmodmap,
+                self.requested_at,
+            )
+        )
+
+    def replace_preset(self, preset: Preset, xmodmap: Optional[Dict] = None) -> bool:
+        """Make the running injection use a different preset.
+
+        The devices stay grabbed. Returns False if the injection process can't use
+        the preset with its devices, in which case it continues with the old one.
+
+        Can be safely called from the main process.
+
+        Parameters
+        ----------
+        xmodmap
+            symbols of the users keyboard layout, if they changed since the
+            injection was started
+        """
+        # Parsing a large preset may take a moment
+        answer = self._request(
+            InjectorCommand.REPLACE_PRESET,
+            dump_preset(preset),
+            xmodmap,
+            timeout=5,
+        )
+        if not answer:
+            return False
+
+        self.preset = preset
+        return True
+
     @ensure_numlock
     def stop_injecting(self) -> None:
         """Stop injecting keycodes.
@@ -267,8 +433,8 @@ class Injector(multiprocessing.Process):
         logger.error(f"Could not find input for {input_config}")
         return None
 
-    def _grab_devices(self) -> Dict[DeviceHash, evdev.InputDevice]:
-        """Grab all InputDevices that match a mappings' origin_hash."""
+    def _find_needed_devices(self) -> List[evdev.InputDevice]:
+        """Find all InputDevices that match a mappings' origin_hash."""
         # use a dict because the InputDevice is not directly hashable
         needed_devices = {}
         input_configs = set()
@@ -286,12 +452,47 @@ class Injector(multiprocessing.Process):
                 continue
             needed_devices[device.path] = device
 
-        grabbed_devices = {}
-        for device in needed_devices.values():
-            if device := self._grab_device(device):
-                grabbed_devices[get_device_hash(device)] = device
+        return list(needed_devices.values())
+
+    def _prepare_devices(
+        self,
+    ) -> Tuple[Dict[DeviceHash, evdev.InputDevice], Dict[DeviceHash, evdev.UInput]]:
+        """Grab all needed InputDevices and create their forwarding devices.
+
+        Each device is handled in its own thread, so that a device that is busy
+        doesn't delay the others.
+        """
+        devices = self._find_needed_devices()
+        sources = {}
+        forward_devices = {}
+        with ThreadPoolExecutor(max_workers=max(len(devices), 1)) as executor:
+            for prepared in executor.map(self._prepare_device, devices):
+                if prepared is None:
+                    continue
+
+                source, forward_to = prepared
+                device_hash = get_device_hash(source)
+                sources[device_hash] = source
+                forward_devices[device_hash] = forward_to
 
-        return grabbed_devices
+        return sources, forward_devices
+
+    def _prepare_device(
+        self,
+        device: evdev.InputDevice,
+    ) -> Optional[Tuple[evdev.InputDevice, evdev.UInput]]:
+        """Grab the device and create its forwarding device."""
+        if self._grab_device(device) is None:
+            return None
+
+        start = time.monotonic()
+        forward_to = self._create_forwarding_device(device)
+        logger.debug(
+            "Created the forwarding device for %s in %.1fms",
+            device.path,
+            (time.monotonic() - start) * 1000,
+        )
+        return device, forward_to
 
     def _update_preset(self):
         """Update all InputConfigs in the preset to include correct origin_hash
@@ -322,22 +523,31 @@ class Injector(multiprocessing.Process):
         Without grab, original events from it would reach the display server
         even though they are mapped.
         """
-        error = None
-        for attempt in range(10):
+        # If it was grabbed by a previous injection, it might take a little time
+        # until the device is free. Retry quickly at first, and then less often.
+        start = time.monotonic()
+        deadline = start + self.regrab_timeout * 10
+        delay = self.regrab_timeout / 8
+        attempt = 0
+        while True:
+            attempt += 1
             try:
                 device.grab()
-                logger.debug("Grab %s", device.path)
+                logger.debug(
+                    "Grab %s after %.1fms",
+                    device.path,
+                    (time.monotonic() - start) * 1000,
+                )
                 return device
-            except IOError as err:
-                # it might take a little time until the device is free if
-                # it was previously grabbed.
-                error = err
-                logger.debug("Failed attempts to grab %s: %d", device.path, attempt + 1)
-                time.sleep(self.regrab_timeout)
-
-        logger.error("Cannot grab %s, it is possibly in use", device.path)
-        logger.error(str(error))
-        return None
+            except IOError as error:
+                logger.debug("Failed attempts to grab %s: %d", device.path, attempt)
+                if time.monotonic() + delay > deadline:
+                    logger.error("Cannot grab %s, it is possibly in use", device.path)
+                    logger.error(str(error))
+                    return None
+
+            time.sleep(delay)
+            delay = min(delay * 2, self.regrab_timeout)
 
     @staticmethod
     def _copy_capabilities(input_device: evdev.InputDevice) -> CapabilitiesDict:
@@ -372,10 +582,121 @@ class Injector(multiprocessing.Process):
             frame_available.clear()
             msg = self._msg_pipe[0].recv()
 
+            args = ()
+            if isinstance(msg, tuple):
+                msg, *args = msg
+
             if msg == InjectorCommand.CLOSE:
                 await self._close()
                 return
 
+            assert self.context is not None
+
+            if msg == InjectorCommand.STATS:
+                self._msg_pipe[0].send(self.context.latency_stats.to_dict())
+
+            if msg == InjectorCommand.ENABLE_PROFILING:
+                self.context.set_profiling(True)
+                self._msg_pipe[0].send(True)
+
+            if msg == InjectorCommand.DISABLE_PROFILING:
+                self.context.set_profiling(False)
+                self._msg_pipe[0].send(True)
+
+            if msg == InjectorCommand.PROFILE:
+                self._msg_pipe[0].send(self.context.get_profile())
+
+            if msg == InjectorCommand.REPLACE_PRESET:
+                self._msg_pipe[0].send(self._replace_preset(*args))
+
+    def _replace_preset(self, mappings: List[Dict], xmodmap: Optional[Dict]) -> bool:
+        """Swap the Context for one of the new preset, keeping the devices.
+
+        This runs between two frames, because the event loop is busy with it.
+        """
+        assert self.context is not None
+        try:
+            preset = load_preset(mappings, xmodmap)
+        except Exception as e:
+            logger.error("Can't replace the preset, loading it failed with %s", e)
+            return False
+
+        old_preset = self.preset
+        self.preset = preset
+        self._update_preset()
+
+        for device in self._find_needed_devices():
+            if get_device_hash(device) not in self._sources:
+                logger.info(
+                    '"%s" is not grabbed, can\'t replace the preset', device.path
+                )
+                self.preset = old_preset
+                return False
+
+        global_uinputs = self.mapping_parser.global_uinputs
+        for mapping in preset:
+            if mapping.target_uinput not in global_uinputs.devices:
+                logger.info(
+                    '"%s" does not exist, can\'t replace the preset',
+                    mapping.target_uinput,
+                )
+                self.preset = old_preset
+                return False
+
+        try:
+            context = Context(
+                preset,
+                self._sources,
+                self._forward_devices,
+                self.mapping_parser,
+            )
+        except Exception as e:
+            logger.error("Can't replace the preset, parsing it failed with %s", e)
+            self.preset = old_preset
+            return False
+
+        context.latency_stats = self.context.latency_stats
+        context.set_profiling(self.context.is_profiling())
+
+        # Release everything that the old preset is holding down
+        self.context.reset()
+
+        for event_reader in self._event_readers:
+            event_reader.context = context
+
+        self.context = context
+        logger.info('Replaced the preset for "%s"', self.group.key)
+        return True
+
+    def _wait_for_assignment(self) -> bool:
+        """Wait for the group and the preset, while being idle in the InjectorPool.
+
+        Returns False if the pool is closed instead.
+        """
+        try:
+            msg = self._msg_pipe[0].recv()
+        except EOFError:
+            # The daemon is gone
+            return False
+
+        if not isinstance(msg, tuple) or msg[0] != InjectorCommand.START:
+            logger.debug("Idle injector received %s", msg)
+            return False
+
+        _, group, mappings, xmodmap, self.requested_at = msg
+        self.group = _Group.loads(group)
+        self.preset = load_preset(mappings, xmodmap)
+        return True
+
+    def _log_profile(self) -> None:
+        """Log the tree of handlers, and how often and how long they were called."""
+        assert self.context is not None
+        logger.info(
+            'Profile of "%s":\n%s',
+            self.group.key,
+            self.context.get_profile(),
+        )
+
     async def _close(self):
         logger.debug("Received close signal")
         self._stop_event.set()
@@ -431,6 +752,9 @@ class Injector(multiprocessing.Process):
         Use this function as starting point in a process. It creates
         the loops needed to read and map events and keeps running them.
         """
+        if self._idle and not self._wait_for_assignment():
+            return
+
         logger.info('Starting injecting the preset for "%s"', self.group.key)
 
         # create a new event loop, because somehow running an infinite loop
@@ -440,18 +764,22 @@ class Injector(multiprocessing.Process):
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
 
+        start = time.monotonic()
         self._devices = self.group.get_devices()
 
         # InputConfigs may not contain the origin_hash information, this will try to
         # make a good guess if the origin_hash information is missing or invalid.
         self._update_preset()
+        found_devices = time.monotonic()
 
         # grab devices as early as possible. If events appear that won't get
         # released anymore before the grab they appear to be held down forever
-        sources = self._grab_devices()
-        forward_devices = {}
-        for device_hash, device in sources.items():
-            forward_devices[device_hash] = self._create_forwarding_device(device)
+        sources, forward_devices = self._prepare_devices()
+        prepared_devices = time.monotonic()
+
+        # keep them for when the preset is replaced
+        self._sources = sources
+        self._forward_devices = forward_devices
 
         # create this within the process after the event loop creation,
         # so that the macros use the correct loop
@@ -462,6 +790,14 @@ class Injector(multiprocessing.Process):
             self.mapping_parser,
         )
         self._stop_event = asyncio.Event()
+        logger.debug(
+            'Startup of "%s": %.1fms to find devices, %.1fms to grab them, '
+            "%.1fms to parse the preset",
+            self.group.key,
+            (found_devices - start) * 1000,
+            (prepared_devices - found_devices) * 1000,
+            (time.monotonic() - prepared_devices) * 1000,
+        )
 
         if len(sources) == 0:
             # maybe the preset was empty or something
@@ -484,12 +820,22 @@ class Injector(multiprocessing.Process):
 
         coroutines.append(self._msg_listener())
 
+        # `kill -USR1 <pid>` logs the profile, if profiling was enabled
+        loop.add_signal_handler(signal.SIGUSR1, self._log_profile)
+
         # set the numlock state to what it was before injecting, because
         # grabbing devices screws this up
         set_numlock(numlock_state)
 
         self._msg_pipe[0].send(InjectorState.RUNNING)
 
+        if self.requested_at is not None:
+            logger.info(
+                'Injecting for "%s" %.1fms after it was requested',
+                self.group.key,
+                (time.monotonic() - self.requested_at) * 1000,
+            )
+
         try:
             loop.run_until_complete(asyncio.gather(*coroutines))
         except RuntimeError as error:
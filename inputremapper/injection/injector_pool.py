@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Injector processes that are started before anyone asks for them."""
+
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from inputremapper.configs.preset import Preset
+from inputremapper.groups import _Group
+from inputremapper.injection.injector import Injector
+from inputremapper.injection.mapping_handlers.mapping_parser import MappingParser
+from inputremapper.logging.logger import logger
+
+
+class InjectorPool:
+    """Keeps idle injector processes around, to start injections faster.
+
+    They are forked from the daemon, after everything they need was imported. When
+    an injection is requested, the group and the preset are sent to one of them.
+
+    An idle injector only has the uinputs that existed when it was forked, so it
+    can't be used for presets that need other ones. The common ones are therefore
+    created before forking. The gamepad isn't, because some apps only care about
+    the first gamepad they find, so it is only created for presets that need it.
+    """
+
+    prepared_uinputs = ("keyboard", "mouse", "keyboard + mouse")
+
+    # The injectors, and the names of the global uinputs they have
+    _idle: List[Tuple[Injector, FrozenSet[str]]]
+
+    def __init__(self, mapping_parser: MappingParser, size: int = 0) -> None:
+        """
+
+        Parameters
+        ----------
+        size
+            how many idle injectors to keep around. 0 disables the pool.
+        """
+        self.mapping_parser = mapping_parser
+        self.size = size
+        self._idle = []
+
+    def _get_uinputs(self) -> FrozenSet[str]:
+        return frozenset(self.mapping_parser.global_uinputs.devices)
+
+    def fill(self) -> None:
+        """Start idle injectors until there are enough of them.
+
+        Idle injectors that don't have all current global uinputs are replaced.
+        """
+        if self.size > 0:
+            global_uinputs = self.mapping_parser.global_uinputs
+            for name in self.prepared_uinputs:
+                if name not in global_uinputs.devices:
+                    global_uinputs.prepare_single(name)
+
+        uinputs = self._get_uinputs()
+        for injector, injector_uinputs in self._idle.copy():
+            if injector_uinputs != uinputs or not injector.is_alive():
+                injector.stop_injecting()
+                self._idle.remove((injector, injector_uinputs))
+
+        while len(self._idle) < self.size:
+            injector = Injector.create_idle(self.mapping_parser)
+            injector.start()
+            self._idle.append((injector, uinputs))
+
+    def take(
+        self,
+        group: _Group,
+        preset: Preset,
+        xmodmap: Optional[Dict] = None,
+        requested_at: Optional[float] = None,
+    ) -> Optional[Injector]:
+        """Get a started injector for the group and preset.
+
+        Returns None if no idle injector can inject the preset.
+        """
+        target_uinputs = {mapping.target_uinput for mapping in preset}
+        for injector, injector_uinputs in self._idle:
+            if not injector.is_alive() or not target_uinputs <= injector_uinputs:
+                continue
+
+            self._idle.remove((injector, injector_uinputs))
+            injector.requested_at = requested_at
+            injector.assign(group, preset, xmodmap)
+            logger.debug('Using an idle injector for "%s"', group.key)
+            return injector
+
+        return None
+
+    def close(self) -> None:
+        """Stop all idle injectors."""
+        for injector, _ in self._idle:
+            injector.stop_injecting()
+
+        self._idle = []
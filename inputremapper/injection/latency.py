@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Histograms of how long it takes from the kernel reporting an event to injecting it."""
+
+from __future__ import annotations  # needed for the TYPE_CHECKING import
+
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+from inputremapper.input_event import InputEvent
+from inputremapper.utils import DeviceHash
+
+if TYPE_CHECKING:
+    # Imports the GlobalUInputs, which need the LatencyOrigin
+    from inputremapper.injection.mapping_handlers.mapping_handler import (
+        NotifyCallback,
+    )
+
+FORWARDED = "forwarded"
+
+# Bucket i counts latencies below 2**i µs, the last one everything above ~1s
+NUM_BUCKETS = 22
+
+
+class LatencyHistogram:
+    """Counts latencies in buckets that double in size.
+
+    Adding a latency only increments a counter, there is nothing to lock, since each
+    injection runs in its own single-threaded process.
+    """
+
+    __slots__ = ("counts", "max")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * NUM_BUCKETS
+        self.max = 0.0
+
+    def add(self, latency: float) -> None:
+        """Add a latency in seconds."""
+        # Clock adjustments can make it negative, those end up in the first bucket.
+        microseconds = max(0, int(latency * 1000000))
+        self.counts[min(microseconds.bit_length(), NUM_BUCKETS - 1)] += 1
+        if latency > self.max:
+            self.max = latency
+
+    def percentile(self, percent: float) -> int:
+        """The upper limit in µs of the bucket that contains the percentile."""
+        remaining = sum(self.counts) * percent
+        for index, count in enumerate(self.counts):
+            remaining -= count
+            if remaining <= 0:
+                return 2**index
+
+        return 2 ** (NUM_BUCKETS - 1)
+
+    def to_dict(self) -> Dict[str, Union[int, List[int]]]:
+        return {
+            "count": sum(self.counts),
+            "p50_us": self.percentile(0.5),
+            "p99_us": self.percentile(0.99),
+            "max_us": round(self.max * 1000000),
+            "buckets": list(self.counts),
+        }
+
+
+class LatencyStats:
+    """Latency histograms for each source device and each kind of handler.
+
+    Compares the timestamp of an event with the time at which it was written to a
+    uinput. evdev timestamps use the realtime clock, unless something asked for
+    another clock, so time.time is used as well.
+    """
+
+    def __init__(self) -> None:
+        self._histograms: Dict[Tuple[DeviceHash, str], LatencyHistogram] = {}
+
+    def record(self, device_hash: DeviceHash, kind: str, event: InputEvent) -> None:
+        """Record that the event was injected just now."""
+        if event.sec == 0:
+            # Doesn't come from the kernel
+            return
+
+        key = (device_hash, kind)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = LatencyHistogram()
+
+        histogram.add(time.time() - event.sec - event.usec / 1000000)
+
+    def to_dict(self) -> Dict[str, Dict[str, Dict]]:
+        """Get all histograms, for example to send them to another process."""
+        result: Dict[str, Dict[str, Dict]] = {}
+        for (device_hash, kind), histogram in self._histograms.items():
+            result.setdefault(device_hash, {})[kind] = histogram.to_dict()
+
+        return result
+
+
+class LatencyOrigin:
+    """The event that caused whatever is written to a uinput right now.
+
+    Only the first write that it causes is recorded, which is the latency that one
+    feels. Macros or joysticks that keep writing afterwards don't add anything.
+    """
+
+    __slots__ = ("_stats", "_device_hash", "_kind", "_event", "_recorded")
+
+    def __init__(
+        self,
+        stats: LatencyStats,
+        device_hash: DeviceHash,
+        kind: str,
+        event: InputEvent,
+    ) -> None:
+        self._stats = stats
+        self._device_hash = device_hash
+        self._kind = kind
+        self._event = event
+        self._recorded = False
+
+    def record(self) -> None:
+        """Record that something caused by the event was just written to a uinput."""
+        if self._recorded:
+            return
+
+        self._recorded = True
+        self._stats.record(self._device_hash, self._kind, self._event)
+
+
+# Set by the EventReader while an event is handled. asyncio tasks copy it when they
+# are created, so macros or handlers that inject later on still know where their
+# output came from. The GlobalUInputs record it once they wrote to a uinput.
+latency_origin: ContextVar[Optional[LatencyOrigin]] = ContextVar(
+    "latency_origin",
+    default=None,
+)
+
+
+def get_handler_kind(notify_callback: NotifyCallback) -> str:
+    """Get the name of the class of the handler the notify method belongs to."""
+    return type(getattr(notify_callback, "__self__", notify_callback)).__name__
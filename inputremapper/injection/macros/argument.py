@@ -166,6 +166,14 @@ class Argument(ArgumentConfig):
         assert self._variable is not None
         return self._variable.get_name()
 
+    def is_const(self) -> bool:
+        """Is the value known before running the macro?"""
+        if self.is_spread():
+            return all(variable.const for variable in self._variables)
+
+        assert self._variable is not None
+        return self._variable.const
+
     def contains_macro(self) -> bool:
         """Does the underlying Variable contain another child-macro?"""
         assert self._variable is not None
@@ -180,6 +188,15 @@ class Argument(ArgumentConfig):
 
         self._variable.set_value(value)
 
+    async def wait_for_value(self, value: Any, timeout: Optional[float]) -> bool:
+        """Wait until the underlying Variable has the value during runtime.
+        Fails for constants."""
+        assert self._variable is not None
+        if self._variable.const:
+            raise Exception("Can't wait for the value of a constant")
+
+        return await self._variable.wait_for_value(value, timeout)
+
     def assert_is_symbol(self, symbol: str) -> None:
         """Checks if the key/symbol-name is valid. Like "KEY_A" or "escape".
 
@@ -25,22 +25,23 @@ import asyncio
 from typing import List, Callable, Optional, TYPE_CHECKING
 import multiprocessing
 
-from inputremapper.ipc.shared_dict import SharedDict
+from inputremapper.ipc.shared_memory_dict import SharedMemoryDict
 from inputremapper.logging.logger import logger
 
 if TYPE_CHECKING:
     from inputremapper.injection.macros.task import Task
     from inputremapper.injection.context import Context
     from inputremapper.configs.mapping import Mapping
+    from inputremapper.injection.macros.program import Program
 
 InjectEventCallback = Callable[[int, int, int], None]
 
-# Python 3.14 compatibility. Because the shared-dict is a global object in
-# input-remapper, which does multiprocessing stuff in the constructor, this has to
-# happen globally too, unfortunately.
+# Python 3.14 compatibility. The variables are shared with the injector processes by
+# forking them after the shared memory was created. Because the dict is a global
+# object in input-remapper, this has to happen globally too, unfortunately.
 # TODO global object, bad practice, refactor
 multiprocessing.set_start_method("fork")
-macro_variables = SharedDict()
+macro_variables = SharedMemoryDict()
 
 
 class Macro:
@@ -73,6 +74,10 @@ class Macro:
         # This is the compiled code
         self.tasks: List[Task] = []
 
+        # If the macro was compiled, the tasks are executed by this flat program
+        # instead. See compile_macro.
+        self.program: Optional[Program] = None
+
         self.running = False
 
         self.keystroke_sleep_ms = None
@@ -97,6 +102,10 @@ class Macro:
         self.running = True
 
         try:
+            if self.program is not None:
+                await self.program.run(callback)
+                return
+
             for task in self.tasks:
                 coroutine = task.run(callback)
                 if asyncio.iscoroutine(coroutine):
@@ -22,12 +22,19 @@
 
 from __future__ import annotations
 
+import functools
 import re
 from typing import Optional, Any, Type, TYPE_CHECKING, Dict, List
 
 from inputremapper.configs.validation_errors import MacroError
 from inputremapper.injection.macros.macro import Macro
 from inputremapper.injection.macros.raw_value import RawValue
+from inputremapper.injection.macros.syntax_tree import (
+    Call,
+    Chain,
+    Node,
+    SyntaxTreeParser,
+)
 from inputremapper.injection.macros.task import Task
 from inputremapper.injection.macros.tasks.add import AddTask
 from inputremapper.injection.macros.tasks.event import EventTask
@@ -50,6 +57,7 @@ from inputremapper.injection.macros.tasks.repeat import RepeatTask
 from inputremapper.injection.macros.tasks.set import SetTask
 from inputremapper.injection.macros.tasks.toggle import ToggleTask
 from inputremapper.injection.macros.tasks.wait import WaitTask
+from inputremapper.injection.macros.tasks.wait_for import WaitForTask
 from inputremapper.injection.macros.tasks.wheel import WheelTask
 from inputremapper.logging.logger import logger
 
@@ -68,6 +76,7 @@ class Parser:
         "key_up": KeyUpTask,
         "event": EventTask,
         "wait": WaitTask,
+        "wait_for": WaitForTask,
         "hold": HoldTask,
         "hold_keys": HoldKeysTask,
         "mouse": MouseTask,
@@ -108,84 +117,6 @@ class Parser:
 
         return "(" in output and ")" in output and len(output) >= 4
 
-    @staticmethod
-    def _extract_args(inner: str):
-        """Extract parameters from the inner contents of a call.
-
-        This does not parse them.
-
-        Parameters
-        ----------
-        inner
-            for example '1, r, r(2, k(a))' should result in ['1', 'r', 'r(2, k(a))']
-        """
-        inner = inner.strip()
-        brackets = 0
-        params = []
-        start = 0
-        string = False
-        for position, char in enumerate(inner):
-            # ignore anything between string quotes
-            if char == '"':
-                string = not string
-            if string:
-                continue
-
-            # ignore commas inside child macros
-            if char == "(":
-                brackets += 1
-            if char == ")":
-                brackets -= 1
-            if char == "," and brackets == 0:
-                # , potentially starts another parameter, but only if
-                # the current brackets are all closed.
-                params.append(inner[start:position].strip())
-                # skip the comma
-                start = position + 1
-
-        # one last parameter
-        params.append(inner[start:].strip())
-
-        return params
-
-    @staticmethod
-    def _count_brackets(macro):
-        """Find where the first opening bracket closes."""
-        openings = macro.count("(")
-        closings = macro.count(")")
-        if openings != closings:
-            raise MacroError(
-                macro, f"Found {openings} opening and {closings} closing brackets"
-            )
-
-        brackets = 0
-        position = 0
-        for char in macro:
-            position += 1
-            if char == "(":
-                brackets += 1
-                continue
-
-            if char == ")":
-                brackets -= 1
-                if brackets == 0:
-                    # the closing bracket of the call
-                    break
-
-        return position
-
-    @staticmethod
-    def _split_keyword_arg(param):
-        """Split "foo=bar" into "foo" and "bar".
-
-        If not a keyward param, return None and the param.
-        """
-        if re.match(r"[a-zA-Z_][a-zA-Z_\d]*=.+", param):
-            split = param.split("=", 1)
-            return split[0], split[1]
-
-        return None, param
-
     @staticmethod
     def _validate_keyword_argument_names(
         keyword_args: Dict[str, Any],
@@ -199,182 +130,120 @@ class Parser:
                 raise MacroError(msg=f"Unknown keyword argument {keyword_arg}")
 
     @staticmethod
-    def _parse_recurse(
-        code: str,
+    def _build_argument(
+        node: Node,
         context: Optional[Context],
         mapping: Mapping,
         verbose: bool,
-        macro_instance: Optional[Macro] = None,
-        depth: int = 0,
+        depth: int,
     ) -> RawValue:
-        """Handle a subset of the macro, e.g. one parameter or function call.
+        """Turn a parameter of a call into a RawValue, with child-macros as Macro."""
+        if isinstance(node, Chain):
+            return RawValue(
+                value=Parser._build_macro(node, context, mapping, verbose, depth)
+            )
+
+        # It is probably either a key name like KEY_A or a variable name as in
+        # `set(var,1)`, both won't contain special characters that can break macro
+        # syntax so they don't have to be wrapped in quotes. The argument
+        # configuration of the tasks will detemrine how to parse it.
+        if verbose:
+            logger.debug("%svalue %s", "  " * depth, node.text)
+
+        return RawValue(value=node.text)
+
+    @staticmethod
+    def _build_macro(
+        chain: Chain,
+        context: Optional[Context],
+        mapping: Mapping,
+        verbose: bool,
+        depth: int = 0,
+    ) -> Macro:
+        """Create the Macro and its tasks from the syntax tree of a chain of calls.
 
         Not using eval for security reasons.
 
         Parameters
         ----------
-        code
-            Just like parse. A single parameter or the complete macro as string.
-            Comments and redundant whitespace characters are expected to be removed already.
-            Example:
-            - "parallel(key(a),key(b).key($foo))"
-            - "key(a)"
-            - "a"
-            - "key(b).key($foo)"
-            - "b"
-            - "key($foo)"
-            - "$foo"
+        chain
+            For example the tree of "key(b).key($foo)"
         context : Context
-        macro_instance
-            A macro instance to add tasks to. This is the output of the parser, and is
-            organized like a tree.
         depth
             For logging porposes
         """
-        assert isinstance(code, str)
-        assert isinstance(depth, int)
+        macro_instance = Macro(chain.code, context, mapping)
 
-        def debug(*args, **kwargs):
-            if verbose:
-                logger.debug(*args, **kwargs)
-
-        space = "  " * depth
-
-        code = code.strip()
-
-        # is it another macro?
-        task_call_match = re.match(r"^(\w+)\(", code)
-        task_name = task_call_match[1] if task_call_match else None
-
-        if task_name is None:
-            # It is probably either a key name like KEY_A or a variable name as in `set(var,1)`,
-            # both won't contain special characters that can break macro syntax so they don't
-            # have to be wrapped in quotes. The argument configuration of the tasks will
-            # detemrine how to parse it.
-            debug("%svalue %s", space, code)
-            return RawValue(value=code)
-
-        if macro_instance is None:
-            # start a new chain
-            macro_instance = Macro(code, context, mapping)
-        else:
-            # chain this call to the existing instance
-            assert isinstance(macro_instance, Macro)
-
-        task_class = Parser.TASK_CLASSES.get(task_name)
-        if task_class is None:
-            raise MacroError(code, f"Unknown function {task_name}")
-
-        # get all the stuff inbetween
-        closing_bracket_position = Parser._count_brackets(code) - 1
-        inner = code[code.index("(") + 1 : closing_bracket_position]
-        debug("%scalls %s with %s", space, task_name, inner)
-
-        # split "3, foo=a(2, k(a).w(10))" into arguments
-        raw_string_args = Parser._extract_args(inner)
-
-        # parse and sort the params
-        positional_args: List[RawValue] = []
-        keyword_args: Dict[str, RawValue] = {}
-        for param in raw_string_args:
-            key, value = Parser._split_keyword_arg(param)
-            parsed = Parser._parse_recurse(
-                value.strip(),
-                context,
-                mapping,
-                verbose,
-                None,
-                depth + 1,
-            )
-            if key is None:
-                if len(keyword_args) > 0:
-                    msg = f'Positional argument "{key}" follows keyword argument'
-                    raise MacroError(code, msg)
-                positional_args.append(parsed)
-            else:
-                if key in keyword_args:
-                    raise MacroError(code, f'The "{key}" argument was specified twice')
-                keyword_args[key] = parsed
-
-        debug(
-            "%sadd call to %s with %s, %s",
-            space,
-            task_name,
-            positional_args,
-            keyword_args,
-        )
+        for call in chain.calls:
+            task_class = Parser.TASK_CLASSES.get(call.name)
+            if task_class is None:
+                raise MacroError(
+                    chain.code,
+                    f"Unknown function {call.name}",
+                    position=call.position,
+                )
 
-        Parser._validate_keyword_argument_names(
-            keyword_args,
-            task_class,
-        )
-        Parser._validate_num_args(
-            code,
-            task_name,
-            task_class,
-            raw_string_args,
-        )
+            positional_args: List[RawValue] = [
+                Parser._build_argument(arg, context, mapping, verbose, depth + 1)
+                for arg in call.args
+            ]
+            keyword_args: Dict[str, RawValue] = {
+                key: Parser._build_argument(arg, context, mapping, verbose, depth + 1)
+                for key, arg in call.kwargs
+            }
 
-        try:
-            task = task_class(
-                positional_args,
+            if verbose:
+                logger.debug(
+                    "%sadd call to %s with %s, %s",
+                    "  " * depth,
+                    call.name,
+                    positional_args,
+                    keyword_args,
+                )
+
+            Parser._validate_keyword_argument_names(
                 keyword_args,
-                context,
-                mapping,
+                task_class,
             )
-            macro_instance.add_task(task)
-        except TypeError as exception:
-            raise MacroError(msg=str(exception)) from exception
-
-        # is after this another call? Chain it to the macro_instance
-        more_code_exists = len(code) > closing_bracket_position + 1
-        if more_code_exists:
-            next_char = code[closing_bracket_position + 1]
-            statement_closed = next_char == "."
-
-            if statement_closed:
-                # skip over the ")."
-                chain = code[closing_bracket_position + 2 :]
-                debug("%sfollowed by %s", space, chain)
-                Parser._parse_recurse(
-                    chain,
+            Parser._validate_num_args(
+                chain.code,
+                call,
+                task_class,
+            )
+
+            try:
+                task = task_class(
+                    positional_args,
+                    keyword_args,
                     context,
                     mapping,
-                    verbose,
-                    macro_instance,
-                    depth,
-                )
-            elif re.match(r"[a-zA-Z_]", next_char):
-                # something like foo()bar
-                raise MacroError(
-                    code,
-                    f'Expected a "." to follow after '
-                    f"{code[:closing_bracket_position + 1]}",
                 )
+                macro_instance.add_task(task)
+            except TypeError as exception:
+                raise MacroError(msg=str(exception)) from exception
 
-        return RawValue(value=macro_instance)
+        return macro_instance
 
     @staticmethod
     def _validate_num_args(
         code: str,
-        task_name: str,
+        call: Call,
         task_class: Type[Task],
-        raw_string_args: List[str],
     ) -> None:
         min_args, max_args = task_class.get_num_parameters()
-        num_provided_args = len(raw_string_args)
+        num_provided_args = len(call.args) + len(call.kwargs)
         if num_provided_args < min_args or num_provided_args > max_args:
             if min_args != max_args:
                 msg = (
-                    f"{task_name} takes between {min_args} and {max_args}, "
+                    f"{call.name} takes between {min_args} and {max_args}, "
                     f"not {num_provided_args} parameters"
                 )
             else:
                 msg = (
-                    f"{task_name} takes {min_args}, not {num_provided_args} parameters"
+                    f"{call.name} takes {min_args}, not {num_provided_args} parameters"
                 )
 
-            raise MacroError(code, msg)
+            raise MacroError(code, msg, position=call.position)
 
     @staticmethod
     def handle_plus_syntax(macro):
@@ -443,6 +312,20 @@ class Parser:
             '"',
         )
 
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def parse_syntax_tree(macro: str) -> Node:
+        """Parse the code into a tree of calls and values.
+
+        The result is cached, so that macros with the same code are only parsed once.
+        """
+        code = macro
+        cleaned = Parser.clean(macro)
+        if "+" in cleaned:
+            code = Parser.handle_plus_syntax(cleaned)
+
+        return SyntaxTreeParser(code).parse()
+
     @staticmethod
     def parse(macro: str, context=None, mapping=None, verbose: bool = True) -> Macro:
         """Parse and generate a Macro that can be run as often as you want.
@@ -461,16 +344,8 @@ class Parser:
         """
         # TODO pass mapping in frontend and do the target check for keys?
         logger.debug("parsing macro %s", macro.replace("\n", ""))
-        macro = Parser.clean(macro)
-        macro = Parser.handle_plus_syntax(macro)
-
-        macro_obj = Parser._parse_recurse(
-            macro,
-            context,
-            mapping,
-            verbose,
-        ).value
-        if not isinstance(macro_obj, Macro):
+        tree = Parser.parse_syntax_tree(macro)
+        if not isinstance(tree, Chain):
             raise MacroError(macro, "The provided code was not a macro")
 
-        return macro_obj
+        return Parser._build_macro(tree, context, mapping, verbose)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Run macros as a flat list of instructions, instead of a tree of tasks."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, List, Tuple
+
+from evdev.ecodes import EV_KEY, ecodes
+
+from inputremapper.configs.keyboard_layout import keyboard_layout
+from inputremapper.injection.macros.macro import InjectEventCallback, Macro
+from inputremapper.injection.macros.task import Task
+from inputremapper.injection.macros.tasks.event import EventTask
+from inputremapper.injection.macros.tasks.hold import HoldTask
+from inputremapper.injection.macros.tasks.key import KeyTask
+from inputremapper.injection.macros.tasks.key_down import KeyDownTask
+from inputremapper.injection.macros.tasks.key_up import KeyUpTask
+from inputremapper.injection.macros.tasks.repeat import RepeatTask
+from inputremapper.injection.macros.tasks.wait import WaitTask
+
+
+class Op:
+    """Operation codes of the instructions, and what their two operands are."""
+
+    # (type, code, value), unused. Inject the event.
+    EMIT = 0
+    # seconds, unused. asyncio.sleep.
+    SLEEP = 1
+    # task, unused. Run a task that couldn't be compiled.
+    CALL = 2
+    # repeats, index after the loop. Start a loop.
+    LOOP = 3
+    # index of the loop body, unused. Jump back if there are repeats left.
+    END_LOOP = 4
+    # task, index after the loop. Leave the loop once the trigger is released.
+    JUMP_UNLESS_HOLDING = 5
+    # index, unused.
+    JUMP = 6
+
+
+Instruction = Tuple[int, Any, Any]
+
+
+class Program:
+    """A compiled macro.
+
+    Constant arguments are resolved, and child macros of repeat and hold are
+    inlined, so running it doesn't create a coroutine for each task and iteration.
+    """
+
+    def __init__(self, code: str, instructions: List[Instruction]):
+        self.code = code
+        self.instructions = instructions
+
+    async def run(self, callback: InjectEventCallback) -> None:
+        instructions = self.instructions
+        # How many repeats are left for each loop that is currently running
+        repeats: List[int] = []
+        index = 0
+        end = len(instructions)
+        while index < end:
+            op, a, b = instructions[index]
+            index += 1
+
+            if op == Op.EMIT:
+                callback(*a)
+            elif op == Op.SLEEP:
+                await asyncio.sleep(a)
+            elif op == Op.CALL:
+                coroutine = a.run(callback)
+                if asyncio.iscoroutine(coroutine):
+                    await coroutine
+            elif op == Op.LOOP:
+                if a > 0:
+                    repeats.append(a)
+                else:
+                    index = b
+            elif op == Op.END_LOOP:
+                repeats[-1] -= 1
+                if repeats[-1] > 0:
+                    index = a
+                else:
+                    repeats.pop()
+            elif op == Op.JUMP_UNLESS_HOLDING:
+                if not a.is_holding():
+                    index = b
+            elif op == Op.JUMP:
+                index = a
+
+    def __repr__(self):
+        return f'<Program "{self.code}" with {len(self.instructions)} instructions>'
+
+
+def compile_macro(macro: Macro) -> Program:
+    """Compile the macro, and make it run its Program from now on.
+
+    Semantics stay the same. Tasks that can't be compiled are called as they are, and
+    their child macros are compiled separately.
+    """
+    instructions: List[Instruction] = []
+    _compile_tasks(macro.tasks, instructions)
+    program = Program(macro.code or "", instructions)
+    macro.program = program
+    return program
+
+
+def _compile_tasks(tasks: List[Task], instructions: List[Instruction]) -> None:
+    for task in tasks:
+        if not _compile_task(task, instructions):
+            instructions.append((Op.CALL, task, None))
+            for child_macro in task.child_macros:
+                compile_macro(child_macro)
+
+
+def _compile_task(task: Task, instructions: List[Instruction]) -> bool:
+    """Add the instructions for the task. Returns False if that's not possible."""
+    arguments = task.arguments
+    if not all(argument.is_const() for argument in arguments.values()):
+        # Dynamic values have to be resolved and validated at runtime
+        return False
+
+    if isinstance(task, KeyTask):
+        code = keyboard_layout.get(arguments["symbol"].get_value())
+        pause = _get_keycode_pause(task)
+        instructions.append((Op.EMIT, (EV_KEY, code, 1), None))
+        instructions.append((Op.SLEEP, pause, None))
+        instructions.append((Op.EMIT, (EV_KEY, code, 0), None))
+        instructions.append((Op.SLEEP, pause, None))
+        return True
+
+    if isinstance(task, (KeyDownTask, KeyUpTask)):
+        code = keyboard_layout.get(arguments["symbol"].get_value())
+        value = 1 if isinstance(task, KeyDownTask) else 0
+        instructions.append((Op.EMIT, (EV_KEY, code, value), None))
+        return True
+
+    if isinstance(task, EventTask):
+        type_ = arguments["type"].get_value()
+        code = arguments["code"].get_value()
+        if isinstance(type_, str):
+            type_ = ecodes[type_.upper()]
+        if isinstance(code, str):
+            code = ecodes[code.upper()]
+
+        value = arguments["value"].get_value()
+        instructions.append((Op.EMIT, (type_, code, value), None))
+        instructions.append((Op.SLEEP, _get_keycode_pause(task), None))
+        return True
+
+    if isinstance(task, WaitTask):
+        time = arguments["time"].get_value()
+        max_time = arguments["max_time"].get_value()
+        if max_time is not None and max_time > time:
+            # randomized
+            return False
+
+        instructions.append((Op.SLEEP, time / 1000, None))
+        return True
+
+    if isinstance(task, RepeatTask):
+        start = len(instructions)
+        instructions.append((Op.LOOP, arguments["repeats"].get_value(), None))
+        _compile_tasks(arguments["macro"].get_value().tasks, instructions)
+        instructions.append((Op.END_LOOP, start + 1, None))
+        instructions[start] = (Op.LOOP, instructions[start][1], len(instructions))
+        return True
+
+    if isinstance(task, HoldTask) and arguments["macro"].contains_macro():
+        start = len(instructions)
+        instructions.append((Op.JUMP_UNLESS_HOLDING, task, None))
+        _compile_tasks(arguments["macro"].get_value().tasks, instructions)
+        # The same 1ms break as in HoldTask, to keep the system responsive
+        instructions.append((Op.SLEEP, 1 / 1000, None))
+        instructions.append((Op.JUMP, start, None))
+        instructions[start] = (Op.JUMP_UNLESS_HOLDING, task, len(instructions))
+        return True
+
+    return False
+
+
+def _get_keycode_pause(task: Task) -> float:
+    return task.mapping.macro_key_sleep_ms / 1000
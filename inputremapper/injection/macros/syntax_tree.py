@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Turn macro code into a tree of calls and values, without creating any tasks.
+
+The tree only depends on the code, so it can be shared by all macros with the same
+code.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+from inputremapper.configs.validation_errors import MacroError
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<whitespace>\s+)
+    |(?P<comment>\#[^\n]*)
+    # Unterminated strings go until the end
+    |(?P<string>"[^"]*"?)
+    |(?P<punctuation>[(),=.])
+    |(?P<text>[^\s#"(),=.]+)
+    """,
+    re.VERBOSE,
+)
+
+_FUNCTION_NAME = re.compile(r"\w+")
+_KEYWORD = re.compile(r"[a-zA-Z_][a-zA-Z_\d]*")
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    # Where it starts in the code
+    position: int
+
+
+@dataclass(frozen=True)
+class Value:
+    """Something like `KEY_A`, `$foo`, `1.5` or `"foo"`, exactly as it was written,
+    without whitespaces and comments."""
+
+    text: str
+    position: int
+
+
+@dataclass(frozen=True)
+class Call:
+    """For example `repeat(2, key(KEY_A))`."""
+
+    name: str
+    position: int
+    args: Tuple[Node, ...]
+    kwargs: Tuple[Tuple[str, Node], ...]
+
+
+@dataclass(frozen=True)
+class Chain:
+    """Calls that are chained with dots, like `key(KEY_A).wait(10)`."""
+
+    # The code of the chain without whitespaces and comments
+    code: str
+    position: int
+    calls: Tuple[Call, ...]
+
+
+Node = Union[Value, Chain]
+
+
+def tokenize(code: str) -> List[Token]:
+    """Split the code into strings, punctuation and text, in a single pass.
+
+    Whitespaces and comments are dropped.
+    """
+    return [
+        Token(match.lastgroup, match.group(), match.start())
+        for match in _TOKEN_PATTERN.finditer(code)
+        if match.lastgroup not in ("whitespace", "comment")
+    ]
+
+
+class SyntaxTreeParser:
+    """Recursive descent parser for macro code."""
+
+    def __init__(self, code: str):
+        self.code = code
+        self.tokens = tokenize(code)
+        self.index = 0
+
+    def parse(self) -> Node:
+        """Parse the complete code."""
+        self._check_brackets()
+        node = self._parse_node()
+        token = self._peek()
+        if token is not None:
+            raise self._error(f'Unexpected "{token.text}"', token.position)
+
+        return node
+
+    def _check_brackets(self) -> None:
+        openings = 0
+        closings = 0
+        for token in self.tokens:
+            if token.text == "(" and token.kind == "punctuation":
+                openings += 1
+            elif token.text == ")" and token.kind == "punctuation":
+                closings += 1
+
+        if openings != closings:
+            raise self._error(
+                f"Found {openings} opening and {closings} closing brackets"
+            )
+
+    def _error(self, msg: str, position: Optional[int] = None) -> MacroError:
+        return MacroError(self.code, msg, position=position)
+
+    def _peek(self, offset: int = 0) -> Optional[Token]:
+        index = self.index + offset
+        if index < len(self.tokens):
+            return self.tokens[index]
+
+        return None
+
+    def _is_punctuation(self, token: Optional[Token], *chars: str) -> bool:
+        return token is not None and token.kind == "punctuation" and token.text in chars
+
+    def _is_call(self) -> bool:
+        token = self._peek()
+        return (
+            token is not None
+            and token.kind == "text"
+            and _FUNCTION_NAME.fullmatch(token.text) is not None
+            and self._is_punctuation(self._peek(1), "(")
+        )
+
+    def _join(self, start: int) -> str:
+        """Get the code of the tokens since start, without whitespaces and comments."""
+        return "".join(token.text for token in self.tokens[start : self.index])
+
+    def _parse_node(self) -> Node:
+        if self._is_call():
+            return self._parse_chain()
+
+        return self._parse_value()
+
+    def _parse_value(self) -> Value:
+        """Parse everything until the end of the argument."""
+        token = self._peek()
+        position = len(self.code) if token is None else token.position
+        texts = []
+        while token is not None and not self._is_punctuation(token, ",", ")"):
+            if self._is_punctuation(token, "("):
+                raise self._error('Unexpected "("', token.position)
+
+            texts.append(token.text)
+            self.index += 1
+            token = self._peek()
+
+        return Value("".join(texts), position)
+
+    def _parse_chain(self) -> Chain:
+        start = self.index
+        calls = [self._parse_call()]
+        while True:
+            token = self._peek()
+            if self._is_punctuation(token, "."):
+                self.index += 1
+                if self._is_call():
+                    calls.append(self._parse_call())
+                    continue
+
+                following = self._peek()
+                if following is None or self._is_punctuation(following, ",", ")"):
+                    # A trailing dot is ignored
+                    break
+
+                raise self._error(
+                    'Expected a function call after "."',
+                    following.position,
+                )
+
+            if token is not None and token.kind == "text":
+                # something like foo()bar
+                code = self._join(start)
+                raise self._error(
+                    f'Expected a "." to follow after {code}',
+                    token.position,
+                )
+
+            break
+
+        return Chain(self._join(start), self.tokens[start].position, tuple(calls))
+
+    def _parse_call(self) -> Call:
+        name = self.tokens[self.index]
+        # skip the name and the opening bracket
+        self.index += 2
+
+        args: List[Node] = []
+        kwargs: List[Tuple[str, Node]] = []
+        while True:
+            token = self._peek()
+            keyword = None
+            if (
+                token is not None
+                and token.kind == "text"
+                and _KEYWORD.fullmatch(token.text)
+                and self._is_punctuation(self._peek(1), "=")
+            ):
+                keyword = token.text
+                self.index += 2
+
+            node = self._parse_node()
+            if keyword is None:
+                if len(kwargs) > 0:
+                    raise self._error(
+                        "Positional argument follows keyword argument",
+                        token.position if token is not None else None,
+                    )
+
+                args.append(node)
+            else:
+                if keyword in dict(kwargs):
+                    raise self._error(
+                        f'The "{keyword}" argument was specified twice',
+                        token.position if token is not None else None,
+                    )
+
+                kwargs.append((keyword, node))
+
+            token = self._peek()
+            if token is None:
+                raise self._error(f'Missing ")" for "{name.text}"', name.position)
+
+            self.index += 1
+            if self._is_punctuation(token, ")"):
+                return Call(name.text, name.position, tuple(args), tuple(kwargs))
+
+            if not self._is_punctuation(token, ","):
+                raise self._error(f'Unexpected "{token.text}"', token.position)
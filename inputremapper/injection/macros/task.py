@@ -31,6 +31,7 @@ from inputremapper.injection.macros.argument import (
     ArgumentFlags,
 )
 from inputremapper.injection.macros.macro import Macro, InjectEventCallback
+from inputremapper.injection.tick_scheduler import Emitter, TickScheduler
 from inputremapper.logging.logger import logger
 
 if TYPE_CHECKING:
@@ -106,6 +107,19 @@ class Task:
         assert self.context is not None
         self.context.listeners.remove(listener)
 
+    async def run_every_tick(self, emitter: Emitter) -> None:
+        """Call the emitter at the rel_rate of the mapping, until it returns False.
+
+        Everything that is injected in one tick is synced as a single frame, together
+        with other macros and handlers that are moving at the same time.
+        """
+        if self.context is None:
+            tick_scheduler = TickScheduler()
+        else:
+            tick_scheduler = self.context.tick_scheduler
+
+        await tick_scheduler.run(self.mapping.rel_rate, emitter)
+
     @classmethod
     def get_macro_argument_names(cls):
         return [argument_config.name for argument_config in cls.argument_configs]
@@ -21,9 +21,11 @@
 from __future__ import annotations
 
 import asyncio
+from typing import List, Optional
 
 from evdev.ecodes import EV_KEY
 
+from inputremapper.injection.event_barrier import EventBarrier
 from inputremapper.injection.macros.argument import ArgumentConfig
 from inputremapper.injection.macros.macro import Macro
 from inputremapper.injection.macros.task import Task
@@ -57,33 +59,44 @@ class IfSingleTask(Task):
         another_key_pressed_event = asyncio.Event()
         then = self.get_argument("then").get_value()
         else_ = self.get_argument("else").get_value()
+        barriers: List[EventBarrier] = []
 
-        async def listener(event: InputEvent) -> None:
+        async def listener(event: InputEvent) -> Optional[EventBarrier]:
             if event.type != EV_KEY:
                 # Ignore anything that is not a key
-                return
+                return None
 
             if event.is_pressed():
-                # Another key was pressed
+                # Another key was pressed. Hold it back until `else` had a chance to
+                # inject something.
+                barrier = EventBarrier()
+                barriers.append(barrier)
                 another_key_pressed_event.set()
-                return
+                return barrier
+
+            return None
 
         self.add_event_listener(listener)
 
         timeout = self.get_argument("timeout").get_value()
 
-        # Wait for anything of importance to happen, that would determine the
-        # outcome of the if_single macro.
-        await asyncio.wait(
-            [
-                asyncio.Task(another_key_pressed_event.wait()),
-                asyncio.Task(self._trigger_release_event.wait()),
-            ],
-            timeout=timeout / 1000 if timeout else None,
-            return_when=asyncio.FIRST_COMPLETED,
-        )
-
-        self.remove_event_listener(listener)
+        try:
+            # Wait for anything of importance to happen, that would determine the
+            # outcome of the if_single macro.
+            await asyncio.wait(
+                [
+                    asyncio.Task(another_key_pressed_event.wait()),
+                    asyncio.Task(self._trigger_release_event.wait()),
+                ],
+                timeout=timeout / 1000 if timeout else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            self.remove_event_listener(listener)
+            # The held back events continue as soon as the macro below has to wait
+            # for the first time, which is after it injected its first event.
+            for barrier in barriers:
+                barrier.release_after_this_step()
 
         if not self.is_holding():
             if then:
@@ -22,11 +22,12 @@ from __future__ import annotations
 
 import asyncio
 from collections import deque
-from typing import Deque
+from typing import Deque, Optional
 
 from evdev.ecodes import EV_KEY
 
 from inputremapper.configs.keyboard_layout import keyboard_layout
+from inputremapper.injection.event_barrier import EventBarrier
 from inputremapper.injection.macros.argument import ArgumentConfig
 from inputremapper.injection.macros.task import Task
 from inputremapper.input_event import InputEvent
@@ -65,64 +66,71 @@ class ModTapTask(Task):
 
     async def run(self, callback) -> None:
         tapping_term = self.get_argument("tapping_term").get_value() / 1000
-        jamming_asyncio_events: Deque[asyncio.Event] = deque()
+        jamming_barriers: Deque[EventBarrier] = deque()
 
-        async def listener(event: InputEvent) -> None:
+        async def listener(event: InputEvent) -> Optional[EventBarrier]:
             trigger = self.mapping.input_combination[-1]
             if event.type_and_code == trigger.type_and_code:
                 # We don't block the event that would set _trigger_release_event.
-                return
+                return None
 
             if event.type != EV_KEY:
-                return
+                return None
 
-            asyncio_event = asyncio.Event()
-            jamming_asyncio_events.append(asyncio_event)
+            barrier = EventBarrier()
+            jamming_barriers.append(barrier)
             # Make the EventReader wait until the mod_tap macro allows it to continue
             # processing the event. Because we want to wait until mod_tap injected the
             # modifier.
-            await asyncio_event.wait()
+            return barrier
 
         self.add_event_listener(listener)
 
-        timeout = asyncio.Task(asyncio.sleep(tapping_term))
-        await asyncio.wait(
-            [asyncio.Task(self._trigger_release_event.wait()), timeout],
-            return_when=asyncio.FIRST_COMPLETED,
-        )
-        has_timed_out = timeout.done()
-
-        if has_timed_out:
-            # The timeout happened before the trigger got released.
-            # We therefore modify stuff.
-            symbol = self.get_argument("modifier").get_value()
-            logger.debug("Modifying with %s", symbol)
-        else:
-            # The trigger got released before the timeout.
-            # We therefore do not modify stuff.
-            symbol = self.get_argument("default").get_value()
-            logger.debug("Writing default %s", symbol)
-
-        code = keyboard_layout.get(symbol)
-        callback(EV_KEY, code, 1)
-        await self.keycode_pause()
-
-        # Now that we know if the key was pressed with the intention of modifying other
-        # keys, we can let the jammed keys go on their journey through the handlers.
-        # Those other handlers may map them to other keys and stuff.
-        while len(jamming_asyncio_events) > 0:
-            asyncio_event = jamming_asyncio_events.popleft()
-            asyncio_event.set()
+        try:
+            timeout = asyncio.Task(asyncio.sleep(tapping_term))
+            await asyncio.wait(
+                [asyncio.Task(self._trigger_release_event.wait()), timeout],
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            has_timed_out = timeout.done()
+
+            if has_timed_out:
+                # The timeout happened before the trigger got released.
+                # We therefore modify stuff.
+                symbol = self.get_argument("modifier").get_value()
+                logger.debug("Modifying with %s", symbol)
+            else:
+                # The trigger got released before the timeout.
+                # We therefore do not modify stuff.
+                symbol = self.get_argument("default").get_value()
+                logger.debug("Writing default %s", symbol)
+
+            code = keyboard_layout.get(symbol)
+            callback(EV_KEY, code, 1)
             await self.keycode_pause()
-            await self.throttle()
-            # While we are emptying the queue, more events might still arrive and add
-            # to the queue.
-
-        # We remove this as late as possible, because if more keys are pressed while
-        # jamming_asyncio_events is still being taken care of, they should wait until
-        # all is done. This ensures the order of all events that are pressed, until
-        # mod_tap is completely finished.
-        self.remove_event_listener(listener)
+
+            # Now that we know if the key was pressed with the intention of modifying
+            # other keys, we can let the jammed keys go on their journey through the
+            # handlers. Those other handlers may map them to other keys and stuff.
+            while len(jamming_barriers) > 0:
+                barrier = jamming_barriers.popleft()
+                barrier.release()
+                await self.keycode_pause()
+                await self.throttle()
+                # While we are emptying the queue, more events might still arrive and
+                # add to the queue.
+        finally:
+            # If the macro is stopped, for example because the preset is replaced,
+            # the jammed keys still have to go on. Otherwise the EventReader would
+            # wait for them forever.
+            for barrier in jamming_barriers:
+                barrier.release()
+
+            # We remove this as late as possible, because if more keys are pressed
+            # while jamming_barriers is still being taken care of, they should wait
+            # until all is done. This ensures the order of all events that are
+            # pressed, until mod_tap is completely finished.
+            self.remove_event_listener(listener)
 
         # Keep the modifier pressed until the input/trigger is released
         await self._trigger_release_event.wait()
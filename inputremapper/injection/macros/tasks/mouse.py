@@ -61,9 +61,4 @@ class MouseTask(MouseXYTask):
             "right": (REL_X, 1),
         }[direction.lower()]
 
-        await self.axis(
-            code,
-            direction * speed,
-            acceleration,
-            callback,
-        )
+        await self.move([(code, direction * speed)], acceleration, callback)
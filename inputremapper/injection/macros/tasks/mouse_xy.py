@@ -20,8 +20,7 @@
 
 from __future__ import annotations
 
-import asyncio
-from typing import Union
+from typing import List, Tuple, Union
 
 from evdev._ecodes import REL_Y, REL_X
 from evdev.ecodes import EV_REL
@@ -29,7 +28,44 @@ from evdev.ecodes import EV_REL
 from inputremapper.injection.macros.argument import ArgumentConfig
 from inputremapper.injection.macros.macro import InjectEventCallback
 from inputremapper.injection.macros.task import Task
-from inputremapper.injection.macros.tasks.util import precise_iteration_frequency
+
+
+class _AxisMovement:
+    """Accelerates a single axis up to its speed."""
+
+    def __init__(
+        self,
+        code: int,
+        speed: Union[int, float],
+        fractional_acceleration: Union[int, float],
+    ) -> None:
+        self.code = code
+        self.speed = speed
+        self.acceleration = speed * fractional_acceleration
+        self.direction = -1 if speed < 0 else 1
+        self.current_speed = 0.0
+        self.displacement_accumulator = 0.0
+        self.displacement = 0
+        if self.acceleration <= 0:
+            self.displacement = int(speed)
+
+    def step(self) -> int:
+        """Get the displacement for the next iteration."""
+        # Cursors can only move by integers. To get smooth acceleration for
+        # small acceleration values, the cursor needs to move by a pixel every
+        # few iterations. This can be achieved by remembering the decimal
+        # places that were cast away, and using them for the next iteration.
+        if self.acceleration:
+            self.current_speed += self.acceleration
+            self.current_speed = self.direction * min(
+                abs(self.current_speed),
+                abs(self.speed),
+            )
+            self.displacement_accumulator += self.current_speed
+            self.displacement = int(self.displacement_accumulator)
+            self.displacement_accumulator -= self.displacement
+
+        return self.displacement
 
 
 class MouseXYTask(Task):
@@ -60,40 +96,32 @@ class MouseXYTask(Task):
         x = self.get_argument("x").get_value()
         y = self.get_argument("y").get_value()
         acceleration = self.get_argument("acceleration").get_value()
-        await asyncio.gather(
-            self.axis(REL_X, x, acceleration, callback),
-            self.axis(REL_Y, y, acceleration, callback),
-        )
+        await self.move([(REL_X, x), (REL_Y, y)], acceleration, callback)
 
-    async def axis(
+    async def move(
         self,
-        code: int,
-        speed: Union[int, float],
+        speeds: List[Tuple[int, Union[int, float]]],
         fractional_acceleration: Union[int, float],
         callback: InjectEventCallback,
     ) -> None:
-        acceleration = speed * fractional_acceleration
-        direction = -1 if speed < 0 else 1
-        current_speed = 0.0
-        displacement_accumulator = 0.0
-        displacement = 0
-        if acceleration <= 0:
-            displacement = int(speed)
-
-        async for _ in precise_iteration_frequency(self.mapping.rel_rate):
+        """Move all axes in the same iteration, so that they are synced together.
+
+        Otherwise, a diagonal movement is injected as two separate steps.
+        """
+        axes = [
+            _AxisMovement(code, speed, fractional_acceleration)
+            for code, speed in speeds
+        ]
+
+        def emit() -> bool:
             if not self.is_holding():
-                return
-
-            # Cursors can only move by integers. To get smooth acceleration for
-            # small acceleration values, the cursor needs to move by a pixel every
-            # few iterations. This can be achieved by remembering the decimal
-            # places that were cast away, and using them for the next iteration.
-            if acceleration:
-                current_speed += acceleration
-                current_speed = direction * min(abs(current_speed), abs(speed))
-                displacement_accumulator += current_speed
-                displacement = int(displacement_accumulator)
-                displacement_accumulator -= displacement
-
-            if displacement != 0:
-                callback(EV_REL, code, displacement)
+                return False
+
+            for axis in axes:
+                displacement = axis.step()
+                if displacement != 0:
+                    callback(EV_REL, axis.code, displacement)
+
+            return True
+
+        await self.run_every_tick(emit)
@@ -32,7 +32,6 @@ from evdev.ecodes import (
 
 from inputremapper.injection.macros.argument import ArgumentConfig
 from inputremapper.injection.macros.task import Task
-from inputremapper.injection.macros.tasks.util import precise_iteration_frequency
 
 
 class WheelTask(Task):
@@ -65,12 +64,16 @@ class WheelTask(Task):
         speed = self.get_argument("speed").get_value()
         remainder = [0.0, 0.0]
 
-        async for _ in precise_iteration_frequency(self.mapping.rel_rate):
+        def emit() -> bool:
             if not self.is_holding():
-                return
+                return False
 
             for i in range(0, 2):
                 float_value = value[i] * speed + remainder[i]
                 remainder[i] = math.fmod(float_value, 1)
                 if abs(float_value) >= 1:
                     callback(EV_REL, code[i], int(float_value))
+
+            return True
+
+        await self.run_every_tick(emit)
@@ -19,7 +19,7 @@
 # along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
 
 import re
-from typing import Any
+from typing import Any, Optional
 
 from inputremapper.configs.validation_errors import MacroError
 from inputremapper.injection.macros.macro import macro_variables
@@ -66,6 +66,14 @@ class Variable:
         assert not self.const
         macro_variables.set(self.value, value)
 
+    async def wait_for_value(self, value: Any, timeout: Optional[float]) -> bool:
+        """Wait until any macro sets the variable to the value.
+
+        Returns False if the timeout in seconds was reached before.
+        """
+        assert not self.const
+        return await macro_variables.wait_for(self.value, value, timeout)
+
     def validate_variable_name(self) -> None:
         """Check if this is a legit variable name.
 
@@ -26,8 +26,10 @@ from inputremapper import exceptions
 from inputremapper.configs.input_config import InputCombination, InputConfig
 from inputremapper.configs.mapping import Mapping
 from inputremapper.injection.global_uinputs import GlobalUInputs
+from inputremapper.injection.mapping_handlers.abs_util import AbsInfoSnapshots
 from inputremapper.injection.mapping_handlers.axis_transform import Transformation
 from inputremapper.injection.mapping_handlers.mapping_handler import (
+    ContextProtocol,
     HandlerEnums,
     MappingHandler,
 )
@@ -42,6 +44,7 @@ class AbsToAbsHandler(MappingHandler):
     _map_axis: InputConfig  # the InputConfig for the axis we map
     _output_axis: Tuple[int, int]  # the (type, code) of the output axis
     _transform: Optional[Transformation]
+    _absinfo_snapshots: AbsInfoSnapshots
     _target_absinfo: evdev.AbsInfo
 
     def __init__(
@@ -49,10 +52,15 @@ class AbsToAbsHandler(MappingHandler):
         combination: InputCombination,
         mapping: Mapping,
         global_uinputs: GlobalUInputs,
+        context: Optional[ContextProtocol] = None,
         **_,
     ) -> None:
         super().__init__(combination, mapping, global_uinputs)
 
+        self._absinfo_snapshots = (
+            AbsInfoSnapshots() if context is None else context.absinfo_snapshots
+        )
+
         # find the input event we are supposed to map. If the input combination is
         # BTN_A + ABS_X + BTN_B, then use the value of ABS_X for the transformation
         assert (map_axis := combination.find_analog_input_config(type_=EV_ABS))
@@ -98,7 +106,7 @@ class AbsToAbsHandler(MappingHandler):
             return True
 
         if not self._transform:
-            absinfo = dict(source.capabilities(absinfo=True)[EV_ABS])[event.code]  # type: ignore
+            absinfo = self._absinfo_snapshots.get_absinfo(event, source)
             self._transform = Transformation(
                 max_=absinfo.max,
                 min_=absinfo.min,
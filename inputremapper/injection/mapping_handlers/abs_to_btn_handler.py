@@ -17,15 +17,16 @@
 # You should have received a copy of the GNU General Public License
 # along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import List
+from typing import List, Optional
 
 import evdev
 
 from inputremapper.configs.input_config import InputCombination, InputConfig
 from inputremapper.configs.mapping import Mapping
 from inputremapper.injection.global_uinputs import GlobalUInputs
-from inputremapper.injection.mapping_handlers.abs_util import calculate_trigger_point
+from inputremapper.injection.mapping_handlers.abs_util import AbsInfoSnapshots
 from inputremapper.injection.mapping_handlers.mapping_handler import (
+    ContextProtocol,
     MappingHandler,
 )
 from inputremapper.input_event import InputEvent, EventActions
@@ -38,16 +39,21 @@ class AbsToBtnHandler(MappingHandler):
     _input_config: InputConfig
     _configured_direction_was_pressed: bool
     _sub_handler: MappingHandler
+    _absinfo_snapshots: AbsInfoSnapshots
 
     def __init__(
         self,
         combination: InputCombination,
         mapping: Mapping,
         global_uinputs: GlobalUInputs,
+        context: Optional[ContextProtocol] = None,
         **_,
     ) -> None:
         super().__init__(combination, mapping, global_uinputs)
 
+        self._absinfo_snapshots = (
+            AbsInfoSnapshots() if context is None else context.absinfo_snapshots
+        )
         self._configured_direction_was_pressed = False
         self._input_config = combination[0]
         assert self._input_config.analog_threshold
@@ -75,7 +81,7 @@ class AbsToBtnHandler(MappingHandler):
         analog_threshold = self._input_config.analog_threshold
         assert analog_threshold is not None
 
-        threshold, mid_point = calculate_trigger_point(
+        threshold, mid_point = self._absinfo_snapshots.get_trigger_point(
             event,
             analog_threshold,
             source,
@@ -19,7 +19,6 @@
 
 import asyncio
 import math
-import time
 from functools import partial
 from typing import Dict, Tuple, Optional, List
 
@@ -42,11 +41,14 @@ from inputremapper.configs.mapping import (
     DEFAULT_REL_RATE,
 )
 from inputremapper.injection.global_uinputs import GlobalUInputs
+from inputremapper.injection.mapping_handlers.abs_util import AbsInfoSnapshots
 from inputremapper.injection.mapping_handlers.axis_transform import Transformation
 from inputremapper.injection.mapping_handlers.mapping_handler import (
+    ContextProtocol,
     HandlerEnums,
     MappingHandler,
 )
+from inputremapper.injection.tick_scheduler import TickScheduler
 from inputremapper.input_event import InputEvent, EventActions
 from inputremapper.logging.logger import logger
 from inputremapper.utils import get_evdev_constant_name
@@ -60,16 +62,26 @@ class AbsToRelHandler(MappingHandler):
     _running: bool  # if the run method is active
     _stop: bool  # if the run loop should return
     _transform: Optional[Transformation]
+    _absinfo_snapshots: AbsInfoSnapshots
+    _tick_scheduler: TickScheduler
 
     def __init__(
         self,
         combination: InputCombination,
         mapping: Mapping,
         global_uinputs: GlobalUInputs,
+        context: Optional[ContextProtocol] = None,
         **_,
     ) -> None:
         super().__init__(combination, mapping, global_uinputs)
 
+        if context is None:
+            self._absinfo_snapshots = AbsInfoSnapshots()
+            self._tick_scheduler = TickScheduler(global_uinputs)
+        else:
+            self._absinfo_snapshots = context.absinfo_snapshots
+            self._tick_scheduler = context.tick_scheduler
+
         # find the input event we are supposed to map
         assert (map_axis := combination.find_analog_input_config(type_=EV_ABS))
         self._map_axis = map_axis
@@ -125,13 +137,10 @@ class AbsToRelHandler(MappingHandler):
             return True
 
         if not self._transform:
-            absinfo = {
-                entry[0]: entry[1]  # type: ignore
-                for entry in source.capabilities(absinfo=True)[EV_ABS]
-            }
+            absinfo = self._absinfo_snapshots.get_absinfo(event, source)
             self._transform = Transformation(
-                max_=absinfo[event.code].max,
-                min_=absinfo[event.code].min,
+                max_=absinfo.max,
+                min_=absinfo.min,
                 deadzone=self.mapping.deadzone,
                 gain=self.mapping.gain,
                 expo=self.mapping.expo,
@@ -193,14 +202,17 @@ class AbsToRelHandler(MappingHandler):
         self._running = True
         self._stop = False
         remainder = 0.0
-        start = time.time()
 
         # if the rate is configured to be slower than the default, increase the value, so
         # that the overall speed stays the same.
         rate_compensation = DEFAULT_REL_RATE / self.mapping.rel_rate
         weight = REL_XY_SCALING * rate_compensation
 
-        while not self._stop:
+        def emit() -> bool:
+            nonlocal remainder
+            if self._stop:
+                return False
+
             value, remainder = self._calculate_output(
                 self._value,
                 weight,
@@ -208,13 +220,12 @@ class AbsToRelHandler(MappingHandler):
             )
 
             self._write(EV_REL, self.mapping.output_code, value)
+            return True
 
-            time_taken = time.time() - start
-            sleep = max(0.0, (1 / self.mapping.rel_rate) - time_taken)
-            await asyncio.sleep(sleep)
-            start = time.time()
-
-        self._running = False
+        try:
+            await self._tick_scheduler.run(self.mapping.rel_rate, emit)
+        finally:
+            self._running = False
 
     async def _run_wheel_output(self, codes: Tuple[int, int]) -> None:
         """Start injecting wheel events.
@@ -227,8 +238,11 @@ class AbsToRelHandler(MappingHandler):
         self._running = True
         self._stop = False
         remainder = [0.0, 0.0]
-        start = time.time()
-        while not self._stop:
+
+        def emit() -> bool:
+            if self._stop:
+                return False
+
             for i in range(len(codes)):
                 value, remainder[i] = self._calculate_output(
                     self._value,
@@ -238,8 +252,9 @@ class AbsToRelHandler(MappingHandler):
 
                 self._write(EV_REL, codes[i], value)
 
-            time_taken = time.time() - start
-            await asyncio.sleep(max(0.0, (1 / self.mapping.rel_rate) - time_taken))
-            start = time.time()
+            return True
 
-        self._running = False
+        try:
+            await self._tick_scheduler.run(self.mapping.rel_rate, emit)
+        finally:
+            self._running = False
@@ -17,15 +17,15 @@
 # You should have received a copy of the GNU General Public License
 # along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 
 import evdev
 from evdev.ecodes import EV_ABS, ABS_GAS, ABS_BRAKE, ABS_Z, ABS_RZ
 
 from inputremapper.input_event import InputEvent
+from inputremapper.utils import DeviceHash
 
 
-# TODO: potentially cache this function { cache_key_from_args: previous_result }
 def calculate_trigger_point(
     event: InputEvent,
     analog_threshold: int,
@@ -39,10 +39,21 @@ def calculate_trigger_point(
 
     The resting point might be the middle value for a joystick: 0, *128*, 256 or
     -128, *0*, 128. Or it might be the minimum value of the shoulder triggers: *0* 256.
+
+    This asks the device for its capabilities each time, prefer
+    AbsInfoSnapshots.get_trigger_point.
     """
     absinfo = dict(source.capabilities(absinfo=True)[EV_ABS])  # type: ignore
-    abs_min = absinfo[event.code].min
-    abs_max = absinfo[event.code].max
+    return _calculate_trigger_point(event.code, analog_threshold, absinfo[event.code])
+
+
+def _calculate_trigger_point(
+    code: int,
+    analog_threshold: int,
+    absinfo: evdev.AbsInfo,
+) -> Tuple[float, float]:
+    abs_min = absinfo.min
+    abs_max = absinfo.max
 
     assert analog_threshold
     if abs_min == -1 and abs_max == 1:
@@ -53,7 +64,7 @@ def calculate_trigger_point(
             0,
         )
 
-    if event.code in [ABS_GAS, ABS_BRAKE, ABS_Z, ABS_RZ]:
+    if code in [ABS_GAS, ABS_BRAKE, ABS_Z, ABS_RZ]:
         threshold = abs_max * analog_threshold / 100
         # For the L/R triggers, there is only one direction, and the resting
         # position is the same as the min_abs.
@@ -70,3 +81,78 @@ def calculate_trigger_point(
     # threshold, middle
     threshold = middle + trigger_offset
     return threshold, middle
+
+
+class AbsInfoSnapshots:
+    """The absinfo of the EV_ABS axes of each source device, read only once.
+
+    Reading the capabilities of a device requires an ioctl for each of its axes,
+    which is too expensive to do for each joystick event. The limits of the axes
+    don't change while the device is grabbed.
+    """
+
+    def __init__(
+        self,
+        source_devices: Optional[Dict[DeviceHash, evdev.InputDevice]] = None,
+    ) -> None:
+        """Take snapshots of the source_devices right away.
+
+        Others are taken once they are needed.
+        """
+        self._absinfo: Dict[DeviceHash, Dict[int, evdev.AbsInfo]] = {}
+        self._trigger_points: Dict[
+            Tuple[DeviceHash, int, int],
+            Tuple[float, float],
+        ] = {}
+
+        for device_hash, source in (source_devices or {}).items():
+            self._take_snapshot(device_hash, source)
+
+    def _take_snapshot(
+        self,
+        device_hash: DeviceHash,
+        source: evdev.InputDevice,
+    ) -> Dict[int, evdev.AbsInfo]:
+        capabilities = source.capabilities(absinfo=True)
+        absinfo = dict(capabilities.get(EV_ABS) or ())  # type: ignore
+        self._absinfo[device_hash] = absinfo
+        return absinfo
+
+    def get_absinfo(
+        self,
+        event: InputEvent,
+        source: evdev.InputDevice,
+    ) -> evdev.AbsInfo:
+        """Get the absinfo of the axis of the event."""
+        if event.origin_hash is None:
+            # Nothing to identify the device by
+            return dict(source.capabilities(absinfo=True)[EV_ABS])[event.code]
+
+        absinfo = self._absinfo.get(event.origin_hash)
+        if absinfo is None:
+            absinfo = self._take_snapshot(event.origin_hash, source)
+
+        return absinfo[event.code]
+
+    def get_trigger_point(
+        self,
+        event: InputEvent,
+        analog_threshold: int,
+        source: evdev.InputDevice,
+    ) -> Tuple[float, float]:
+        """Like calculate_trigger_point, but only calculated once for each axis."""
+        if event.origin_hash is None:
+            return calculate_trigger_point(event, analog_threshold, source)
+
+        key = (event.origin_hash, event.code, analog_threshold)
+        trigger_point = self._trigger_points.get(key)
+        if trigger_point is None:
+            absinfo = self.get_absinfo(event, source)
+            trigger_point = _calculate_trigger_point(
+                event.code,
+                analog_threshold,
+                absinfo,
+            )
+            self._trigger_points[key] = trigger_point
+
+        return trigger_point
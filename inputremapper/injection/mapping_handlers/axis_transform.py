@@ -17,8 +17,18 @@
 # You should have received a copy of the GNU General Public License
 # along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
 
+import functools
 import math
-from typing import Dict, Union
+from array import array
+from typing import Optional, Union
+
+# Integer ranges up to this size are looked up in a dense table. 16 bit axes fit,
+# and take 512 KiB as an array of doubles.
+MAX_TABLE_SIZE = 2**16 + 1
+
+# How many float inputs to remember. Floats rarely repeat exactly, so anything
+# more would only grow the memory usage over long sessions.
+FLOAT_CACHE_SIZE = 1024
 
 
 class Transformation:
@@ -38,25 +48,63 @@ class Transformation:
         self._deadzone = deadzone
         self._gain = gain
         self._expo = expo
-        self._cache: Dict[float, float] = {}
+
+        # Allocated on the first call, and filled as values come in. Empty if the
+        # range doesn't consist of integers, or is too large.
+        self._table: Optional[array] = None
+        self._calculate_cached = functools.lru_cache(maxsize=FLOAT_CACHE_SIZE)(
+            self._calculate
+        )
 
     def __call__(self, /, x: Union[int, float]) -> float:
-        if x not in self._cache:
-            y = (
-                self._calc_qubic(self._flatten_deadzone(self._normalize(x)))
-                * self._gain
-            )
-            self._cache[x] = y
+        if type(x) is int:
+            table = self._table
+            if table is None:
+                table = self._allocate_table()
+
+            index = x - self._min
+            if 0 <= index < len(table):
+                y = table[index]
+                if y != y:
+                    # NaN, this value wasn't needed yet
+                    y = self._calculate(x)
+                    table[index] = y
 
-        return self._cache[x]
+                return y
 
-    def set_range(self, min_, max_):
-        # TODO docstring
-        if min_ != self._min or max_ != self._max:
-            self._cache = {}
+        return self._calculate_cached(x)
+
+    def set_range(self, min_: Union[int, float], max_: Union[int, float]) -> None:
+        """Change the range of input values that is mapped to -gain and gain.
+
+        Every output depends on the range, so the table is allocated again on the
+        next call. Setting the same range again is free.
+        """
+        if min_ == self._min and max_ == self._max:
+            return
 
         self._min = min_
         self._max = max_
+        self._table = None
+        self._calculate_cached.cache_clear()
+
+    def _allocate_table(self) -> array:
+        """Allocate a slot for each integer between min and max.
+
+        Calculating all of them right away would block the first event of 16 bit
+        axes for a noticeable amount of time, so they start as NaN.
+        """
+        self._table = array("d")
+
+        if type(self._min) is int and type(self._max) is int:
+            size = self._max - self._min + 1
+            if 0 < size <= MAX_TABLE_SIZE:
+                self._table = array("d", [math.nan]) * size
+
+        return self._table
+
+    def _calculate(self, x: Union[int, float]) -> float:
+        return self._calc_qubic(self._flatten_deadzone(self._normalize(x))) * self._gain
 
     def _normalize(self, x: Union[int, float]) -> float:
         """Move and scale x to be between -1 and 1
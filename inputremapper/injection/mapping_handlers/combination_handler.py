@@ -19,10 +19,10 @@
 
 from __future__ import annotations  # needed for the TYPE_CHECKING import
 
-from typing import TYPE_CHECKING, Dict, Hashable, Tuple, List
+from typing import TYPE_CHECKING, Dict, Hashable, Tuple, List, Set
 
 import evdev
-from evdev.ecodes import EV_ABS, EV_REL
+from evdev.ecodes import EV_ABS, EV_REL, EV_KEY
 
 from inputremapper.configs.input_config import InputCombination
 from inputremapper.configs.mapping import Mapping
@@ -38,17 +38,55 @@ if TYPE_CHECKING:
     from inputremapper.injection.context import Context
 
 
+class KeyStates:
+    """A bit for each input of combinations, set while it is pressed.
+
+    Combinations that consist of EV_KEY inputs only share the KeyStates of the
+    Context. They would all track the same state for a given key anyway.
+    """
+
+    __slots__ = ("bits", "pressed", "engaged")
+
+    def __init__(self) -> None:
+        # map of InputEvent.input_match_hash -> bit
+        self.bits: Dict[Hashable, int] = {}
+        self.pressed = 0
+        # Combinations that are active, or that remember key-down events. The
+        # HierarchyHandler has to notify them about each of their keys.
+        self.engaged: Set[CombinationHandler] = set()
+
+    def update(self, bit: int, is_pressed: bool) -> None:
+        """Set or clear the bit."""
+        if is_pressed:
+            self.pressed |= bit
+        else:
+            self.pressed &= ~bit
+
+    def get_bit(self, input_match_hash: Hashable) -> int:
+        """Get the bit of the input, or assign a new one."""
+        bit = self.bits.get(input_match_hash)
+        if bit is None:
+            bit = 1 << len(self.bits)
+            self.bits[input_match_hash] = bit
+
+        return bit
+
+
 class CombinationHandler(MappingHandler):
     """Keeps track of a combination and notifies a sub handler."""
 
-    # map of InputEvent.input_match_hash -> bool , keep track of the combination state
-    _pressed_keys: Dict[Hashable, bool]
+    # The combination is active if all bits of the _mask are set in _key_states
+    _key_states: KeyStates
+    # map of InputEvent.input_match_hash -> bit in _key_states
+    _bits: Dict[Hashable, int]
+    _mask: int
     # the last update we sent to a sub-handler. If this is true, the output key is
     # still being held down.
     _output_previously_active: bool
     _sub_handler: MappingHandler
-    _handled_input_hashes: list[Hashable]
-    _requires_a_release: Dict[Tuple[int, int], bool]
+    # Key-down events that were not forwarded, or whose release was already forwarded.
+    # Every other pressed key of the combination requires a release later on.
+    _handled_key_downs: Set[Tuple[int, int]]
 
     def __init__(
         self,
@@ -60,32 +98,37 @@ class CombinationHandler(MappingHandler):
     ) -> None:
         logger.debug(str(mapping))
         super().__init__(combination, mapping, global_uinputs)
-        self._pressed_keys = {}
         self._output_previously_active = False
         self._context = context
-        self._requires_a_release = {}
+        self._handled_key_downs = set()
 
-        # prepare a key map for all events with non-zero value
+        # The pressed-state of EV_ABS and EV_REL inputs depends on the threshold of
+        # the handler in front of this one, so they can't be shared.
+        if all(input_config.type == EV_KEY for input_config in combination):
+            self._key_states = context.key_states
+        else:
+            self._key_states = KeyStates()
+
+        self._bits = {}
+        self._mask = 0
         for input_config in combination:
             assert not input_config.defines_analog_input
-            self._pressed_keys[input_config.input_match_hash] = False
+            bit = self._key_states.get_bit(input_config.input_match_hash)
+            self._bits[input_config.input_match_hash] = bit
+            self._mask |= bit
 
-        self._handled_input_hashes = [
-            input_config.input_match_hash for input_config in combination
-        ]
-
-        assert len(self._pressed_keys) > 0  # no combination handler without a key
+        assert len(self._bits) > 0  # no combination handler without a key
 
     def __str__(self):
         return (
             f'CombinationHandler for "{str(self.mapping.input_combination)}" '
-            f"{tuple(t for t in self._pressed_keys.keys())}"
+            f"{tuple(t for t in self._bits.keys())}"
         )
 
     def __repr__(self):
         description = (
             f'CombinationHandler for "{repr(self.mapping.input_combination)}" '
-            f"{tuple(t for t in self._pressed_keys.keys())}"
+            f"{tuple(t for t in self._bits.keys())}"
         )
         return f"<{description} at {hex(id(self))}>"
 
@@ -98,7 +141,8 @@ class CombinationHandler(MappingHandler):
         source: evdev.InputDevice,
         suppress: bool = False,
     ) -> bool:
-        if event.input_match_hash not in self._handled_input_hashes:
+        bit = self._bits.get(event.input_match_hash)
+        if bit is None:
             # we are not responsible for the event
             return False
 
@@ -106,20 +150,43 @@ class CombinationHandler(MappingHandler):
         # The value of non-key input should have been changed to either 0 or 1 at this
         # point by other handlers.
         is_pressed = event.is_pressed()
-        self._pressed_keys[event.input_match_hash] = is_pressed
+        was_pressed = bool(self._key_states.pressed & bit)
+        self._key_states.update(bit, is_pressed)
+
         # maybe this changes the activation status (triggered/not-triggered)
-        changed = self._is_activated() != self._output_previously_active
+        is_activated = self._key_states.pressed & self._mask == self._mask
+        changed = is_activated != self._output_previously_active
 
         if changed:
             if is_pressed:
-                return self._handle_freshly_activated(suppress, event, source)
+                handled = self._handle_freshly_activated(suppress, event, source)
             else:
-                return self._handle_freshly_deactivated(event, source)
+                handled = self._handle_freshly_deactivated(event, source, was_pressed)
         else:
             if is_pressed:
-                return self._handle_no_change_press(event)
+                handled = self._handle_no_change_press(event)
             else:
-                return self._handle_no_change_release(event)
+                handled = self._handle_no_change_release(event, was_pressed)
+
+        self._update_engaged()
+        return handled
+
+    def get_required_bits(self, key_states: KeyStates) -> int:
+        """Get the bits that need to be set in key_states to activate the combination.
+
+        0 if the combination doesn't track its state in key_states.
+        """
+        if self._key_states is not key_states:
+            return 0
+
+        return self._mask
+
+    def _update_engaged(self) -> None:
+        """Tell the HierarchyHandler if this combination can skip events."""
+        if self._output_previously_active or self._handled_key_downs:
+            self._key_states.engaged.add(self)
+        else:
+            self._key_states.engaged.discard(self)
 
     def _handle_no_change_press(self, event: InputEvent) -> bool:
         """A key was pressed, but this doesn't change the combinations activation state.
@@ -134,11 +201,11 @@ class CombinationHandler(MappingHandler):
         # output inactive: forward the event
         return self._output_previously_active
 
-    def _handle_no_change_release(self, event: InputEvent) -> bool:
+    def _handle_no_change_release(self, event: InputEvent, was_pressed: bool) -> bool:
         """One of the combinations keys was released, but it didn't untrigger the
         combination yet."""
         # Negate: `False` means that the event-reader will forward the release.
-        return not self._should_release_event(event)
+        return not self._should_release_event(event, was_pressed)
 
     def _handle_freshly_activated(
         self,
@@ -148,16 +215,14 @@ class CombinationHandler(MappingHandler):
     ) -> bool:
         """The combination was deactivated, but is activated now."""
         if suppress:
+            # Someone else handled the key-down event
+            self._require_release_later(False, event)
             return False
 
         # Send key up events to the forwarded uinput if configured to do so.
-        self._forward_release()
+        self._forward_release(event)
 
-        logger.debug(
-            "Sending %s to sub-handler %s",
-            repr(event),
-            repr(self._sub_handler),
-        )
+        logger.debug("Sending %r to sub-handler %r", event, self._sub_handler)
         self._output_previously_active = event.is_pressed()
         sub_handler_result = self._sub_handler.notify(event, source, suppress)
 
@@ -170,6 +235,7 @@ class CombinationHandler(MappingHandler):
         self,
         event: InputEvent,
         source: evdev.InputDevice,
+        was_pressed: bool,
     ) -> bool:
         """The combination was activated, but is deactivated now."""
         # We ignore the `suppress` argument for release events. Otherwise, we
@@ -177,22 +243,18 @@ class CombinationHandler(MappingHandler):
         # In the case of output axis, this will enable us to activate multiple
         # axis with the same button.
 
-        logger.debug(
-            "Sending %s to sub-handler %s",
-            repr(event),
-            repr(self._sub_handler),
-        )
+        logger.debug("Sending %r to sub-handler %r", event, self._sub_handler)
         self._output_previously_active = event.is_pressed()
         self._sub_handler.notify(event, source, suppress=False)
 
         # Negate: `False` means that the event-reader will forward the release.
-        return not self._should_release_event(event)
+        return not self._should_release_event(event, was_pressed)
 
-    def _should_release_event(self, event: InputEvent) -> bool:
+    def _should_release_event(self, event: InputEvent, was_pressed: bool) -> bool:
         """Check if the key-up event should be forwarded by the event-reader.
 
         After this, the release event needs to be injected by someone, otherwise the
-        dictionary was modified erroneously. If there is no entry, we assume that there
+        set was modified erroneously. If the key was not pressed, we assume that there
         was no key-down event to release. Maybe a duplicate event arrived.
         """
         # Ensure that all injected key-down events will get their release event
@@ -203,41 +265,47 @@ class CombinationHandler(MappingHandler):
         # release is injected as well. So we get two release events in that case:
         # one for the key, and one for the output.
         assert event.is_pressed() == 0, f"expected {event.is_pressed()} to be 0"
-        return self._requires_a_release.pop(event.type_and_code, False)
+        if event.type_and_code in self._handled_key_downs:
+            self._handled_key_downs.remove(event.type_and_code)
+            return False
+
+        return was_pressed
 
     def _require_release_later(self, require: bool, event: InputEvent) -> None:
         """Remember if this key-down event will need a release event later on."""
         assert event.is_pressed() == 1
-        self._requires_a_release[event.type_and_code] = require
+        if require:
+            self._handled_key_downs.discard(event.type_and_code)
+        else:
+            self._handled_key_downs.add(event.type_and_code)
 
     def reset(self) -> None:
         self._sub_handler.reset()
-        for key in self._pressed_keys:
-            self._pressed_keys[key] = False
-        self._requires_a_release = {}
+        self._key_states.pressed &= ~self._mask
+        self._handled_key_downs = set()
         self._output_previously_active = False
+        self._key_states.engaged.discard(self)
 
-    def _is_activated(self) -> bool:
-        """Return if all keys in the keymap are set to True."""
-        return False not in self._pressed_keys.values()
-
-    def _forward_release(self) -> None:
+    def _forward_release(self, event: InputEvent) -> None:
         """Forward a button release for all keys if this is a combination.
 
         This might cause duplicate key-up events but those are ignored by evdev anyway
         """
-        if len(self._pressed_keys) == 1 or not self.mapping.release_combination_keys:
+        if len(self._bits) == 1 or not self.mapping.release_combination_keys:
             return
 
-        keys_to_release = filter(
-            lambda cfg: self._pressed_keys.get(cfg.input_match_hash),
-            self.mapping.input_combination,
-        )
-
         logger.debug("Forwarding release for %s", self.mapping.input_combination)
 
-        for input_config in keys_to_release:
-            if not self._requires_a_release.get(input_config.type_and_code):
+        for input_config in self.mapping.input_combination:
+            bit = self._bits.get(input_config.input_match_hash, 0)
+            if not self._key_states.pressed & bit:
+                continue
+
+            if input_config.type_and_code == event.type_and_code:
+                # This key-down event is the one that activates the combination
+                continue
+
+            if input_config.type_and_code in self._handled_key_downs:
                 continue
 
             origin_hash = input_config.origin_hash
@@ -249,11 +317,14 @@ class CombinationHandler(MappingHandler):
 
             forward_to = self._context.get_forward_uinput(origin_hash)
             logger.write(input_config, forward_to)
-            forward_to.write(*input_config.type_and_code, 0)
-            forward_to.syn()
-
-            # We are done with this key, forget about it
-            del self._requires_a_release[input_config.type_and_code]
+            self.global_uinputs.forward(
+                forward_to,
+                (*input_config.type_and_code, 0),
+                sync=True,
+            )
+
+            # We are done with this key, don't release it again
+            self._handled_key_downs.add(input_config.type_and_code)
 
     def needs_ranking(self) -> bool:
         return bool(self.input_configs)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Count the calls of each handler and the time spent in them."""
+
+from __future__ import annotations
+
+import functools
+import time
+from typing import Dict, Iterable, List
+
+import evdev
+
+from inputremapper.injection.mapping_handlers.mapping_handler import (
+    MappingHandler,
+    NotifyCallback,
+)
+from inputremapper.input_event import InputEvent
+
+
+class HandlerProfile:
+    __slots__ = ("calls", "handled", "time")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        # How many events notify returned True for. The others may be forwarded.
+        self.handled = 0
+        # Including the time spent in the sub-handlers
+        self.time = 0.0
+
+    def __str__(self) -> str:
+        if self.calls == 0:
+            return "0 calls"
+
+        return (
+            f"{self.calls} calls, "
+            f"{self.handled / self.calls:.0%} handled, "
+            f"{self.time * 1000:.3f} ms total, "
+            f"{self.time / self.calls * 1000000:.2f} µs per call"
+        )
+
+
+class HandlerProfiler:
+    """Wraps the notify method of each handler in the tree to measure it.
+
+    The handlers are only touched while profiling is enabled, so that there is no
+    overhead otherwise. Callers that hold on to notify methods, like the dispatch
+    index of the Context, need to get them again after enabling or disabling it.
+    """
+
+    def __init__(self, handlers: Iterable[MappingHandler]) -> None:
+        """Profile the handlers, and all of their children."""
+        # The same handler might be the entry point for multiple events
+        self._roots = list(dict.fromkeys(handlers))
+        self._profiles: Dict[MappingHandler, HandlerProfile] = {}
+
+    def _walk(self, handler: MappingHandler) -> Iterable[MappingHandler]:
+        yield handler
+        for child in handler.get_children():
+            yield from self._walk(child)
+
+    def enable(self) -> None:
+        for root in self._roots:
+            for handler in self._walk(root):
+                if handler in self._profiles:
+                    continue
+
+                profile = HandlerProfile()
+                self._profiles[handler] = profile
+                # The instance attribute shadows the method of the class
+                handler.notify = self._wrap(handler, profile)  # type: ignore
+
+    def disable(self) -> None:
+        for handler in self._profiles:
+            del handler.notify
+
+        self._profiles = {}
+
+    @staticmethod
+    def _wrap(handler: MappingHandler, profile: HandlerProfile) -> NotifyCallback:
+        notify = handler.notify
+
+        @functools.wraps(notify)
+        def profiled_notify(
+            event: InputEvent,
+            source: evdev.InputDevice,
+            suppress: bool = False,
+        ) -> bool:
+            start = time.perf_counter()
+            handled = notify(event, source=source, suppress=suppress)
+            profile.time += time.perf_counter() - start
+            profile.calls += 1
+            profile.handled += handled
+            return handled
+
+        # Like a bound method, so that it can still be told which handler it is for.
+        # See get_handler_kind.
+        profiled_notify.__self__ = handler  # type: ignore
+        return profiled_notify
+
+    def format(self) -> str:
+        """Describe the tree of handlers, and how each of them performed."""
+        lines: List[str] = []
+
+        def describe(handler: MappingHandler, indent: int) -> None:
+            lines.append(f"{'    ' * indent}{handler}: {self._profiles[handler]}")
+            for child in handler.get_children():
+                describe(child, indent + 1)
+
+        for root in self._roots:
+            describe(root, 0)
+
+        return "\n".join(lines)
@@ -17,13 +17,17 @@
 # You should have received a copy of the GNU General Public License
 # along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 import evdev
 from evdev.ecodes import EV_ABS, EV_REL
 
 from inputremapper.configs.input_config import InputCombination, InputConfig
 from inputremapper.injection.global_uinputs import GlobalUInputs
+from inputremapper.injection.mapping_handlers.combination_handler import (
+    CombinationHandler,
+    KeyStates,
+)
 from inputremapper.injection.mapping_handlers.mapping_handler import (
     MappingHandler,
     HandlerEnums,
@@ -36,15 +40,35 @@ class HierarchyHandler(MappingHandler):
 
     only the first handler which successfully handles the event will execute it,
     all other handlers will be notified, but suppressed
+
+    If the combinations share the KeyStates, only those that could change their
+    state are notified. A combination that is inactive and can't be activated by
+    the event would only update the KeyStates, which the HierarchyHandler does on
+    their behalf.
     """
 
     _input_config: InputConfig
+    _key_states: Optional[KeyStates]
+    # The bit of the input_config in _key_states
+    _bit: int
+    # map of handler -> index in self.handlers, for handlers that can be skipped
+    _ranks: Dict[MappingHandler, int]
+    # indices of handlers that are notified about every event
+    _always: List[int]
+    # indices of combinations that only consist of the input_config
+    _on_press: List[int]
+    # map of a bit -> (index, required bits) of combinations that can only be
+    # activated while that bit is set. Decides which combinations a key-down event
+    # could activate, by looking at the few keys that are held down.
+    _by_held_bit: Dict[int, List[Tuple[int, int]]]
+    _held_bits: int
 
     def __init__(
         self,
         handlers: List[MappingHandler],
         input_config: InputConfig,
         global_uinputs: GlobalUInputs,
+        key_states: Optional[KeyStates] = None,
     ) -> None:
         self.handlers = handlers
         self._input_config = input_config
@@ -52,6 +76,47 @@ class HierarchyHandler(MappingHandler):
         # use the mapping from the first child TODO: find a better solution
         mapping = handlers[0].mapping
         super().__init__(combination, mapping, global_uinputs)
+        self._compile(key_states)
+
+    def _compile(self, key_states: Optional[KeyStates]) -> None:
+        """Build the table that decides which handlers to notify."""
+        self._ranks = {}
+        self._always = []
+        self._on_press = []
+        self._by_held_bit = {}
+        self._held_bits = 0
+        self._key_states = None
+        self._bit = 0
+
+        if key_states is None:
+            return
+
+        bit = key_states.bits.get(self._input_config.input_match_hash)
+        if bit is None:
+            return
+
+        self._key_states = key_states
+        self._bit = bit
+
+        for rank, handler in enumerate(self.handlers):
+            required_bits = 0
+            if isinstance(handler, CombinationHandler):
+                required_bits = handler.get_required_bits(key_states)
+
+            if not required_bits & bit:
+                self._always.append(rank)
+                continue
+
+            self._ranks[handler] = rank
+            other_bits = required_bits & ~bit
+            if other_bits == 0:
+                self._on_press.append(rank)
+                continue
+
+            # Any bit would do, the lowest one is the cheapest to get
+            held_bit = other_bits & -other_bits
+            self._by_held_bit.setdefault(held_bit, []).append((rank, other_bits))
+            self._held_bits |= held_bit
 
     def __str__(self):
         return f"HierarchyHandler for {self._input_config}"
@@ -71,8 +136,63 @@ class HierarchyHandler(MappingHandler):
         if event.input_match_hash != self._input_config.input_match_hash:
             return False
 
+        if self._key_states is None:
+            return self._notify_ranked(self.handlers, event, source)
+
+        handlers = self._get_handlers_to_notify(event)
+        handled = self._notify_ranked(handlers, event, source)
+        self._key_states.update(self._bit, event.is_pressed())
+        return handled
+
+    def _get_handlers_to_notify(self, event: InputEvent) -> List[MappingHandler]:
+        """Find the handlers that could change their state due to the event."""
+        assert self._key_states is not None
+        pressed = self._key_states.pressed
+        is_pressed = event.is_pressed()
+
+        if not is_pressed and not pressed & self._bit:
+            # A release without a key-down event. Let all of them decide.
+            return self.handlers
+
+        ranks = set(self._always)
+        if is_pressed:
+            ranks.update(self._on_press)
+            held_bits = pressed & self._held_bits
+            while held_bits:
+                held_bit = held_bits & -held_bits
+                held_bits ^= held_bit
+                for rank, other_bits in self._by_held_bit[held_bit]:
+                    if pressed & other_bits == other_bits:
+                        ranks.add(rank)
+
+        for handler in self._key_states.engaged:
+            rank = self._ranks.get(handler)
+            if rank is not None:
+                ranks.add(rank)
+
+        return [self.handlers[rank] for rank in sorted(ranks)]
+
+    def _notify_ranked(
+        self,
+        handlers: List[MappingHandler],
+        event: InputEvent,
+        source: evdev.InputDevice,
+    ) -> bool:
+        """Notify the handlers in order, until one of them handles the event."""
         handled = False
-        for handler in self.handlers:
+        was_pressed = 0
+        if self._key_states is not None:
+            was_pressed = self._key_states.pressed & self._bit
+
+        for handler in handlers:
+            if self._key_states is not None:
+                # Each combination updates the shared bit itself. The next one needs
+                # to see it as it was before the event, otherwise it would think
+                # that a released key was never pressed, and swallow the release.
+                self._key_states.pressed = (
+                    self._key_states.pressed & ~self._bit
+                ) | was_pressed
+
             if handled:
                 # To allow an arbitrary number of output axes to be activated at the
                 # same time, we don't suppress them.
@@ -19,13 +19,14 @@
 
 import asyncio
 import traceback
-from typing import Dict, Callable, Tuple, List
+from typing import Dict, Callable, Tuple, List, Optional
 
 from inputremapper.configs.input_config import InputCombination
 from inputremapper.configs.mapping import Mapping
 from inputremapper.injection.global_uinputs import GlobalUInputs
 from inputremapper.injection.macros.macro import Macro
 from inputremapper.injection.macros.parse import Parser
+from inputremapper.injection.macros.program import compile_macro
 from inputremapper.injection.mapping_handlers.mapping_handler import (
     ContextProtocol,
     HandlerEnums,
@@ -41,6 +42,11 @@ class MacroHandler(MappingHandler):
     # TODO: replace this by the macro itself
     _macro: Macro
     _active: bool
+    # The running macro
+    _macro_future: Optional[asyncio.Future]
+
+    # Run macros as flat programs. See compile_macro.
+    compile_macros: bool = False
 
     def __init__(
         self,
@@ -53,8 +59,11 @@ class MacroHandler(MappingHandler):
         super().__init__(combination, mapping, global_uinputs)
         self._pressed_keys: Dict[Tuple[int, int], int] = {}
         self._active = False
+        self._macro_future = None
         assert self.mapping.output_symbol is not None
         self._macro = Parser.parse(self.mapping.output_symbol, context, mapping)
+        if self.compile_macros:
+            compile_macro(self._macro)
 
     def __str__(self):
         return f"MacroHandler maps to {self._macro} on {self.mapping.target_uinput}"
@@ -89,7 +98,7 @@ class MacroHandler(MappingHandler):
                     self.mapping.target_uinput,
                 )
 
-            asyncio.ensure_future(self.run_macro(handler))
+            self._macro_future = asyncio.ensure_future(self.run_macro(handler))
             return True
         else:
             self._active = False
@@ -100,15 +109,23 @@ class MacroHandler(MappingHandler):
     def reset(self) -> None:
         self._active = False
 
+        # Stop the macro, otherwise macros like repeat or mouse would go on forever
+        # after the injection stopped or the preset was replaced.
+        self._macro.release_trigger()
+        if self._macro_future is not None:
+            self._macro_future.cancel()
+            self._macro_future = None
+
         # To avoid a key hanging forever. Can be pretty annoying, especially if it is
         # a modifier that makes you unable to interact with your system.
-        for (type, code), value in self._pressed_keys.items():
-            if value == 1:
-                logger.debug("Releasing key %s", (type, code, value))
-                self.global_uinputs.write(
-                    (type, code, 0),
-                    self.mapping.target_uinput,
-                )
+        with self.global_uinputs.frame():
+            for (type, code), value in self._pressed_keys.items():
+                if value == 1:
+                    logger.debug("Releasing key %s", (type, code, value))
+                    self.global_uinputs.write(
+                        (type, code, 0),
+                        self.mapping.target_uinput,
+                    )
 
     def needs_wrapping(self) -> bool:
         return True
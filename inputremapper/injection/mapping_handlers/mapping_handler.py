@@ -61,26 +61,43 @@ Step 2 and 3:
 from __future__ import annotations
 
 import enum
-from typing import Dict, Protocol, Set, Optional, List
+from typing import TYPE_CHECKING, Dict, Protocol, Set, Optional, List
 
 import evdev
 
 from inputremapper.configs.input_config import InputCombination, InputConfig
 from inputremapper.configs.mapping import Mapping
 from inputremapper.exceptions import MappingParsingError
+from inputremapper.injection.event_barrier import EventBarrier
+from inputremapper.injection.mapping_handlers.abs_util import AbsInfoSnapshots
 from inputremapper.injection.global_uinputs import GlobalUInputs
+from inputremapper.injection.tick_scheduler import TickScheduler
 from inputremapper.input_event import InputEvent
 from inputremapper.logging.logger import logger
 
+if TYPE_CHECKING:
+    from inputremapper.injection.mapping_handlers.combination_handler import (
+        KeyStates,
+    )
+
 
 class EventListener(Protocol):
-    async def __call__(self, event: evdev.InputEvent) -> None: ...
+    """Receives each event before the handlers do.
+
+    Return an EventBarrier to hold the event back from the handlers, until the
+    listener released it.
+    """
+
+    async def __call__(self, event: evdev.InputEvent) -> Optional[EventBarrier]: ...
 
 
 class ContextProtocol(Protocol):
     """The parts from context needed for handlers."""
 
     listeners: Set[EventListener]
+    absinfo_snapshots: AbsInfoSnapshots
+    tick_scheduler: TickScheduler
+    key_states: KeyStates
 
     def get_forward_uinput(self, origin_hash) -> evdev.UInput:
         pass
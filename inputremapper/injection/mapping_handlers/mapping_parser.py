@@ -117,22 +117,27 @@ class MappingParser:
 
         # figure out which handlers need ranking and wrap them with hierarchy_handlers
         need_ranking = defaultdict(set)
-        for handler in handlers.copy():
-            if handler.needs_ranking():
-                combination = handler.rank_by()
-                if not combination:
-                    raise MappingParsingError(
-                        f"{type(handler).__name__} claims to need ranking but does not "
-                        f"return a combination to rank by",
-                        mapping_handler=handler,
-                    )
-
-                need_ranking[combination].add(handler)
-                handlers.remove(handler)
+        unranked_handlers = []
+        for handler in handlers:
+            if not handler.needs_ranking():
+                unranked_handlers.append(handler)
+                continue
+
+            combination = handler.rank_by()
+            if not combination:
+                raise MappingParsingError(
+                    f"{type(handler).__name__} claims to need ranking but does not "
+                    f"return a combination to rank by",
+                    mapping_handler=handler,
+                )
+
+            need_ranking[combination].add(handler)
+
+        handlers = unranked_handlers
 
         # the HierarchyHandler's might not be the starting point of the event pipeline,
         # layer other handlers on top again.
-        ranked_handlers = self._create_hierarchy_handlers(need_ranking)
+        ranked_handlers = self._create_hierarchy_handlers(need_ranking, context)
         for handler in ranked_handlers:
             handlers.extend(
                 self._create_event_pipeline(handler, context, ignore_ranking=True)
@@ -253,24 +258,21 @@ class MappingParser:
     def _create_hierarchy_handlers(
         self,
         handlers: Dict[InputCombination, Set[MappingHandler]],
+        context: ContextProtocol,
     ) -> Set[MappingHandler]:
         """Sort handlers by input events and create Hierarchy handlers."""
         sorted_handlers = set()
-        all_combinations = handlers.keys()
-        events = set()
 
-        # gather all InputEvents from all handlers
-        for combination in all_combinations:
-            for event in combination:
-                events.add(event)
+        # find all combinations (from handlers) which contain each event
+        combinations_by_event: Dict[InputConfig, List[InputCombination]] = defaultdict(
+            list
+        )
+        for combination in handlers:
+            for event in dict.fromkeys(combination):
+                combinations_by_event[event].append(combination)
 
         # create a ranking for each event
-        for event in events:
-            # find all combinations (from handlers) which contain the event
-            combinations_with_event = [
-                combination for combination in all_combinations if event in combination
-            ]
-
+        for event, combinations_with_event in combinations_by_event.items():
             if len(combinations_with_event) == 1:
                 # there was only one handler containing that event return it as is
                 sorted_handlers.update(handlers[combinations_with_event[0]])
@@ -291,6 +293,7 @@ class MappingParser:
                     sub_handlers,
                     event,
                     self.global_uinputs,
+                    context.key_states,
                 )
             )
             for handler in sub_handlers:
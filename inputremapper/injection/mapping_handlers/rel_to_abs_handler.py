@@ -17,7 +17,6 @@
 # You should have received a copy of the GNU General Public License
 # along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
 
-import asyncio
 from typing import Tuple, Dict, Optional, List
 
 import evdev
@@ -39,6 +38,7 @@ from inputremapper.configs.mapping import (
     REL_XY_SCALING,
     DEFAULT_REL_RATE,
 )
+from inputremapper.injection.deadline_timer import DeadlineTimer
 from inputremapper.injection.global_uinputs import GlobalUInputs
 from inputremapper.injection.mapping_handlers.axis_transform import Transformation
 from inputremapper.injection.mapping_handlers.mapping_handler import (
@@ -62,9 +62,8 @@ class RelToAbsHandler(MappingHandler):
     _transform: Transformation
     _target_absinfo: evdev.AbsInfo
 
-    # infinite loop which centers the output when input stops
-    _recenter_loop: Optional[asyncio.Task]
-    _moving: asyncio.Event  # event to notify the _recenter_loop
+    # centers the output when the input stops
+    _recenter_timer: DeadlineTimer
 
     _previous_event: Optional[InputEvent]
     _observed_rate: float  # input events per second
@@ -100,8 +99,7 @@ class RelToAbsHandler(MappingHandler):
             gain=mapping.gain,
             expo=mapping.expo,
         )
-        self._moving = asyncio.Event()
-        self._recenter_loop = None
+        self._recenter_timer = DeadlineTimer(mapping.release_timeout, self._recenter)
 
         self._previous_event = None
         self._observed_rate = DEFAULT_REL_RATE
@@ -170,15 +168,11 @@ class RelToAbsHandler(MappingHandler):
             return False
 
         if EventActions.recenter in event.actions:
-            if self._recenter_loop:
-                self._recenter_loop.cancel()
+            self._recenter_timer.cancel()
             self._recenter()
             return True
 
-        if not self._recenter_loop or self._recenter_loop.cancelled():
-            self._recenter_loop = asyncio.create_task(self._create_recenter_loop())
-
-        self._moving.set()  # notify the _recenter_loop
+        self._recenter_timer.push()
         try:
             self._write(self._scale_to_target(self._transform(event.value)))
             return True
@@ -186,31 +180,13 @@ class RelToAbsHandler(MappingHandler):
             return False
 
     def reset(self) -> None:
-        if self._recenter_loop:
-            self._recenter_loop.cancel()
+        self._recenter_timer.cancel()
         self._recenter()
 
     def _recenter(self) -> None:
         """Recenter the output."""
         self._write(self._scale_to_target(0))
 
-    async def _create_recenter_loop(self) -> None:
-        """Coroutine which waits for the input to start moving,
-        then waits until the input stops moving, centers the output and repeat.
-
-        Runs forever.
-        """
-        while True:
-            await self._moving.wait()  # input moving started
-            while (
-                await asyncio.wait(
-                    (asyncio.create_task(self._moving.wait()),),
-                    timeout=self.mapping.release_timeout,
-                )
-            )[0]:
-                self._moving.clear()  # still moving
-            self._recenter()  # input moving stopped
-
     def _scale_to_target(self, x: float) -> int:
         """Scales a x value between -1 and 1 to an integer between
         target_absinfo.min and target_absinfo.max
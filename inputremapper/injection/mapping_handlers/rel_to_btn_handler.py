@@ -17,15 +17,14 @@
 # You should have received a copy of the GNU General Public License
 # along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
 
-import asyncio
-import time
-from typing import List
+from typing import List, Optional
 
 import evdev
 from evdev.ecodes import EV_REL
 
 from inputremapper.configs.input_config import InputCombination, InputConfig
 from inputremapper.configs.mapping import Mapping
+from inputremapper.injection.deadline_timer import DeadlineTimer
 from inputremapper.injection.global_uinputs import GlobalUInputs
 from inputremapper.injection.mapping_handlers.mapping_handler import (
     MappingHandler,
@@ -43,7 +42,7 @@ class RelToBtnHandler(MappingHandler):
 
     _active: bool
     _input_config: InputConfig
-    _last_activation: float
+    _release_timer: DeadlineTimer
     _sub_handler: MappingHandler
 
     def __init__(
@@ -57,8 +56,10 @@ class RelToBtnHandler(MappingHandler):
 
         self._active = False
         self._input_config = combination[0]
-        self._last_activation = time.time()
-        self._abort_release = False
+        # Released once no event above the threshold arrived for the release_timeout
+        self._release_timer = DeadlineTimer(mapping.release_timeout, self._release)
+        self._release_source: Optional[evdev.InputDevice] = None
+        self._release_suppress = False
         assert self._input_config.analog_threshold != 0
         assert len(combination) == 1
 
@@ -71,21 +72,7 @@ class RelToBtnHandler(MappingHandler):
     def get_children(self) -> List[MappingHandler]:
         return [self._sub_handler]
 
-    async def _stage_release(
-        self,
-        source: evdev.InputDevice,
-        suppress: bool,
-    ):
-        # Debounce the release of the button every time notify is called. I think the
-        # efficiency of polling outweighs doing this event-based, which would require
-        # creating new task objects with every single cursor movement event.
-        while time.time() < self._last_activation + self.mapping.release_timeout:
-            await asyncio.sleep(1 / self.mapping.rel_rate)
-
-        if self._abort_release:
-            self._abort_release = False
-            return
-
+    def _release(self) -> None:
         event = InputEvent(
             0,
             0,
@@ -95,7 +82,11 @@ class RelToBtnHandler(MappingHandler):
             origin_hash=self._input_config.origin_hash,
         )
         logger.debug("Sending %s to sub_handler", event)
-        self._sub_handler.notify(event, source, suppress)
+        self._sub_handler.notify(
+            event,
+            self._release_source,
+            self._release_suppress,
+        )
         self._active = False
 
     def notify(
@@ -113,30 +104,30 @@ class RelToBtnHandler(MappingHandler):
         if (value < threshold > 0) or (value > threshold < 0):
             # The axis is below the threshold. Either ignore or release the key
             if self._active:
-                # the stage_release function is running
+                # the release timer is running
 
                 if self.mapping.force_release_timeout:
-                    # Wait for _stage_release to inject the release after the timeout
+                    # Wait for the release timer to inject the release after the timeout
                     return True
 
                 # Release immediately, don't wait
                 event = event.modify(pressed=False, actions=(EventActions.as_key,))
                 logger.debug("Sending %s to sub_handler", event)
-                self._abort_release = True
+                self._release_timer.cancel()
             else:
                 # don't consume the event.
                 return False
         else:
             # The axis is above the threshold. Press the key
-            if not self._active:
-                asyncio.ensure_future(self._stage_release(source, suppress))
+            self._release_source = source
+            self._release_suppress = suppress
+            self._release_timer.push()
 
             if value >= threshold > 0:
                 direction = 1
             else:
                 direction = -1
 
-            self._last_activation = time.time()
             event = event.modify(
                 pressed=True,
                 direction=direction,
@@ -148,8 +139,6 @@ class RelToBtnHandler(MappingHandler):
         return self._sub_handler.notify(event, source=source, suppress=suppress)
 
     def reset(self) -> None:
-        if self._active:
-            self._abort_release = True
-
+        self._release_timer.cancel()
         self._active = False
         self._sub_handler.reset()
@@ -229,14 +229,15 @@ class RelToRelHandler(MappingHandler):
             if is_wheel_output or is_hi_res_wheel_output:
                 # inject both kinds of wheels, otherwise wheels don't work for some
                 # people. See issue #354
-                self._write(
-                    REL_HWHEEL if horizontal else REL_WHEEL,
-                    self._wheel_remainder.input(transformed),
-                )
-                self._write(
-                    REL_HWHEEL_HI_RES if horizontal else REL_WHEEL_HI_RES,
-                    self._wheel_hi_res_remainder.input(transformed),
-                )
+                with self.global_uinputs.frame():
+                    self._write(
+                        REL_HWHEEL if horizontal else REL_WHEEL,
+                        self._wheel_remainder.input(transformed),
+                    )
+                    self._write(
+                        REL_HWHEEL_HI_RES if horizontal else REL_WHEEL_HI_RES,
+                        self._wheel_hi_res_remainder.input(transformed),
+                    )
             else:
                 self._write(
                     self.mapping.output_code,
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Drives everything that keeps injecting events while an input is held."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Dict, Optional, Tuple
+
+from inputremapper.injection.global_uinputs import GlobalUInputs
+from inputremapper.injection.latency import LatencyOrigin, latency_origin
+
+# Called once per tick, returns False once it is done
+Emitter = Callable[[], bool]
+
+# Resolved once the emitter is done, and the event that started the emitter
+_EmitterState = Tuple[asyncio.Future, Optional[LatencyOrigin]]
+
+
+class TickScheduler:
+    """Calls all emitters that share a rate from a single timer.
+
+    Joysticks mapped to the mouse, mouse and wheel macros and so on used to sleep
+    in their own loops, which woke the process up for each of them, and let their
+    output drift apart. All emitters of a tick write within the same frame, so
+    each uinput is synced only once per tick, and simultaneous X, Y and wheel
+    movements stay aligned.
+
+    There is one scheduler per injection, see Context.
+    """
+
+    def __init__(self, global_uinputs: Optional[GlobalUInputs] = None) -> None:
+        self._global_uinputs = global_uinputs
+        self._emitters: Dict[float, Dict[Emitter, _EmitterState]] = {}
+        self._clocks: Dict[float, asyncio.Task] = {}
+
+    async def run(self, rate: float, emitter: Emitter) -> None:
+        """Call the emitter rate times per second, until it returns False.
+
+        The first call happens right away, so that starting to move doesn't have to
+        wait for the next tick. Exceptions of the emitter are raised here.
+        """
+        with self._frame():
+            if not emitter():
+                return
+
+        emitters = self._emitters.get(rate)
+        if emitters is None:
+            emitters = {}
+            self._emitters[rate] = emitters
+            self._clocks[rate] = asyncio.create_task(self._tick(rate, emitters))
+
+        done = asyncio.get_running_loop().create_future()
+        emitters[emitter] = (done, latency_origin.get())
+        try:
+            await done
+        finally:
+            # In case the task that awaits this was cancelled
+            emitters.pop(emitter, None)
+
+    def get_num_emitters(self) -> int:
+        return sum(len(emitters) for emitters in self._emitters.values())
+
+    def _frame(self) -> ContextManager:
+        if self._global_uinputs is None:
+            return nullcontext()
+
+        return self._global_uinputs.frame()
+
+    async def _tick(
+        self,
+        rate: float,
+        emitters: Dict[Emitter, _EmitterState],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        interval = 1 / rate
+        deadline = loop.time()
+
+        while emitters:
+            # Sleep until an absolute deadline, so that errors don't add up
+            deadline += interval
+            now = loop.time()
+            if deadline < now:
+                # Don't try to catch up after the loop was blocked for a while
+                deadline = now
+
+            await asyncio.sleep(deadline - now)
+
+            with self._frame():
+                for emitter, (done, origin) in list(emitters.items()):
+                    if done.done():
+                        # Cancelled
+                        del emitters[emitter]
+                        continue
+
+                    # The clock belongs to whichever emitter started it, each emitter
+                    # has to be recorded under the event that started it instead.
+                    token = latency_origin.set(origin)
+                    try:
+                        keep_going = emitter()
+                    except Exception as exception:
+                        del emitters[emitter]
+                        done.set_exception(exception)
+                        continue
+                    finally:
+                        latency_origin.reset(token)
+
+                    if not keep_going:
+                        del emitters[emitter]
+                        done.set_result(None)
+
+        del self._emitters[rate]
+        del self._clocks[rate]
@@ -20,7 +20,7 @@
 from __future__ import annotations
 
 import enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Tuple, Optional, Hashable, Literal
 
 import evdev
@@ -37,8 +37,7 @@ class EventActions(enum.Enum):
     none = enum.auto()
 
 
-# Todo: add slots=True as soon as python 3.10 is in common distros
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class InputEvent:
     """Events that are generated during runtime.
 
@@ -58,6 +57,21 @@ class InputEvent:
     actions: Tuple[EventActions, ...] = ()
     origin_hash: Optional[DeviceHash] = None
 
+    # Each handler in the event pipeline checks it, so it is created only once.
+    _input_match_hash: Tuple[int, int, Optional[DeviceHash]] = field(
+        init=False,
+        repr=False,
+        compare=False,
+    )
+
+    def __post_init__(self):
+        # The dataclass is frozen, so the usual setattr is not available.
+        object.__setattr__(
+            self,
+            "_input_match_hash",
+            (self.type, self.code, self.origin_hash),
+        )
+
     def __eq__(self, other: InputEvent | evdev.InputEvent | Tuple[int, int, int]):
         # useful in tests
         if isinstance(other, InputEvent) or isinstance(other, evdev.InputEvent):
@@ -103,7 +117,7 @@ class InputEvent:
         """a Hashable object which is intended to match the InputEvent with a
         InputConfig.
         """
-        return self.type, self.code, self.origin_hash
+        return self._input_match_hash
 
     @classmethod
     def from_event(
@@ -251,14 +265,17 @@ class InputEvent:
         origin_hash: Optional[str] = None,
     ) -> InputEvent:
         """Return a new modified event."""
+        if pressed is None:
+            pressed = self.pressed if self.pressed is not None else self.value != 0
+
         return InputEvent(
-            sec if sec is not None else self.sec,
-            usec if usec is not None else self.usec,
-            type_ if type_ is not None else self.type,
-            code if code is not None else self.code,
-            value if value is not None else self.value,
-            pressed if pressed is not None else self.is_pressed(),
-            direction if direction is not None else self.direction,
-            actions if actions is not None else self.actions,
-            origin_hash=origin_hash if origin_hash is not None else self.origin_hash,  # type: ignore
+            self.sec if sec is None else sec,
+            self.usec if usec is None else usec,
+            self.type if type_ is None else type_,
+            self.code if code is None else code,
+            self.value if value is None else value,
+            pressed,
+            self.direction if direction is None else direction,
+            self.actions if actions is None else actions,
+            self.origin_hash if origin_hash is None else origin_hash,
         )
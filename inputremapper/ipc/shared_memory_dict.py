@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Share a dictionary across forked processes, without a process to manage it."""
+
+import asyncio
+import mmap
+import multiprocessing
+import os
+import pickle
+import socket
+import struct
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from inputremapper.logging.logger import logger
+
+# The number of writes so far
+_HEADER = struct.Struct("=Q")
+# The pid of the process that is writing, or 0
+_WRITER = struct.Struct("=I")
+_WRITER_OFFSET = _HEADER.size
+# The pids of processes that want to be notified about changes, or 0
+_MAX_SUBSCRIBERS = 64
+_SUBSCRIBERS = struct.Struct(f"={_MAX_SUBSCRIBERS}I")
+_SUBSCRIBER = struct.Struct("=I")
+_SUBSCRIBERS_OFFSET = _WRITER_OFFSET + _WRITER.size
+# sequence number, key length, value length. The key and the value follow.
+_SLOT_HEADER = struct.Struct("=IHH")
+_SEQUENCE = struct.Struct("=I")
+_MAX_SEQUENCE = 2**32
+
+
+class SharedMemoryDict:
+    """Share a dictionary across processes that are forked after its creation.
+
+    The entries are stored in an anonymous shared mmap, so reading doesn't need any
+    inter-process communication. Each slot is protected by a seqlock: writers make
+    the sequence number odd while they are writing, and readers retry if it was odd
+    or changed while they were reading. Writers lock each other out.
+
+    Keys and values are limited in size, values are pickled.
+
+    If a writer is preempted while writing, readers wait for it. They only give up
+    if it died.
+
+    Processes can subscribe to changes of keys. Writers send an empty datagram to
+    each subscribed process, which then compares the versions of the keys it is
+    interested in.
+    """
+
+    slots = 1024
+    slot_size = 512
+    max_key_size = 64
+    max_value_size = slot_size - _SLOT_HEADER.size - max_key_size
+
+    # How often a reader only yields before it starts sleeping, if a slot is being
+    # written to. Writing takes microseconds, unless the writer is preempted.
+    _max_spins = 100
+    _retry_sleep = 0.0001
+
+    _slots_offset = _SUBSCRIBERS_OFFSET + _SUBSCRIBERS.size
+
+    # The following is different in each process:
+    # The version of the key, when the callback was last called or subscribed
+    _subscriptions: Dict[Tuple[str, Callable[[], None]], int]
+    # Which process the _subscriptions and the _socket belong to
+    _pid: Optional[int] = None
+    _socket: Optional[socket.socket] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __init__(self) -> None:
+        """Create a shared dictionary."""
+        self._memory = mmap.mmap(-1, self._slots_offset + self.slots * self.slot_size)
+        self._lock = multiprocessing.Lock()
+        # To find the sockets of the subscribers of this dict
+        self._name = f"input-remapper-variables-{os.getpid()}-{id(self)}"
+        self._subscriptions = {}
+
+    def get(self, key: str) -> Any:
+        """Get a value from the dictionary.
+
+        If it doesn't exist, returns None.
+        """
+        slot = self._read_key(key)
+        if slot is None:
+            return None
+
+        return pickle.loads(slot[2])
+
+    def get_key_version(self, key: str) -> int:
+        """Get a number that changes with every write to the key.
+
+        0 if it was never written to.
+        """
+        slot = self._read_key(key)
+        if slot is None:
+            return 0
+
+        return slot[0]
+
+    def set(self, key: str, value: Any) -> None:
+        encoded_key = key.encode()
+        encoded_value = pickle.dumps(value)
+
+        if len(encoded_key) > self.max_key_size:
+            logger.error('Variable name "%s" is too long', key)
+            return
+
+        if len(encoded_value) > self.max_value_size:
+            logger.error('Value of variable "%s" is too large', key)
+            return
+
+        with self._lock:
+            index = self._find_slot(encoded_key)
+            if index is None:
+                logger.error('No space left to store variable "%s"', key)
+                return
+
+            self._set_writer(os.getpid())
+            offset = self._get_offset(index)
+            (sequence,) = _SEQUENCE.unpack_from(self._memory, offset)
+            _SLOT_HEADER.pack_into(
+                self._memory,
+                offset,
+                sequence + 1,
+                len(encoded_key),
+                len(encoded_value),
+            )
+            key_offset = offset + _SLOT_HEADER.size
+            value_offset = key_offset + self.max_key_size
+            self._memory[key_offset : key_offset + len(encoded_key)] = encoded_key
+            self._memory[value_offset : value_offset + len(encoded_value)] = (
+                encoded_value
+            )
+            _SEQUENCE.pack_into(self._memory, offset, (sequence + 2) % _MAX_SEQUENCE)
+            self._set_writer(0)
+
+            self._count_write()
+
+        self._notify_subscribers()
+
+    def subscribe(self, key: str, callback: Callable[[], None]) -> None:
+        """Call the callback in the running event loop when the value of key changes.
+
+        Works for changes made by any process.
+        """
+        self._listen(asyncio.get_running_loop())
+        self._subscriptions[(key, callback)] = self.get_key_version(key)
+
+    def unsubscribe(self, key: str, callback: Callable[[], None]) -> None:
+        if self._pid == os.getpid():
+            self._subscriptions.pop((key, callback), None)
+
+    async def wait_for(
+        self,
+        key: str,
+        value: Any,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Wait until the key has the value, without polling.
+
+        Returns False if the timeout in seconds was reached before.
+        """
+        if self.get(key) == value:
+            return True
+
+        changed = asyncio.Event()
+        self.subscribe(key, changed.set)
+
+        async def wait():
+            while self.get(key) != value:
+                await changed.wait()
+                changed.clear()
+
+        try:
+            await asyncio.wait_for(wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.unsubscribe(key, changed.set)
+
+    def get_version(self) -> int:
+        """Get a number that changes with every write."""
+        return _HEADER.unpack_from(self._memory, 0)[0]
+
+    def _hash(self, encoded_key: bytes) -> int:
+        # Unlike hash(), crc32 is the same in every process
+        return zlib.crc32(encoded_key) % self.slots
+
+    def _get_offset(self, index: int) -> int:
+        return self._slots_offset + index * self.slot_size
+
+    def _get_address(self, pid: int) -> str:
+        # In the abstract namespace, so that no files are created
+        return f"\0{self._name}-{pid}"
+
+    def _read_key(self, key: str) -> Optional[Tuple[int, bytes, bytes]]:
+        """Find the sequence number and the pickled value of the key."""
+        encoded_key = key.encode()
+        index = self._hash(encoded_key)
+        for _ in range(self.slots):
+            slot = self._read_slot(index)
+            if slot is None or len(slot[1]) == 0:
+                return None
+
+            if slot[1] == encoded_key:
+                return slot
+
+            index = (index + 1) % self.slots
+
+        return None
+
+    def _find_slot(self, encoded_key: bytes) -> Optional[int]:
+        """Find the slot that has the key, or is free for it.
+
+        Only call this while holding the lock, because it doesn't check the sequence.
+        """
+        index = self._hash(encoded_key)
+        for _ in range(self.slots):
+            offset = self._get_offset(index)
+            _, key_length, _ = _SLOT_HEADER.unpack_from(self._memory, offset)
+            key_offset = offset + _SLOT_HEADER.size
+            if key_length == 0 or (
+                self._memory[key_offset : key_offset + key_length] == encoded_key
+            ):
+                return index
+
+            index = (index + 1) % self.slots
+
+        return None
+
+    def _read_slot(self, index: int) -> Optional[Tuple[int, bytes, bytes]]:
+        """Read the sequence number, the key and the pickled value of a slot, while
+        nobody writes to it.
+
+        Returns None only if a writer died while writing to it.
+        """
+        offset = self._get_offset(index)
+        attempts = 0
+        while True:
+            if attempts > 0:
+                self._wait_for_writer(attempts)
+                if attempts > self._max_spins and not self._is_writer_alive():
+                    break
+
+            attempts += 1
+
+            (sequence,) = _SEQUENCE.unpack_from(self._memory, offset)
+            if sequence % 2 == 1:
+                continue
+
+            slot = self._memory[offset : offset + self.slot_size]
+            if _SEQUENCE.unpack_from(self._memory, offset)[0] != sequence:
+                continue
+
+            _, key_length, value_length = _SLOT_HEADER.unpack_from(slot)
+            key_offset = _SLOT_HEADER.size
+            value_offset = key_offset + self.max_key_size
+            return (
+                sequence,
+                slot[key_offset : key_offset + key_length],
+                slot[value_offset : value_offset + value_length],
+            )
+
+        logger.error(
+            "Slot %d of the SharedMemoryDict is broken, its writer died",
+            index,
+        )
+        return None
+
+    def _wait_for_writer(self, attempts: int) -> None:
+        if attempts <= self._max_spins:
+            # Let the writer continue, if it shares the cpu with this process
+            os.sched_yield()
+        else:
+            time.sleep(self._retry_sleep)
+
+    def _is_writer_alive(self) -> bool:
+        (pid,) = _WRITER.unpack_from(self._memory, _WRITER_OFFSET)
+        if pid == 0:
+            # It just finished
+            return True
+
+        try:
+            with open(f"/proc/{pid}/stat") as file:
+                # The state follows the name, which is in brackets
+                state = file.read().rsplit(")", 1)[1].split()[0]
+        except (FileNotFoundError, IndexError):
+            return False
+
+        # Zombies wait for their parent to notice that they died
+        return state not in ("Z", "X")
+
+    def _set_writer(self, pid: int) -> None:
+        _WRITER.pack_into(self._memory, _WRITER_OFFSET, pid)
+
+    def _count_write(self) -> None:
+        _HEADER.pack_into(self._memory, 0, self.get_version() + 1)
+
+    def _clear(self) -> None:
+        """Clears the memory."""
+        with self._lock:
+            for index in range(self.slots):
+                offset = self._get_offset(index)
+                sequence, key_length, _ = _SLOT_HEADER.unpack_from(self._memory, offset)
+                if key_length == 0:
+                    continue
+
+                self._set_writer(os.getpid())
+                _SLOT_HEADER.pack_into(self._memory, offset, sequence + 1, 0, 0)
+                _SEQUENCE.pack_into(
+                    self._memory, offset, (sequence + 2) % _MAX_SEQUENCE
+                )
+                self._set_writer(0)
+
+            self._count_write()
+
+        self._notify_subscribers()
+
+    def _listen(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Receive notifications about changes in this process and event loop."""
+        pid = os.getpid()
+        if self._pid != pid:
+            # Nothing of this belongs to this process, it was forked
+            self._subscriptions = {}
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._socket.setblocking(False)
+            self._socket.bind(self._get_address(pid))
+            self._pid = pid
+            self._loop = None
+
+            with self._lock:
+                for index, subscriber in enumerate(self._get_subscribers()):
+                    if subscriber == 0:
+                        self._set_subscriber(index, pid)
+                        break
+                else:
+                    logger.error("Too many processes subscribed to variables")
+
+        if self._loop is not loop:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.remove_reader(self._socket.fileno())
+
+            loop.add_reader(self._socket.fileno(), self._on_notification)
+            self._loop = loop
+
+    def _on_notification(self) -> None:
+        assert self._socket is not None
+        try:
+            while True:
+                self._socket.recv(1)
+        except BlockingIOError:
+            pass
+
+        # Notifications don't say what changed, and may be dropped if there are
+        # already a lot of pending ones. So compare versions.
+        for subscription, version in list(self._subscriptions.items()):
+            key, callback = subscription
+            new_version = self.get_key_version(key)
+            if new_version != version and subscription in self._subscriptions:
+                self._subscriptions[subscription] = new_version
+                callback()
+
+    def _notify_subscribers(self) -> None:
+        """Wake up all processes that subscribed to changes."""
+        subscribers = self._get_subscribers()
+        if not any(subscribers):
+            return
+
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sender.setblocking(False)
+        try:
+            for index, pid in enumerate(subscribers):
+                if pid == 0:
+                    continue
+
+                try:
+                    sender.sendto(b"", self._get_address(pid))
+                except BlockingIOError:
+                    # It has pending notifications anyway
+                    pass
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # The process is gone
+                    with self._lock:
+                        if self._get_subscribers()[index] == pid:
+                            self._set_subscriber(index, 0)
+        finally:
+            sender.close()
+
+    def _get_subscribers(self) -> Tuple[int, ...]:
+        return _SUBSCRIBERS.unpack_from(self._memory, _SUBSCRIBERS_OFFSET)
+
+    def _set_subscriber(self, index: int, pid: int) -> None:
+        _SUBSCRIBER.pack_into(
+            self._memory,
+            _SUBSCRIBERS_OFFSET + index * _SUBSCRIBER.size,
+            pid,
+        )
@@ -0,0 +1,4 @@
+"""Benchmarks, which are not part of the unittests.
+
+Run them like tests: python3 -m unittest tests/benchmarks/benchmark_input_event.py
+"""
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Measure typing on a keyboard that has hundreds of combinations mapped."""
+
+import time
+import unittest
+from typing import List
+
+from evdev.ecodes import (
+    EV_KEY,
+    KEY_1,
+    KEY_LEFTALT,
+    KEY_LEFTCTRL,
+    KEY_LEFTMETA,
+    KEY_LEFTSHIFT,
+    KEY_RIGHTALT,
+    KEY_RIGHTCTRL,
+    KEY_RIGHTSHIFT,
+)
+
+from inputremapper.configs.input_config import InputCombination, InputConfig
+from inputremapper.configs.mapping import Mapping
+from inputremapper.configs.preset import Preset
+from inputremapper.injection.context import Context
+from inputremapper.injection.global_uinputs import GlobalUInputs
+from inputremapper.injection.mapping_handlers.mapping_parser import MappingParser
+from inputremapper.input_event import InputEvent
+from inputremapper.logging.logger import logger
+from tests.benchmarks.replay import NullUInput, untraced
+from tests.lib.test_setup import test_setup
+
+MODIFIERS = [
+    KEY_LEFTCTRL,
+    KEY_LEFTALT,
+    KEY_LEFTSHIFT,
+    KEY_LEFTMETA,
+    KEY_RIGHTCTRL,
+    KEY_RIGHTALT,
+    KEY_RIGHTSHIFT,
+]
+
+# KEY_1 until KEY_S
+KEYS = list(range(KEY_1, KEY_1 + 30))
+
+
+@test_setup
+class BenchmarkCombinations(unittest.TestCase):
+    iterations = 2000
+
+    def setUp(self):
+        # Debug logs would dominate everything
+        logger.update_verbosity(False)
+
+        global_uinputs = GlobalUInputs(NullUInput)
+        global_uinputs.prepare_all()
+
+        preset = Preset()
+        # 7 * 30 combinations of a modifier and a key, plus 30 of ctrl + alt + key
+        combinations = [[modifier, key] for modifier in MODIFIERS for key in KEYS]
+        combinations += [[KEY_LEFTCTRL, KEY_LEFTALT, key] for key in KEYS]
+        for codes in combinations:
+            preset.add(
+                Mapping(
+                    input_combination=InputCombination(
+                        [InputConfig(type=EV_KEY, code=code) for code in codes]
+                    ),
+                    target_uinput="keyboard",
+                    output_symbol="b",
+                    release_combination_keys=False,
+                )
+            )
+
+        self.num_combinations = len(combinations)
+        self.context = Context(preset, {}, {}, MappingParser(global_uinputs))
+
+    def tearDown(self):
+        logger.update_verbosity(True)
+
+    def _notify(self, events: List[InputEvent]) -> None:
+        for event in events:
+            for notify_callback in self.context.get_notify_callbacks(event):
+                notify_callback(event, source=None)
+
+    def _measure(self, description: str, codes: List[int]) -> None:
+        """Press all codes in order, then release them in reverse order."""
+        events = [InputEvent(0, 0, EV_KEY, code, 1) for code in codes]
+        events += [InputEvent(0, 0, EV_KEY, code, 0) for code in reversed(codes)]
+
+        with untraced():
+            start = time.perf_counter()
+            for _ in range(self.iterations):
+                self._notify(events)
+            duration = time.perf_counter() - start
+
+        num_events = self.iterations * len(events)
+        print(
+            f"\n{self.num_combinations} combinations, {description}: "
+            f"{duration / num_events * 1e6:.2f} µs per event"
+        )
+
+    def test_typing(self):
+        # Each key is part of 8 combinations, none of them triggers
+        self._measure("typing", KEYS[:10])
+
+    def test_combination(self):
+        # Ctrl is part of 60 combinations
+        self._measure("ctrl + key", [KEY_LEFTCTRL, KEYS[5]])
+
+    def test_three_key_combination(self):
+        self._measure("ctrl + alt + key", [KEY_LEFTCTRL, KEY_LEFTALT, KEYS[5]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Measure time and allocations per event through CombinationHandler -> KeyHandler."""
+
+import time
+import tracemalloc
+import unittest
+
+from evdev.ecodes import EV_KEY, KEY_A
+
+from inputremapper.configs.input_config import InputCombination
+from inputremapper.configs.mapping import Mapping
+from inputremapper.configs.preset import Preset
+from inputremapper.injection.context import Context
+from inputremapper.injection.global_uinputs import GlobalUInputs
+from inputremapper.injection.mapping_handlers.mapping_parser import MappingParser
+from inputremapper.input_event import InputEvent
+from inputremapper.logging.logger import logger
+from tests.benchmarks.replay import NullUInput, untraced
+from tests.lib.test_setup import test_setup
+
+
+@test_setup
+class BenchmarkInputEvent(unittest.TestCase):
+    iterations = 100000
+
+    def setUp(self):
+        # Debug logs would dominate everything
+        logger.update_verbosity(False)
+
+        global_uinputs = GlobalUInputs(NullUInput)
+        global_uinputs.prepare_all()
+
+        preset = Preset()
+        preset.add(
+            Mapping.from_combination(
+                InputCombination.from_tuples((EV_KEY, KEY_A)),
+                "keyboard",
+                "b",
+            )
+        )
+        self.context = Context(preset, {}, {}, MappingParser(global_uinputs))
+
+    def tearDown(self):
+        logger.update_verbosity(True)
+
+    def _notify(self, event: InputEvent) -> None:
+        for notify_callback in self.context.get_notify_callbacks(event):
+            notify_callback(event, source=None)
+
+    def test_combination_to_key(self):
+        press = InputEvent(0, 0, EV_KEY, KEY_A, 1)
+        release = InputEvent(0, 0, EV_KEY, KEY_A, 0)
+
+        with untraced():
+            start = time.perf_counter()
+            for _ in range(self.iterations):
+                self._notify(InputEvent(0, 0, EV_KEY, KEY_A, 1))
+                self._notify(InputEvent(0, 0, EV_KEY, KEY_A, 0))
+            duration = time.perf_counter() - start
+
+        # Only one event at a time, so that the peak is what a single event allocates
+        # on its way through the handlers.
+        was_tracing = tracemalloc.is_tracing()
+        tracemalloc.start()
+        peaks = []
+        for event in (press, release) * 1000:
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            self._notify(InputEvent.from_event(event))
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - current)
+
+        if not was_tracing:
+            tracemalloc.stop()
+
+        num_events = self.iterations * 2
+        print(
+            f"\nCombinationHandler -> KeyHandler: "
+            f"{duration / num_events * 1e6:.2f} µs per event, "
+            f"{max(peaks)} bytes allocated per event at most, "
+            f"{sorted(peaks)[len(peaks) // 2]} bytes on median"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+
+"""Compare running macros as trees of tasks with running them as flat programs."""
+
+import asyncio
+import time
+import unittest
+
+from inputremapper.injection.macros.macro import Macro
+from inputremapper.injection.macros.parse import Parser
+from inputremapper.injection.macros.program import compile_macro
+from inputremapper.logging.logger import logger
+from tests.benchmarks.replay import untraced
+from tests.lib.test_setup import test_setup
+
+
+class BenchmarkMapping:
+    # Otherwise sleeping would be measured
+    macro_key_sleep_ms = 0
+    rel_rate = 60
+    target_uinput = "keyboard"
+
+
+@test_setup
+class BenchmarkMacros(unittest.TestCase):
+    repeats = 20000
+    hold_seconds = 1
+
+    def setUp(self):
+        # Debug logs would dominate everything
+        logger.update_verbosity(False)
+        self.num_events = 0
+
+    def tearDown(self):
+        logger.update_verbosity(True)
+
+    def _callback(self, *_) -> None:
+        self.num_events += 1
+
+    def _parse(self, code: str, compiled: bool) -> Macro:
+        macro = Parser.parse(code, None, BenchmarkMapping)
+        if compiled:
+            compile_macro(macro)
+
+        return macro
+
+    def _print(self, description: str, compiled: bool, duration: float) -> None:
+        engine = "program" if compiled else "tasks"
+        print(
+            f"\n{description}, {engine}: {self.num_events} events, "
+            f"{duration / self.num_events * 1e6:.2f} µs per event"
+        )
+
+    async def _run_repeat(self, compiled: bool) -> None:
+        macro = self._parse(
+            f"repeat({self.repeats}, key(KEY_A).event(EV_REL, REL_X, 1))",
+            compiled,
+        )
+        self.num_events = 0
+        start = time.perf_counter()
+        await macro.run(self._callback)
+        self._print("repeat", compiled, time.perf_counter() - start)
+
+    async def _run_hold(self, compiled: bool) -> None:
+        macro = self._parse("hold(key(KEY_A).key(KEY_B))", compiled)
+        self.num_events = 0
+        macro.press_trigger()
+        start = time.perf_counter()
+        task = asyncio.ensure_future(macro.run(self._callback))
+        await asyncio.sleep(self.hold_seconds)
+        macro.release_trigger()
+        await task
+        self._print("hold", compiled, time.perf_counter() - start)
+
+    def test_repeat(self):
+        with untraced():
+            for compiled in (False, True):
+                asyncio.run(self._run_repeat(compiled))
+
+    def test_hold(self):
+        # Both inject a lot less events than in test_repeat, because of the 1ms
+        # sleep after each iteration
+        with untraced():
+            for compiled in (False, True):
+                asyncio.run(self._run_hold(compiled))
+
+
+if __name__ == "__main__":
+    unittest.main()
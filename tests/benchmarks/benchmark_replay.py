@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Measure the throughput of a whole preset, by replaying a recording.
+
+Uses a generated gamepad recording and preset by default. To measure your own, set
+BENCHMARK_PRESET to the path of a preset and BENCHMARK_RECORDING to a recording of
+the device, made with inputremapper.injection.event_recording.EventRecorder. The
+recording is replayed as if it came from the "gamepad" test-device.
+"""
+
+import math
+import os
+import unittest
+from typing import List
+
+import evdev
+from evdev.ecodes import (
+    EV_ABS,
+    EV_KEY,
+    EV_REL,
+    EV_SYN,
+    ABS_HAT0X,
+    ABS_X,
+    ABS_Y,
+    BTN_A,
+    BTN_B,
+    SYN_REPORT,
+    REL_X,
+)
+
+from inputremapper.configs.input_config import InputCombination, InputConfig
+from inputremapper.configs.mapping import Mapping
+from inputremapper.configs.preset import Preset
+from inputremapper.injection.event_recording import EventRecorder, read_recording
+from inputremapper.logging.logger import logger
+from tests.benchmarks.replay import replay
+from tests.lib.fixtures import fixtures
+from tests.lib.patches import InputDevice
+from tests.lib.test_setup import test_setup
+from tests.lib.tmp import tmp
+
+
+def record_gamepad(path: str, num_frames: int) -> None:
+    """Record a joystick that moves in circles, while buttons are pressed."""
+    with open(path, "wb") as file:
+        recorder = EventRecorder(file)
+        for i in range(num_frames):
+            angle = i / 50
+            frame = [
+                evdev.InputEvent(i, 0, EV_ABS, ABS_X, int(math.cos(angle) * 2**15)),
+                evdev.InputEvent(i, 0, EV_ABS, ABS_Y, int(math.sin(angle) * 2**15)),
+            ]
+
+            if i % 10 == 0:
+                frame.append(evdev.InputEvent(i, 0, EV_KEY, BTN_A, (i // 10) % 2))
+
+            if i % 30 == 0:
+                frame.append(evdev.InputEvent(i, 0, EV_KEY, BTN_B, (i // 30) % 2))
+                frame.append(evdev.InputEvent(i, 0, EV_ABS, ABS_HAT0X, (i // 30) % 2))
+
+            frame.append(evdev.InputEvent(i, 0, EV_SYN, SYN_REPORT, 0))
+            recorder.record(frame)
+
+
+def create_gamepad_preset() -> Preset:
+    preset = Preset()
+    preset.add(
+        Mapping(
+            input_combination=InputCombination([InputConfig(type=EV_ABS, code=ABS_X)]),
+            target_uinput="mouse",
+            output_type=EV_REL,
+            output_code=REL_X,
+        )
+    )
+    preset.add(
+        Mapping.from_combination(
+            InputCombination.from_tuples((EV_KEY, BTN_A)),
+            "keyboard",
+            "a",
+        )
+    )
+    preset.add(
+        Mapping.from_combination(
+            InputCombination.from_tuples((EV_KEY, BTN_A), (EV_KEY, BTN_B)),
+            "keyboard",
+            "key(b).key(c)",
+        )
+    )
+    preset.add(
+        Mapping.from_combination(
+            InputCombination(
+                [InputConfig(type=EV_ABS, code=ABS_HAT0X, analog_threshold=1)]
+            ),
+            "keyboard",
+            "d",
+        )
+    )
+    return preset
+
+
+@test_setup
+class BenchmarkReplay(unittest.IsolatedAsyncioTestCase):
+    num_frames = 20000
+
+    def setUp(self):
+        # Debug logs would dominate everything
+        logger.update_verbosity(False)
+
+    def tearDown(self):
+        logger.update_verbosity(True)
+
+    def load(self) -> List[evdev.InputEvent]:
+        path = os.environ.get("BENCHMARK_RECORDING")
+        if path is None:
+            path = os.path.join(tmp, "gamepad.irrec")
+            record_gamepad(path, self.num_frames)
+
+        with open(path, "rb") as file:
+            return read_recording(file)
+
+    def get_preset(self) -> Preset:
+        path = os.environ.get("BENCHMARK_PRESET")
+        if path is None:
+            return create_gamepad_preset()
+
+        preset = Preset(path)
+        preset.load()
+        return preset
+
+    async def test_replay(self):
+        result = replay(
+            self.get_preset(),
+            self.load(),
+            InputDevice(fixtures.gamepad.path),
+        )
+        print(f"\nReplay: {result}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Replay event recordings through a real event pipeline, and measure it."""
+
+import asyncio
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List
+
+import evdev
+
+from inputremapper.configs.preset import Preset
+from inputremapper.injection.context import Context
+from inputremapper.injection.event_reader import EventReader
+from inputremapper.injection.global_uinputs import GlobalUInputs
+from inputremapper.injection.mapping_handlers.mapping_parser import MappingParser
+from inputremapper.input_event import InputEvent
+from inputremapper.utils import get_device_hash
+
+
+class NullUInput:
+    """Accepts everything and writes nothing, to not measure the test-uinputs."""
+
+    def __init__(self, *_, name="null", events=None, **__):
+        self.name = name
+        self.events = events
+
+    def can_emit(self, _) -> bool:
+        return True
+
+    def capabilities(self, *_, **__):
+        return self.events
+
+    def write(self, *_) -> None:
+        pass
+
+    def syn(self) -> None:
+        pass
+
+
+@contextmanager
+def untraced() -> Iterator[None]:
+    """Pause tracemalloc, which test_setup starts, because it slows everything down."""
+    was_tracing = tracemalloc.is_tracing()
+    if was_tracing:
+        tracemalloc.stop()
+
+    try:
+        yield
+    finally:
+        if was_tracing:
+            tracemalloc.start()
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percent))]
+
+
+@dataclass
+class ReplayResult:
+    num_events: int
+    duration: float
+    # For each event, how long it took until its frame was done
+    latencies: List[float]
+    # For each frame, how many bytes were allocated at most while handling it
+    allocations: List[int]
+
+    def __str__(self) -> str:
+        latencies = sorted(self.latencies)
+        allocations = sorted(self.allocations)
+        return (
+            f"{self.num_events / self.duration:.0f} events/s, "
+            f"latency p50 {percentile(latencies, 0.5) * 1e6:.2f} µs, "
+            f"p99 {percentile(latencies, 0.99) * 1e6:.2f} µs, "
+            f"{percentile(allocations, 0.5)} bytes allocated per frame on median, "
+            f"{allocations[-1]} at most"
+        )
+
+
+def replay(
+    preset: Preset,
+    events: List[evdev.InputEvent],
+    source: evdev.InputDevice,
+) -> ReplayResult:
+    """Send the events through the handlers of the preset, like the EventReader does.
+
+    Needs a running event loop, because some handlers start tasks. They won't get a
+    chance to run during the replay though.
+    """
+    device_hash = get_device_hash(source)
+    global_uinputs = GlobalUInputs(NullUInput)
+    global_uinputs.prepare_all()
+    context = Context(
+        preset,
+        source_devices={device_hash: source},
+        forward_devices={device_hash: NullUInput(name="forward")},
+        mapping_parser=MappingParser(global_uinputs),
+    )
+    event_reader = EventReader(context, source, asyncio.Event())
+    frames = EventReader._split_frames(events)
+
+    def handle(frame: List[evdev.InputEvent]) -> None:
+        event_reader.handle_frame_sync(
+            [InputEvent.from_event(event, origin_hash=device_hash) for event in frame]
+        )
+
+    latencies: List[float] = []
+    with untraced():
+        start = time.perf_counter()
+        for frame in frames:
+            frame_start = time.perf_counter()
+            handle(frame)
+            latencies.extend([time.perf_counter() - frame_start] * len(frame))
+
+        duration = time.perf_counter() - start
+
+    context.reset()
+
+    allocations: List[int] = []
+    was_tracing = tracemalloc.is_tracing()
+    tracemalloc.start()
+    for frame in frames:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        handle(frame)
+        _, peak = tracemalloc.get_traced_memory()
+        allocations.append(peak - current)
+
+    if not was_tracing:
+        tracemalloc.stop()
+
+    context.reset()
+
+    return ReplayResult(
+        num_events=len(events),
+        duration=duration,
+        latencies=latencies,
+        allocations=allocations,
+    )
@@ -112,17 +112,9 @@ def quick_cleanup(log=True):
         # create a fresh event loop
         asyncio.set_event_loop(asyncio.new_event_loop())
 
-    if macro_variables.process is not None and not macro_variables.process.is_alive():
-        # nothing should stop the process during runtime, if it has been started by
-        # the injector once
-        raise AssertionError("the SharedDict manager is not running anymore")
-
-    if macro_variables.process is not None:
-        macro_variables._stop()
-
     join_children()
 
-    macro_variables.start()
+    macro_variables._clear()
 
     if os.path.exists(tmp):
         shutil.rmtree(tmp)
@@ -147,8 +139,6 @@ def quick_cleanup(log=True):
     for _, pipe in pending_events.values():
         assert not pipe.poll()
 
-    assert macro_variables.ping(1)
-
     if log:
         logger.info("Quick cleanup done")
 
@@ -128,20 +128,16 @@ class InputDevice:
             yield event
 
     def read(self):
-        # the patched fake InputDevice objects read anything pending from
-        # that group.
-        # To be realistic it would have to check if the provided
-        # element is in its capabilities.
-        if self.group_key not in pending_events:
-            self.log("no events to read", self.group_key)
-            return
-
-        # consume all of them
-        while pending_events[self._fixture][1].poll():
-            event = pending_events[self._fixture][1].recv()
-            self.log(event, "read")
-            yield event
-            time.sleep(EVENT_READ_TIMEOUT)
+        """Read everything that is pending, like evdev does with a single syscall."""
+        events = []
+        while event := self.read_one():
+            events.append(event)
+
+        if not events:
+            # Like evdev, when reading a non-blocking fd without data
+            raise BlockingIOError()
+
+        return iter(events)
 
     def read_loop(self):
         """Endless loop that yields events."""
@@ -360,6 +356,9 @@ class FakeDaemonProxy:
             "autoload": 0,
             "autoload_single": [],
             "hello": [],
+            "get_stats": 0,
+            "set_profiling": [],
+            "get_profile": [],
             "quit": 0,
         }
 
@@ -392,6 +391,17 @@ class FakeDaemonProxy:
         self.calls["hello"].append(out)
         return out
 
+    def get_stats(self) -> str:
+        self.calls["get_stats"] += 1
+        return "{}"
+
+    def set_profiling(self, group_key: str, enabled: bool) -> None:
+        self.calls["set_profiling"].append((group_key, enabled))
+
+    def get_profile(self, group_key: str) -> str:
+        self.calls["get_profile"].append(group_key)
+        return ""
+
     def quit(self):
         self.calls["quit"] += 1
 
@@ -33,11 +33,13 @@ from evdev.ecodes import (
 from inputremapper.configs.input_config import InputCombination
 from inputremapper.configs.mapping import Mapping
 from inputremapper.configs.preset import Preset
-from inputremapper.injection.context import Context
+from inputremapper.injection.context import Context, get_dispatch_key
 from inputremapper.injection.global_uinputs import GlobalUInputs, UInput
 from inputremapper.injection.mapping_handlers.macro_handler import MacroHandler
 from inputremapper.injection.mapping_handlers.mapping_parser import MappingParser
 from inputremapper.input_event import InputEvent
+from tests.lib.fixtures import fixtures
+from tests.lib.patches import InputDevice
 from tests.lib.test_setup import test_setup
 
 
@@ -103,8 +105,12 @@ class TestContext(unittest.TestCase):
             InputEvent.key(34, 1): 1,
         }
 
+        # None of the inputs has an origin_hash, so they all have the origin index 0
         self.assertEqual(
-            set([event.input_match_hash for event in expected_num_callbacks.keys()]),
+            {
+                get_dispatch_key(0, event.type, event.code)
+                for event in expected_num_callbacks.keys()
+            },
             set(context._notify_callbacks.keys()),
         )
         for input_event, num_callbacks in expected_num_callbacks.items():
@@ -116,6 +122,110 @@ class TestContext(unittest.TestCase):
         # 7 unique input events in the preset
         self.assertEqual(7, len(context._handlers))
 
+    def test_unmapped_events(self):
+        global_uinputs = GlobalUInputs(UInput)
+        mapping_parser = MappingParser(global_uinputs)
+
+        preset = Preset()
+        preset.add(
+            Mapping.from_combination(
+                InputCombination.from_tuples((1, 31)), "keyboard", "b"
+            )
+        )
+        context = Context(preset, {}, {}, mapping_parser)
+        self.assertEqual(1, len(context._notify_callbacks))
+
+        # Neither unmapped codes nor unknown devices are added to the index
+        self.assertEqual(len(context.get_notify_callbacks(InputEvent.key(32, 1))), 0)
+        self.assertEqual(
+            len(context.get_notify_callbacks(InputEvent.key(31, 1, "foo"))),
+            0,
+        )
+        self.assertEqual(1, len(context._notify_callbacks))
+        self.assertEqual(len(context.get_notify_callbacks(InputEvent.key(31, 1))), 1)
+
+        # The index can't be modified
+        with self.assertRaises(TypeError):
+            context._notify_callbacks[0] = ()
+
+    def test_dispatch_keys_are_unique(self):
+        self.assertNotEqual(get_dispatch_key(0, 1, 2), get_dispatch_key(1, 1, 2))
+        self.assertNotEqual(get_dispatch_key(0, 1, 2), get_dispatch_key(0, 2, 1))
+        self.assertNotEqual(
+            get_dispatch_key(0, EV_ABS, 0x2FF),
+            get_dispatch_key(0, EV_REL, 0x2FF),
+        )
+
+    def test_absinfo_snapshots(self):
+        global_uinputs = GlobalUInputs(UInput)
+        mapping_parser = MappingParser(global_uinputs)
+
+        source = InputDevice(fixtures.gamepad.path)
+        device_hash = fixtures.gamepad.get_device_hash()
+        with patch.object(
+            InputDevice,
+            "capabilities",
+            side_effect=InputDevice.capabilities,
+            autospec=True,
+        ) as capabilities_mock:
+            context = Context(Preset(), {device_hash: source}, {}, mapping_parser)
+            # taken right away, while creating the context
+            self.assertEqual(capabilities_mock.call_count, 1)
+
+            event = InputEvent.abs(ABS_X, 10, device_hash)
+            for _ in range(3):
+                absinfo = context.absinfo_snapshots.get_absinfo(event, source)
+                trigger_point = context.absinfo_snapshots.get_trigger_point(
+                    event,
+                    30,
+                    source,
+                )
+
+            self.assertEqual(capabilities_mock.call_count, 1)
+
+        self.assertEqual(absinfo.min, fixtures.gamepad.min_abs)
+        self.assertEqual(absinfo.max, fixtures.gamepad.max_abs)
+        middle = (fixtures.gamepad.max_abs + fixtures.gamepad.min_abs) / 2
+        self.assertEqual(trigger_point[1], middle)
+
+    def test_profiling(self):
+        global_uinputs = GlobalUInputs(UInput)
+        mapping_parser = MappingParser(global_uinputs)
+
+        preset = Preset()
+        preset.add(
+            Mapping.from_combination(
+                InputCombination.from_tuples((1, 31)),
+                "keyboard",
+                "b",
+            )
+        )
+        global_uinputs.prepare_all()
+        context = Context(preset, {}, {}, mapping_parser)
+        self.assertEqual(context.get_profile(), "Profiling is not enabled")
+
+        event = InputEvent.key(31, 1)
+        handler = context.get_notify_callbacks(event)[0].__self__
+
+        context.set_profiling(True)
+        self.assertIn("notify", handler.__dict__)
+        # The wrapper still tells which handler it belongs to
+        self.assertIs(context.get_notify_callbacks(event)[0].__self__, handler)
+
+        for callback in context.get_notify_callbacks(event):
+            callback(event, source=None)
+
+        profile = context.get_profile()
+        self.assertIn("1 calls, 100% handled", profile)
+        # The sub-handlers are indented below their parents
+        self.assertIn("\n    ", profile)
+
+        # Disabling it removes the overhead from the handlers again
+        context.set_profiling(False)
+        self.assertNotIn("notify", handler.__dict__)
+        self.assertEqual(context.get_notify_callbacks(event)[0], handler.notify)
+        self.assertEqual(context.get_profile(), "Profiling is not enabled")
+
     def test_reset(self):
         global_uinputs = GlobalUInputs(UInput)
         mapping_parser = MappingParser(global_uinputs)
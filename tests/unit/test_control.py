@@ -21,9 +21,12 @@
 """Testing the input-remapper-control command"""
 
 import collections
+import io
+import json
 import os
 import time
 import unittest
+from contextlib import redirect_stdout
 from unittest.mock import patch, MagicMock
 
 from inputremapper.bin.input_remapper_control import InputRemapperControlBin
@@ -333,6 +336,67 @@ class TestControl(unittest.TestCase):
 
         quit_mock.assert_called_once()
 
+    @patch.object(Daemon, "get_stats")
+    def test_stats(self, get_stats_mock: MagicMock) -> None:
+        stats = {"Foo Device 2": {"abcd": {"forwarded": {"count": 3}}}}
+        get_stats_mock.return_value = json.dumps(stats)
+
+        daemon = Daemon(self.global_config, self.global_uinputs, self.mapping_parser)
+        self.input_remapper_control.set_daemon(daemon)
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            self.input_remapper_control.communicate(
+                command="stats",
+                config_dir=None,
+                preset=None,
+                device=None,
+            )
+
+        get_stats_mock.assert_called_once()
+        self.assertEqual(json.loads(stdout.getvalue()), stats)
+
+    @patch.object(Daemon, "get_profile")
+    @patch.object(Daemon, "set_profiling")
+    def test_profiling(
+        self,
+        set_profiling_mock: MagicMock,
+        get_profile_mock: MagicMock,
+    ) -> None:
+        get_profile_mock.return_value = "CombinationHandler: 3 calls"
+
+        daemon = Daemon(self.global_config, self.global_uinputs, self.mapping_parser)
+        self.input_remapper_control.set_daemon(daemon)
+        group = groups.find(key="Foo Device 2")
+
+        self.input_remapper_control.communicate(
+            command="enable-profiling",
+            config_dir=None,
+            preset=None,
+            device=group.key,
+        )
+        set_profiling_mock.assert_called_once_with(group.key, True)
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            self.input_remapper_control.communicate(
+                command="profile",
+                config_dir=None,
+                preset=None,
+                device=group.key,
+            )
+
+        get_profile_mock.assert_called_once_with(group.key)
+        self.assertEqual(stdout.getvalue(), "CombinationHandler: 3 calls\n")
+
+        self.input_remapper_control.communicate(
+            command="disable-profiling",
+            config_dir=None,
+            preset=None,
+            device=group.key,
+        )
+        set_profiling_mock.assert_called_with(group.key, False)
+
     def test_config_not_found(self):
         key = "Foo Device 2"
         path = "~/a/preset.json"
@@ -427,6 +427,13 @@ class TestDaemon(unittest.TestCase):
             daemon.injectors[group_key].get_state(), InjectorState.STOPPED
         )
 
+        # start again while it is running, the preset is replaced instead
+        previous_injector = daemon.injectors[group_key]
+        self.assertEqual(previous_injector.get_state(), InjectorState.RUNNING)
+        daemon.start_injecting(group_key, preset_name)
+        self.assertEqual(previous_injector, daemon.injectors[group_key])
+        self.assertEqual(previous_injector.get_state(), InjectorState.RUNNING)
+
         # trying to inject a non existing preset keeps the previous inejction
         # alive
         injector = daemon.injectors[group_key]
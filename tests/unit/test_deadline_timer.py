@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+from inputremapper.injection.deadline_timer import DeadlineTimer
+from inputremapper.injection.latency import latency_origin
+from tests.lib.test_setup import test_setup
+
+
+@test_setup
+class TestDeadlineTimer(unittest.IsolatedAsyncioTestCase):
+    async def test_expires(self):
+        callback = MagicMock()
+        timer = DeadlineTimer(0.05, callback)
+        self.assertFalse(timer.is_running())
+
+        timer.push()
+        self.assertTrue(timer.is_running())
+        await asyncio.sleep(0.03)
+        callback.assert_not_called()
+
+        await asyncio.sleep(0.04)
+        callback.assert_called_once()
+        self.assertFalse(timer.is_running())
+
+    async def test_push(self):
+        callback = MagicMock()
+        timer = DeadlineTimer(0.05, callback)
+        handles = set()
+
+        # Like a mouse with a high polling rate
+        for _ in range(20):
+            timer.push()
+            handles.add(timer._handle)
+            await asyncio.sleep(0.005)
+
+        callback.assert_not_called()
+        # Only a few handles for all those pushes. The first one, and one each
+        # time it fired before the deadline that was pushed in the meantime.
+        self.assertLess(len(handles), 5)
+
+        await asyncio.sleep(0.06)
+        callback.assert_called_once()
+
+    async def test_cancel(self):
+        callback = MagicMock()
+        timer = DeadlineTimer(0.02, callback)
+
+        timer.push()
+        timer.cancel()
+        self.assertFalse(timer.is_running())
+        await asyncio.sleep(0.04)
+        callback.assert_not_called()
+
+        # It can be started again
+        timer.push()
+        await asyncio.sleep(0.04)
+        callback.assert_called_once()
+
+    async def test_latency_origin(self):
+        origins = []
+        timer = DeadlineTimer(0.02, lambda: origins.append(latency_origin.get()))
+        first = object()
+        second = object()
+
+        for origin in (first, second):
+            token = latency_origin.set(origin)
+            timer.push()
+            latency_origin.reset(token)
+
+        await asyncio.sleep(0.04)
+        # The timeout is measured from the second push
+        self.assertEqual(len(origins), 1)
+        self.assertIs(origins[0], second)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -24,7 +24,11 @@ import itertools
 import unittest
 from typing import Iterable, List
 
-from inputremapper.injection.mapping_handlers.axis_transform import Transformation
+from inputremapper.injection.mapping_handlers.axis_transform import (
+    Transformation,
+    FLOAT_CACHE_SIZE,
+    MAX_TABLE_SIZE,
+)
 from tests.lib.test_setup import test_setup
 
 
@@ -207,3 +211,46 @@ class TestAxisTransformation(unittest.TestCase):
             f = Transformation(*init_args.values())
             self.assertEqual(f(1), 1)
             self.assertEqual(f(-1), -1)
+
+    def test_integer_table(self):
+        f = Transformation(deadzone=0.1, min_=-255, max_=255, gain=2, expo=0.3)
+        g = Transformation(deadzone=0.1, min_=-255, max_=255, gain=2, expo=0.3)
+
+        for x in (-255, -30, 0, 17, 255, 17):
+            self.assertAlmostEqual(f(x), g._calculate(x))
+
+        self.assertEqual(len(f._table), 511)
+        # Values outside the range are still transformed
+        self.assertAlmostEqual(f(300), g._calculate(300))
+        self.assertEqual(len(f._table), 511)
+
+    def test_no_table_for_large_ranges(self):
+        f = Transformation(deadzone=0, min_=0, max_=MAX_TABLE_SIZE)
+        f(5)
+        self.assertEqual(len(f._table), 0)
+
+        f = Transformation(deadzone=0, min_=-0.5, max_=0.5)
+        f(0)
+        self.assertEqual(len(f._table), 0)
+
+    def test_float_cache_is_bounded(self):
+        f = Transformation(deadzone=0.1, min_=-1, max_=1, expo=-0.5)
+        for i in range(FLOAT_CACHE_SIZE * 3):
+            f(i / (FLOAT_CACHE_SIZE * 3))
+
+        self.assertEqual(f._calculate_cached.cache_info().currsize, FLOAT_CACHE_SIZE)
+
+    def test_set_range(self):
+        f = Transformation(deadzone=0, min_=-10, max_=10)
+        self.assertAlmostEqual(f(5), 0.5)
+        self.assertAlmostEqual(f(0.5), 0.05)
+        table = f._table
+
+        # The same range keeps the table
+        f.set_range(-10, 10)
+        self.assertIs(f._table, table)
+
+        f.set_range(-5, 5)
+        self.assertAlmostEqual(f(5), 1)
+        self.assertAlmostEqual(f(0.5), 0.1)
+        self.assertEqual(len(f._table), 11)
@@ -944,6 +944,49 @@ class TestCombination(EventPipelineTestBase):
             ],
         )
 
+    async def test_no_stuck_key_shared_by_combinations(self):
+        # Both combinations are notified about the release of KEY_A, and both
+        # have to know that it was pressed.
+        origin = fixtures.foo_device_2_keyboard
+        origin_hash = origin.get_device_hash()
+
+        preset = Preset()
+        for code, output_symbol in ((KEY_B, "1"), (KEY_C, "2")):
+            input_combination = InputCombination(
+                [
+                    InputConfig(type=EV_KEY, code=code, origin_hash=origin_hash),
+                    InputConfig(type=EV_KEY, code=KEY_A, origin_hash=origin_hash),
+                ]
+            )
+            preset.add(
+                Mapping(
+                    input_combination=input_combination.to_config(),
+                    target_uinput="keyboard",
+                    output_symbol=output_symbol,
+                    release_combination_keys=False,
+                )
+            )
+
+        event_reader = self.create_event_reader(preset, origin)
+        await self.send_events(
+            [
+                InputEvent.key(KEY_A, 1, origin_hash),
+                InputEvent.key(KEY_B, 1, origin_hash),
+                InputEvent.key(KEY_C, 1, origin_hash),
+                InputEvent.key(KEY_A, 0, origin_hash),
+            ],
+            event_reader,
+        )
+
+        forwarded_history = self.forward_uinput.write_history
+        self.assertListEqual(
+            forwarded_history,
+            [
+                (EV_KEY, KEY_A, 1),
+                (EV_KEY, KEY_A, 0),
+            ],
+        )
+
     async def test_ignore_hold(self):
         # hold as in event-value 2, not in macro-hold.
         # linux will generate events with value 2 after input-remapper injected
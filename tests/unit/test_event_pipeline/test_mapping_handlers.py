@@ -35,6 +35,8 @@ from evdev.ecodes import (
     BTN_LEFT,
     BTN_RIGHT,
     KEY_A,
+    KEY_B,
+    KEY_LEFTCTRL,
     REL_Y,
     REL_WHEEL,
 )
@@ -50,6 +52,7 @@ from inputremapper.injection.mapping_handlers.axis_switch_handler import (
 )
 from inputremapper.injection.mapping_handlers.combination_handler import (
     CombinationHandler,
+    KeyStates,
 )
 from inputremapper.injection.mapping_handlers.hierarchy_handler import HierarchyHandler
 from inputremapper.injection.mapping_handlers.key_handler import KeyHandler
@@ -401,6 +404,54 @@ class TestCombinationHandler(BaseTests, unittest.IsolatedAsyncioTestCase):
         self.assertListEqual(self.uinputs[self.mouse_hash].write_history, [])
         self.assertListEqual(self.uinputs[self.keyboard_hash].write_history, [])
 
+    def test_shared_key_states(self):
+        # Combinations of only EV_KEY inputs share the KeyStates of the context
+        key_states = KeyStates()
+        self.context_mock.key_states = key_states
+
+        def create_handler(codes):
+            combination = InputCombination(
+                [
+                    InputConfig(type=EV_KEY, code=code, origin_hash=self.keyboard_hash)
+                    for code in codes
+                ]
+            )
+            handler = CombinationHandler(
+                combination,
+                Mapping(
+                    input_combination=combination.to_config(),
+                    target_uinput="keyboard",
+                    output_symbol="a",
+                ),
+                self.context_mock,
+                global_uinputs=self.global_uinputs,
+            )
+            handler.set_sub_handler(MagicMock(MappingHandler))
+            return handler
+
+        handler_1 = create_handler([3, 4])
+        handler_2 = create_handler([3, 5])
+        self.assertEqual(len(key_states.bits), 3)
+
+        # The combination with the EV_REL input has its own state
+        self.assertIsNot(self.handler._key_states, key_states)
+
+        for handler in (handler_1, handler_2):
+            handler.notify(
+                InputEvent.key(3, 1, origin_hash=self.keyboard_hash),
+                source=fixtures.foo_device_2_keyboard,
+            )
+
+        handler_2.notify(
+            InputEvent.key(5, 1, origin_hash=self.keyboard_hash),
+            source=fixtures.foo_device_2_keyboard,
+        )
+        self.assertFalse(handler_1._output_previously_active)
+        self.assertTrue(handler_2._output_previously_active)
+
+        handler_2.reset()
+        self.assertEqual(key_states.pressed, 0)
+
 
 @test_setup
 class TestHierarchyHandler(BaseTests, unittest.IsolatedAsyncioTestCase):
@@ -422,6 +473,60 @@ class TestHierarchyHandler(BaseTests, unittest.IsolatedAsyncioTestCase):
         self.mock2.reset.assert_called()
         self.mock3.reset.assert_called()
 
+    def test_only_notifies_combinations_that_can_change(self):
+        key_states = KeyStates()
+        context_mock = MagicMock()
+        context_mock.key_states = key_states
+
+        def create_handler(codes):
+            combination = InputCombination(
+                [InputConfig(type=EV_KEY, code=code) for code in codes]
+            )
+            handler = CombinationHandler(
+                combination,
+                Mapping(
+                    input_combination=combination.to_config(),
+                    target_uinput="keyboard",
+                    output_symbol="c",
+                    release_combination_keys=False,
+                ),
+                context_mock,
+                global_uinputs=self.global_uinputs,
+            )
+            handler.set_sub_handler(MagicMock(MappingHandler))
+            return handler
+
+        ctrl_a = create_handler([KEY_LEFTCTRL, KEY_A])
+        ctrl_b = create_handler([KEY_LEFTCTRL, KEY_B])
+        ctrl = create_handler([KEY_LEFTCTRL])
+        handler = HierarchyHandler(
+            [ctrl_a, ctrl_b, ctrl],
+            InputConfig(type=EV_KEY, code=KEY_LEFTCTRL),
+            self.global_uinputs,
+            key_states,
+        )
+        ctrl_down = InputEvent.key(KEY_LEFTCTRL, 1)
+        ctrl_up = InputEvent.key(KEY_LEFTCTRL, 0)
+
+        # Only the combination of ctrl alone can be activated by ctrl
+        self.assertEqual(handler._get_handlers_to_notify(ctrl_down), [ctrl])
+
+        # All of them keep their rank
+        ctrl_b.notify(InputEvent.key(KEY_B, 1), source=None)
+        self.assertEqual(handler._get_handlers_to_notify(ctrl_down), [ctrl_b, ctrl])
+
+        handler.notify(ctrl_down, source=None)
+        self.assertTrue(ctrl_b._output_previously_active)
+        self.assertFalse(ctrl._output_previously_active)
+        # Both remember that the key-down event of ctrl was not forwarded
+        self.assertEqual(key_states.engaged, {ctrl_b, ctrl})
+
+        # ctrl_a can't change, it never saw the key-down event
+        self.assertEqual(handler._get_handlers_to_notify(ctrl_up), [ctrl_b, ctrl])
+        self.assertTrue(handler.notify(ctrl_up, source=None))
+        self.assertFalse(ctrl_b._output_previously_active)
+        self.assertEqual(key_states.engaged, set())
+
 
 @test_setup
 class TestKeyHandler(BaseTests, unittest.IsolatedAsyncioTestCase):
@@ -506,6 +611,25 @@ class TestMacroHandler(BaseTests, unittest.IsolatedAsyncioTestCase):
         self.assertIn(InputEvent.key(BTN_RIGHT, 0), history[-2:])
         self.assertEqual(len(history), 4)
 
+    async def test_reset_stops_macro(self):
+        self.set_handler(KnownUinput.KEYBOARD, "repeat(1000, key(a).wait(10))")
+
+        self.handler.notify(
+            InputEvent(0, 0, EV_REL, REL_X, 1, actions=(EventActions.as_key,)),
+            source=InputDevice("/dev/input/event11"),
+        )
+        await asyncio.sleep(0.1)
+        history = self.global_uinputs.get_uinput(KnownUinput.KEYBOARD).write_history
+        self.assertGreater(len(history), 0)
+        self.assertTrue(self.handler._macro.running)
+
+        self.handler.reset()
+        await asyncio.sleep(0.1)
+        self.assertFalse(self.handler._macro.running)
+        num_writes = len(history)
+        await asyncio.sleep(0.1)
+        self.assertEqual(len(history), num_writes)
+
     async def test_reset_output(self):
         self.set_handler(KnownUinput.KEYBOARD, "key_down(a)")
 
@@ -543,10 +667,31 @@ class TestRelToBtnHandler(BaseTests, unittest.IsolatedAsyncioTestCase):
                 input_combination=input_combination.to_config(),
                 target_uinput="mouse",
                 output_symbol="BTN_LEFT",
+                release_timeout=0.05,
             ),
             self.global_uinputs,
         )
 
+    async def test_release_after_timeout(self):
+        sub_handler = MagicMock()
+        self.handler.set_sub_handler(sub_handler)
+        source = InputDevice("/dev/input/event11")
+
+        for _ in range(5):
+            self.handler.notify(InputEvent.rel(0, 20), source)
+            await asyncio.sleep(0.02)
+
+        # Each event pushed the release further away
+        self.assertEqual(sub_handler.notify.call_count, 5)
+        for call in sub_handler.notify.call_args_list:
+            self.assertTrue(call[0][0].is_pressed())
+
+        await asyncio.sleep(0.06)
+        self.assertEqual(sub_handler.notify.call_count, 6)
+        release = sub_handler.notify.call_args[0][0]
+        self.assertFalse(release.is_pressed())
+        self.assertFalse(self.handler._active)
+
 
 @test_setup
 class TestRelToRelHanlder(BaseTests, unittest.IsolatedAsyncioTestCase):
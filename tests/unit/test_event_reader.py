@@ -19,7 +19,9 @@
 # along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
 
 import asyncio
+import io
 import os
+import time
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -37,6 +39,8 @@ from evdev.ecodes import (
     REL_Y,
     REL_HWHEEL_HI_RES,
     REL_WHEEL_HI_RES,
+    EV_SYN,
+    SYN_REPORT,
 )
 
 from inputremapper.configs.input_config import InputCombination, InputConfig
@@ -44,12 +48,15 @@ from inputremapper.configs.keyboard_layout import keyboard_layout
 from inputremapper.configs.mapping import Mapping
 from inputremapper.configs.preset import Preset
 from inputremapper.injection.context import Context
+from inputremapper.injection.event_barrier import EventBarrier
 from inputremapper.injection.event_reader import EventReader
+from inputremapper.injection.event_recording import EventRecorder, read_recording
 from inputremapper.injection.global_uinputs import GlobalUInputs, UInput
 from inputremapper.injection.mapping_handlers.mapping_parser import MappingParser
 from inputremapper.input_event import InputEvent
 from inputremapper.utils import get_device_hash
 from tests.lib.fixtures import fixtures
+from tests.lib.pipes import push_events
 from tests.lib.test_setup import test_setup
 
 
@@ -67,7 +74,7 @@ class TestEventReader(unittest.IsolatedAsyncioTestCase):
         self.global_uinputs.is_service = True
         self.global_uinputs.prepare_all()
 
-    async def setup(self, mapping):
+    async def setup(self, mapping, recorder=None):
         """Set a EventReader up for the test and run it in the background."""
         context = Context(
             mapping,
@@ -80,6 +87,7 @@ class TestEventReader(unittest.IsolatedAsyncioTestCase):
             context,
             self.gamepad_source,
             self.stop_event,
+            recorder,
         )
         asyncio.ensure_future(event_reader.run())
         await asyncio.sleep(0.1)
@@ -298,3 +306,261 @@ class TestEventReader(unittest.IsolatedAsyncioTestCase):
         await asyncio.sleep(0.1)
 
         reset_mock.assert_called_once()
+
+    async def test_recorder(self):
+        file = io.BytesIO()
+        await self.setup(self.preset, EventRecorder(file))
+
+        push_events(
+            fixtures.gamepad,
+            [
+                InputEvent.abs(ABS_X, 10, self.source_hash),
+                InputEvent(0, 0, EV_SYN, SYN_REPORT, 0),
+                InputEvent.key(BTN_A, 1, self.source_hash),
+                InputEvent(0, 0, EV_SYN, SYN_REPORT, 0),
+            ],
+            force=True,
+        )
+        await asyncio.sleep(0.1)
+
+        file.seek(0)
+        self.assertEqual(
+            [(event.type, event.code, event.value) for event in read_recording(file)],
+            [
+                (EV_ABS, ABS_X, 10),
+                (EV_SYN, SYN_REPORT, 0),
+                (EV_KEY, BTN_A, 1),
+                (EV_SYN, SYN_REPORT, 0),
+            ],
+        )
+
+    async def test_failing_recorder(self):
+        file = io.BytesIO()
+        recorder = EventRecorder(file)
+        file.close()
+        _, event_reader = await self.setup(self.preset, recorder)
+
+        push_events(
+            fixtures.gamepad,
+            [
+                InputEvent.key(BTN_A, 1, self.source_hash),
+                InputEvent(0, 0, EV_SYN, SYN_REPORT, 0),
+            ],
+            force=True,
+        )
+        await asyncio.sleep(0.1)
+
+        # The injection continues without recording
+        self.assertIsNone(event_reader._recorder)
+        self.assertIn((EV_KEY, BTN_A, 1), self.forward_uinput.write_history)
+
+    async def test_latency_of_macros(self):
+        self.preset.add(
+            Mapping.from_combination(
+                InputCombination(
+                    [InputConfig(type=EV_KEY, code=BTN_A, origin_hash=self.source_hash)]
+                ),
+                "keyboard",
+                "wait(50).key(a)",
+            )
+        )
+        context, _ = await self.setup(self.preset)
+
+        sec, usec = divmod(round(time.time() * 1000000), 1000000)
+        push_events(
+            fixtures.gamepad,
+            [InputEvent(sec, usec, EV_KEY, BTN_A, 1, origin_hash=self.source_hash)],
+            force=True,
+        )
+        await asyncio.sleep(0.02)
+        # Not recorded before the macro injected something
+        self.assertEqual(context.latency_stats.to_dict(), {})
+
+        await asyncio.sleep(0.1)
+        stats = context.latency_stats.to_dict()[self.source_hash]
+        self.assertEqual(list(stats.keys()), ["CombinationHandler"])
+        # Only the first key that the macro wrote
+        self.assertEqual(stats["CombinationHandler"]["count"], 1)
+        self.assertGreaterEqual(stats["CombinationHandler"]["max_us"], 50000)
+
+    async def test_latency_while_profiling(self):
+        self.preset.add(
+            Mapping.from_combination(
+                InputCombination(
+                    [InputConfig(type=EV_KEY, code=BTN_A, origin_hash=self.source_hash)]
+                ),
+                "keyboard",
+                "a",
+            )
+        )
+        context, _ = await self.setup(self.preset)
+        context.set_profiling(True)
+
+        sec, usec = divmod(round(time.time() * 1000000), 1000000)
+        push_events(
+            fixtures.gamepad,
+            [InputEvent(sec, usec, EV_KEY, BTN_A, 1, origin_hash=self.source_hash)],
+            force=True,
+        )
+        await asyncio.sleep(0.1)
+
+        # The wrapped notify methods are still recorded under their handlers
+        stats = context.latency_stats.to_dict()[self.source_hash]
+        self.assertEqual(list(stats.keys()), ["CombinationHandler"])
+        self.assertIn("1 calls, 100% handled", context.get_profile())
+
+    async def test_frames(self):
+        gamepad_hash = get_device_hash(self.gamepad_source)
+        self.preset.add(
+            Mapping.from_combination(
+                InputCombination(
+                    [InputConfig(type=EV_KEY, code=BTN_A, origin_hash=gamepad_hash)]
+                ),
+                "keyboard",
+                "a",
+            )
+        )
+        _, event_reader = await self.setup(self.preset)
+
+        with patch.object(
+            event_reader,
+            "handle_frame_sync",
+            wraps=event_reader.handle_frame_sync,
+        ) as handle_frame_mock:
+            push_events(
+                fixtures.gamepad,
+                [
+                    InputEvent.abs(ABS_X, 10, gamepad_hash),
+                    InputEvent.abs(ABS_Y, 20, gamepad_hash),
+                    InputEvent(0, 0, EV_SYN, SYN_REPORT, 0),
+                    InputEvent.key(BTN_A, 1, gamepad_hash),
+                    InputEvent(0, 0, EV_SYN, SYN_REPORT, 0),
+                ],
+                force=True,
+            )
+            await asyncio.sleep(0.1)
+
+        # one call per frame
+        self.assertEqual(handle_frame_mock.call_count, 2)
+        first_frame = handle_frame_mock.call_args_list[0].args[0]
+        second_frame = handle_frame_mock.call_args_list[1].args[0]
+        self.assertEqual(
+            [event.event_tuple for event in first_frame],
+            [(EV_ABS, ABS_X, 10), (EV_ABS, ABS_Y, 20), (EV_SYN, SYN_REPORT, 0)],
+        )
+        self.assertEqual(
+            [event.event_tuple for event in second_frame],
+            [(EV_KEY, BTN_A, 1), (EV_SYN, SYN_REPORT, 0)],
+        )
+
+        code_a = keyboard_layout.get("a")
+        history = self.global_uinputs.get_uinput("keyboard").write_history
+        self.assertIn((EV_KEY, code_a, 1), history)
+
+    async def test_handles_synchronously_without_listeners(self):
+        _, event_reader = await self.setup(self.preset)
+
+        with patch.object(asyncio, "ensure_future") as ensure_future_mock:
+            self.gamepad_source.push_events([InputEvent.key(BTN_A, 1)])
+            await asyncio.sleep(0.1)
+
+        ensure_future_mock.assert_not_called()
+        self.assertIn((EV_KEY, BTN_A, 1), self.forward_uinput.write_history)
+
+    async def test_listeners_use_the_async_path(self):
+        context, event_reader = await self.setup(self.preset)
+
+        received = []
+
+        async def listener(event):
+            received.append(event)
+
+        context.listeners.add(listener)
+
+        with patch.object(
+            event_reader,
+            "handle_frame_sync",
+            wraps=event_reader.handle_frame_sync,
+        ) as handle_frame_sync_mock:
+            self.gamepad_source.push_events([InputEvent.key(BTN_A, 1)])
+            await asyncio.sleep(0.1)
+
+        handle_frame_sync_mock.assert_not_called()
+        self.assertEqual(received, [(EV_KEY, BTN_A, 1)])
+        self.assertIn((EV_KEY, BTN_A, 1), self.forward_uinput.write_history)
+
+    async def test_barrier_holds_events_back(self):
+        context, event_reader = await self.setup(self.preset)
+
+        barrier = EventBarrier()
+
+        async def listener(_):
+            return barrier
+
+        context.listeners.add(listener)
+
+        self.gamepad_source.push_events([InputEvent.key(BTN_A, 1)])
+        await asyncio.sleep(0.1)
+        self.assertNotIn((EV_KEY, BTN_A, 1), self.forward_uinput.write_history)
+
+        barrier.release()
+        await asyncio.sleep(0.01)
+        self.assertIn((EV_KEY, BTN_A, 1), self.forward_uinput.write_history)
+
+    async def test_release_after_this_step(self):
+        context, event_reader = await self.setup(self.preset)
+
+        barrier = EventBarrier()
+
+        async def listener(_):
+            return barrier
+
+        context.listeners.add(listener)
+        self.gamepad_source.push_events([InputEvent.key(BTN_A, 1)])
+        await asyncio.sleep(0.1)
+
+        barrier.release_after_this_step()
+        # Nothing happens until this coroutine yields control
+        self.assertFalse(barrier.is_released())
+        self.assertNotIn((EV_KEY, BTN_A, 1), self.forward_uinput.write_history)
+        await asyncio.sleep(0)
+        self.assertTrue(barrier.is_released())
+        await asyncio.sleep(0.01)
+        self.assertIn((EV_KEY, BTN_A, 1), self.forward_uinput.write_history)
+
+    async def test_listeners_keep_forwarded_frames_intact(self):
+        context, event_reader = await self.setup(self.preset)
+
+        async def listener(_):
+            return None
+
+        context.listeners.add(listener)
+
+        with patch.object(self.forward_uinput, "syn") as syn_mock:
+            push_events(
+                fixtures.gamepad,
+                [
+                    InputEvent.rel(REL_X, 1, self.source_hash),
+                    InputEvent.rel(REL_Y, 1, self.source_hash),
+                    InputEvent(0, 0, EV_SYN, SYN_REPORT, 0),
+                ],
+                force=True,
+            )
+            await asyncio.sleep(0.1)
+
+        # The SYN_REPORT of the source is forwarded, and nothing else is synced
+        self.assertEqual(
+            self.forward_uinput.write_history,
+            [(EV_REL, REL_X, 1), (EV_REL, REL_Y, 1), (EV_SYN, SYN_REPORT, 0)],
+        )
+        syn_mock.assert_not_called()
+
+    def test_split_frames(self):
+        events = [
+            InputEvent.key(BTN_A, 1),
+            InputEvent(0, 0, EV_SYN, SYN_REPORT, 0),
+            InputEvent.key(BTN_A, 0),
+        ]
+        frames = EventReader._split_frames(events)
+        # the incomplete frame at the end is not held back
+        self.assertEqual(frames, [events[:2], events[2:]])
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+import io
+import unittest
+
+import evdev
+from evdev.ecodes import EV_KEY, EV_ABS, EV_SYN, KEY_A, ABS_X, SYN_REPORT
+
+from inputremapper.exceptions import InvalidRecording
+from inputremapper.injection.event_recording import EventRecorder, read_recording
+from tests.lib.test_setup import test_setup
+
+
+@test_setup
+class TestEventRecording(unittest.TestCase):
+    def test_replay(self):
+        file = io.BytesIO()
+        recorder = EventRecorder(file)
+        recorder.record(
+            [
+                evdev.InputEvent(1, 2, EV_ABS, ABS_X, -(2**15)),
+                evdev.InputEvent(1, 2, EV_SYN, SYN_REPORT, 0),
+            ]
+        )
+        recorder.record(
+            [
+                evdev.InputEvent(3, 999999, EV_KEY, KEY_A, 1),
+                evdev.InputEvent(3, 999999, EV_SYN, SYN_REPORT, 0),
+            ]
+        )
+
+        file.seek(0)
+        events = read_recording(file)
+        self.assertEqual(
+            [
+                (event.sec, event.usec, event.type, event.code, event.value)
+                for event in events
+            ],
+            [
+                (1, 2, EV_ABS, ABS_X, -(2**15)),
+                (1, 2, EV_SYN, SYN_REPORT, 0),
+                (3, 999999, EV_KEY, KEY_A, 1),
+                (3, 999999, EV_SYN, SYN_REPORT, 0),
+            ],
+        )
+
+    def test_invalid(self):
+        with self.assertRaises(InvalidRecording):
+            read_recording(io.BytesIO(b'{"foo": "bar"}'))
+
+        file = io.BytesIO()
+        EventRecorder(file).record([evdev.InputEvent(1, 2, EV_KEY, KEY_A, 1)])
+        file.seek(0)
+        truncated = io.BytesIO(file.read()[:-1])
+        with self.assertRaises(InvalidRecording):
+            read_recording(truncated)
+
+
+if __name__ == "__main__":
+    unittest.main()
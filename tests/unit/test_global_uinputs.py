@@ -18,20 +18,38 @@
 # You should have received a copy of the GNU General Public License
 # along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
 
+import os
+import struct
 import unittest
+from unittest.mock import patch
 
 import evdev
 from evdev.ecodes import (
     KEY_A,
+    KEY_B,
     ABS_X,
+    EV_KEY,
+    EV_REL,
+    EV_SYN,
+    REL_X,
+    REL_Y,
+    SYN_REPORT,
+    BTN_LEFT,
+    EV_ABS,
 )
 
 from inputremapper.exceptions import EventNotHandled, UinputNotAvailable
 from inputremapper.injection.global_uinputs import (
     FrontendUInput,
     GlobalUInputs,
+    RawUInput,
     UInput,
 )
+from inputremapper.injection.latency import (
+    LatencyOrigin,
+    LatencyStats,
+    latency_origin,
+)
 from inputremapper.input_event import InputEvent
 from tests.lib.cleanup import cleanup
 from tests.lib.test_setup import test_setup
@@ -87,6 +105,33 @@ class TestGlobalUInputs(unittest.TestCase):
         with self.assertRaises(UinputNotAvailable):
             global_uinputs.write(ev_1.event_tuple, "foo")
 
+    def test_can_default_uinput_emit(self):
+        self.assertTrue(
+            GlobalUInputs.can_default_uinput_emit("keyboard", EV_KEY, KEY_A)
+        )
+        self.assertTrue(GlobalUInputs.can_default_uinput_emit("gamepad", EV_ABS, ABS_X))
+        self.assertFalse(GlobalUInputs.can_default_uinput_emit("mouse", EV_KEY, KEY_A))
+        self.assertFalse(GlobalUInputs.can_default_uinput_emit("mouse", EV_ABS, ABS_X))
+        self.assertFalse(GlobalUInputs.can_default_uinput_emit("foo", EV_KEY, KEY_A))
+
+    def test_find_fitting_default_uinputs(self):
+        self.assertListEqual(
+            GlobalUInputs.find_fitting_default_uinputs(EV_KEY, KEY_A),
+            ["keyboard", "keyboard + mouse"],
+        )
+        self.assertListEqual(
+            GlobalUInputs.find_fitting_default_uinputs(EV_KEY, BTN_LEFT),
+            ["mouse", "keyboard + mouse"],
+        )
+        self.assertListEqual(
+            GlobalUInputs.find_fitting_default_uinputs(EV_ABS, ABS_X),
+            ["gamepad"],
+        )
+        self.assertListEqual(
+            GlobalUInputs.find_fitting_default_uinputs(EV_SYN, SYN_REPORT),
+            [],
+        )
+
     def test_creates_frontend_uinputs(self):
         frontend_uinputs = GlobalUInputs(FrontendUInput)
         frontend_uinputs.prepare_all()
@@ -98,3 +143,178 @@ class TestGlobalUInputs(unittest.TestCase):
         frontend_uinputs.prepare_all()
         uinput = frontend_uinputs.get_uinput("keyboard")
         self.assertIsInstance(uinput, UInput)
+
+    def test_frame(self):
+        global_uinputs = GlobalUInputs(UInput)
+        global_uinputs.prepare_all()
+        mouse = global_uinputs.get_uinput("mouse")
+
+        with patch.object(mouse, "syn") as syn:
+            with global_uinputs.frame():
+                global_uinputs.write((EV_REL, REL_X, 1), "mouse")
+                global_uinputs.write((EV_REL, REL_Y, 2), "mouse")
+                # nothing is written until the frame is done
+                self.assertEqual(mouse.write_count, 0)
+
+            self.assertEqual(mouse.write_count, 2)
+            self.assertEqual(syn.call_count, 1)
+
+            # outside of frames each event is synced immediately
+            global_uinputs.write((EV_REL, REL_X, 1), "mouse")
+            self.assertEqual(mouse.write_count, 3)
+            self.assertEqual(syn.call_count, 2)
+
+    def test_nested_frames(self):
+        global_uinputs = GlobalUInputs(UInput)
+        global_uinputs.prepare_all()
+        keyboard = global_uinputs.get_uinput("keyboard")
+
+        with patch.object(keyboard, "syn") as syn:
+            with global_uinputs.frame():
+                with global_uinputs.frame():
+                    global_uinputs.write((EV_KEY, KEY_A, 1), "keyboard")
+
+                self.assertEqual(keyboard.write_count, 0)
+                global_uinputs.write((EV_KEY, KEY_B, 1), "keyboard")
+
+            self.assertEqual(keyboard.write_count, 2)
+            self.assertEqual(syn.call_count, 1)
+
+    def test_frame_keeps_order_between_uinputs(self):
+        global_uinputs = GlobalUInputs(UInput)
+        global_uinputs.prepare_all()
+        keyboard = global_uinputs.get_uinput("keyboard")
+        mouse = global_uinputs.get_uinput("mouse")
+
+        calls = []
+
+        def record(name, *args):
+            calls.append((name, *args))
+
+        with (
+            patch.object(keyboard, "write", lambda *event: record("keyboard", *event)),
+            patch.object(keyboard, "syn", lambda: record("keyboard")),
+            patch.object(mouse, "write", lambda *event: record("mouse", *event)),
+            patch.object(mouse, "syn", lambda: record("mouse")),
+        ):
+            with global_uinputs.frame():
+                global_uinputs.write((EV_KEY, KEY_A, 1), "keyboard")
+                global_uinputs.write((EV_REL, REL_X, 1), "mouse")
+                global_uinputs.write((EV_KEY, KEY_A, 0), "keyboard")
+
+        self.assertListEqual(
+            calls,
+            [
+                ("keyboard", EV_KEY, KEY_A, 1),
+                ("keyboard",),
+                ("mouse", EV_REL, REL_X, 1),
+                ("mouse",),
+                ("keyboard", EV_KEY, KEY_A, 0),
+                ("keyboard",),
+            ],
+        )
+
+    def test_forward(self):
+        global_uinputs = GlobalUInputs(UInput)
+        forward_to = UInput(name="forward")
+
+        with patch.object(forward_to, "syn") as syn:
+            global_uinputs.forward(forward_to, (EV_KEY, KEY_A, 1))
+            self.assertEqual(forward_to.write_count, 1)
+            self.assertEqual(syn.call_count, 0)
+
+            global_uinputs.forward(forward_to, (EV_KEY, KEY_A, 0), sync=True)
+            self.assertEqual(forward_to.write_count, 2)
+            self.assertEqual(syn.call_count, 1)
+
+            with global_uinputs.frame():
+                global_uinputs.forward(forward_to, (EV_KEY, KEY_A, 1))
+                # the frame brings its own SYN_REPORT
+                global_uinputs.forward(forward_to, (EV_SYN, SYN_REPORT, 0))
+
+            self.assertEqual(forward_to.write_count, 3)
+            self.assertEqual(syn.call_count, 2)
+
+    def test_latency_is_recorded_after_writing(self):
+        global_uinputs = GlobalUInputs(UInput)
+        global_uinputs.prepare_all()
+        keyboard = global_uinputs.get_uinput("keyboard")
+        forward_to = UInput(name="forward")
+
+        stats = LatencyStats()
+        written_when_recorded = []
+
+        def record(*_):
+            written_when_recorded.append(keyboard.write_count + forward_to.write_count)
+
+        event = InputEvent(1000, 0, EV_KEY, KEY_A, 1)
+        token = latency_origin.set(LatencyOrigin(stats, "abcd", "KeyHandler", event))
+        try:
+            with patch.object(stats, "record", record):
+                with global_uinputs.frame():
+                    global_uinputs.write((EV_KEY, KEY_A, 1), "keyboard")
+                    global_uinputs.forward(forward_to, (EV_KEY, KEY_B, 1))
+                    self.assertEqual(written_when_recorded, [])
+
+                # Recorded once, after everything was written
+                self.assertEqual(written_when_recorded, [2])
+
+                # Writes that nothing caused aren't recorded
+                latency_origin.set(None)
+                global_uinputs.write((EV_KEY, KEY_A, 0), "keyboard")
+                self.assertEqual(written_when_recorded, [2])
+        finally:
+            latency_origin.reset(token)
+
+
+@test_setup
+class TestRawUInput(unittest.TestCase):
+    def setUp(self) -> None:
+        cleanup()
+        self.read_fd, self.write_fd = os.pipe()
+
+    def tearDown(self) -> None:
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+    def read_events(self):
+        data = os.read(self.read_fd, 4096)
+        return [
+            (type_, code, value)
+            for _, _, type_, code, value in struct.iter_unpack("llHHi", data)
+        ]
+
+    def test_write_frame(self):
+        uinput = RawUInput(name="raw")
+        uinput.fd = self.write_fd
+
+        uinput.write_frame([(EV_REL, REL_X, 1), (EV_REL, REL_Y, -2)])
+        self.assertListEqual(
+            self.read_events(),
+            [(EV_REL, REL_X, 1), (EV_REL, REL_Y, -2), (EV_SYN, SYN_REPORT, 0)],
+        )
+        # python-evdev wasn't used
+        self.assertEqual(uinput.write_count, 0)
+
+    def test_large_frame(self):
+        uinput = RawUInput(name="raw")
+        uinput.fd = self.write_fd
+
+        events = [(EV_REL, REL_X, i) for i in range(100)]
+        uinput.write_frame(events)
+        self.assertListEqual(self.read_events(), [*events, (EV_SYN, SYN_REPORT, 0)])
+
+    def test_falls_back_to_evdev(self):
+        uinput = RawUInput(name="raw")
+        uinput.fd = -1
+
+        uinput.write_frame([(EV_KEY, KEY_A, 1)])
+        self.assertEqual(uinput.write_count, 1)
+        self.assertEqual(uinput.write_history[0].event_tuple, (EV_KEY, KEY_A, 1))
+
+        # and it doesn't try it again
+        with patch.object(os, "write") as write:
+            uinput.write_frame([(EV_KEY, KEY_A, 0)])
+            write.assert_not_called()
+
+        self.assertEqual(uinput.write_count, 2)
@@ -37,8 +37,10 @@ from evdev.ecodes import (
     EV_ABS,
     ABS_HAT0X,
     KEY_A,
+    KEY_C,
     REL_HWHEEL,
     BTN_A,
+    BTN_LEFT,
     ABS_X,
     ABS_VOLUME,
 )
@@ -205,7 +207,7 @@ class TestInjector(unittest.IsolatedAsyncioTestCase):
             "/dev/input/event1234",
         ]
 
-        grabbed = self.injector._grab_devices()
+        grabbed, _ = self.injector._prepare_devices()
         self.assertEqual(len(grabbed), 1)
         self.assertEqual(grabbed[device_hash].path, "/dev/input/event30")
 
@@ -228,7 +230,7 @@ class TestInjector(unittest.IsolatedAsyncioTestCase):
         self.injector.context = Context(preset, {}, {}, self.mapping_parser)
 
         path = "/dev/input/event30"
-        devices = self.injector._grab_devices()
+        devices, _ = self.injector._prepare_devices()
         self.assertEqual(len(devices), 1)
         self.assertEqual(devices[device_hash].path, path)
         gamepad = classify(devices[device_hash]) == DeviceType.GAMEPAD
@@ -248,10 +250,59 @@ class TestInjector(unittest.IsolatedAsyncioTestCase):
         self.injector.context = Context(preset, {}, {}, self.mapping_parser)
 
         # grabs only one device even though the group has 4 devices
-        devices = self.injector._grab_devices()
+        devices, _ = self.injector._prepare_devices()
         self.assertEqual(len(devices), 1)
         self.assertEqual(self.failed, 2)
 
+    def test_prepare_devices_in_parallel(self):
+        keyboard_hash = fixtures.foo_device_2_keyboard.get_device_hash()
+        mouse_hash = fixtures.foo_device_2_mouse.get_device_hash()
+
+        preset = Preset()
+        preset.add(
+            Mapping.from_combination(
+                InputCombination(
+                    [InputConfig(type=EV_KEY, code=10, origin_hash=keyboard_hash)]
+                ),
+                "keyboard",
+                "a",
+            )
+        )
+        preset.add(
+            Mapping.from_combination(
+                InputCombination(
+                    [InputConfig(type=EV_KEY, code=BTN_LEFT, origin_hash=mouse_hash)]
+                ),
+                "keyboard",
+                "b",
+            )
+        )
+        self.initialize_injector(groups.find(key="Foo Device 2"), preset)
+
+        def grab_mouse_only(device):
+            if device.path != fixtures.foo_device_2_mouse.path:
+                self.failed += 1
+                raise OSError()
+
+        evdev.InputDevice.grab = grab_mouse_only
+
+        start = time.monotonic()
+        sources, forward_devices = self.injector._prepare_devices()
+        duration = time.monotonic() - start
+
+        # the keyboard can't be grabbed, but the mouse is still used
+        self.assertEqual(list(sources), [mouse_hash])
+        self.assertEqual(list(forward_devices), [mouse_hash])
+        self.assertEqual(
+            forward_devices[mouse_hash].name,
+            get_forward_name(fixtures.foo_device_2_mouse.name),
+        )
+
+        # retries become less frequent, but don't exceed the timeout
+        self.assertGreater(self.failed, 1)
+        self.assertLess(self.failed, 20)
+        self.assertLess(duration, self.injector.regrab_timeout * 12)
+
     def test_skip_unknown_device(self):
         preset = Preset()
         preset.add(
@@ -265,7 +316,7 @@ class TestInjector(unittest.IsolatedAsyncioTestCase):
         # skips a device because its capabilities are not used in the preset
         self.initialize_injector(groups.find(key="Foo Device 2"), preset)
         self.injector.context = Context(preset, {}, {}, self.mapping_parser)
-        devices = self.injector._grab_devices()
+        devices, _ = self.injector._prepare_devices()
 
         # skips the device alltogether, so no grab attempts fail
         self.assertEqual(self.failed, 0)
@@ -568,6 +619,91 @@ class TestInjector(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(numlock_before, numlock_after)
         self.assertEqual(self.injector.get_state(), InjectorState.RUNNING)
 
+    def test_replace_preset(self):
+        keyboard_hash = fixtures.foo_device_2_keyboard.get_device_hash()
+
+        def create_preset(output_symbol):
+            preset = Preset()
+            preset.add(
+                Mapping.from_combination(
+                    InputCombination(
+                        [InputConfig(type=EV_KEY, code=8, origin_hash=keyboard_hash)]
+                    ),
+                    "keyboard",
+                    output_symbol,
+                )
+            )
+            return preset
+
+        self.injector = Injector(
+            groups.find(key="Foo Device 2"),
+            create_preset("KEY_B"),
+            self.mapping_parser,
+        )
+        self.injector.start()
+        uinput_write_history_pipe[0].poll(timeout=1)
+        self.assertEqual(self.injector.get_state(), InjectorState.RUNNING)
+        time.sleep(EVENT_READ_TIMEOUT * 10)
+
+        preset = create_preset("KEY_C")
+        self.assertTrue(self.injector.replace_preset(preset))
+        self.assertIs(self.injector.preset, preset)
+
+        push_events(
+            fixtures.foo_device_2_keyboard,
+            [InputEvent.key(8, 1), InputEvent.key(8, 0)],
+        )
+        time.sleep(0.1)
+
+        # The devices stayed grabbed, and the new preset is used
+        self.assertEqual(
+            read_write_history_pipe(),
+            [(EV_KEY, KEY_C, 1), (EV_KEY, KEY_C, 0)],
+        )
+        self.assertEqual(self.injector.get_state(), InjectorState.RUNNING)
+
+    def test_replace_preset_with_ungrabbed_device(self):
+        self.injector = Injector(
+            groups.find(key="Foo Device 2"),
+            Preset(),
+            self.mapping_parser,
+        )
+        # Pretend it is running with a context
+        self.injector.context = Context(Preset(), {}, {}, self.mapping_parser)
+        self.injector._devices = self.injector.group.get_devices()
+        self.injector._sources = {}
+        self.injector._forward_devices = {}
+        self.injector._event_readers = []
+
+        # The keyboard that has this key is not grabbed
+        mapping_dicts = [
+            {
+                "input_combination": InputCombination(
+                    [InputConfig(type=EV_KEY, code=8)]
+                ).to_config(),
+                "target_uinput": "keyboard",
+                "output_symbol": "KEY_B",
+            }
+        ]
+
+        old_context = self.injector.context
+        self.assertFalse(self.injector._replace_preset(mapping_dicts, None))
+        self.assertIs(self.injector.context, old_context)
+
+    def test_replace_preset_with_invalid_mappings(self):
+        self.injector = Injector(
+            groups.find(key="Foo Device 2"),
+            Preset(),
+            self.mapping_parser,
+        )
+        self.injector.context = Context(Preset(), {}, {}, self.mapping_parser)
+        self.injector._event_readers = []
+
+        old_context = self.injector.context
+        mapping_dicts = [{"target_uinput": "keyboard", "output_symbol": "foo("}]
+        self.assertFalse(self.injector._replace_preset(mapping_dicts, None))
+        self.assertIs(self.injector.context, old_context)
+
     def test_is_in_capabilities(self):
         key = InputCombination(InputCombination.from_tuples((1, 2, 1)))
         capabilities = {1: [9, 2, 5]}
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+import time
+import unittest
+
+from evdev.ecodes import EV_KEY, KEY_B
+
+from inputremapper.configs.input_config import InputCombination, InputConfig
+from inputremapper.configs.mapping import Mapping
+from inputremapper.configs.preset import Preset
+from inputremapper.groups import groups
+from inputremapper.injection.global_uinputs import GlobalUInputs, UInput
+from inputremapper.injection.injector import InjectorState
+from inputremapper.injection.injector_pool import InjectorPool
+from inputremapper.injection.mapping_handlers.mapping_parser import MappingParser
+from inputremapper.input_event import InputEvent
+from tests.lib.fixtures import fixtures
+from tests.lib.pipes import push_events, read_write_history_pipe
+from tests.lib.test_setup import test_setup
+
+
+@test_setup
+class TestInjectorPool(unittest.TestCase):
+    def setUp(self):
+        self.global_uinputs = GlobalUInputs(UInput)
+        self.global_uinputs.prepare_single("keyboard")
+        self.pool = InjectorPool(MappingParser(self.global_uinputs), size=1)
+        self.injector = None
+
+    def tearDown(self):
+        self.pool.close()
+        if self.injector is not None:
+            self.injector.stop_injecting()
+            time.sleep(0.2)
+
+    def wait_for_state(self, state: InjectorState) -> None:
+        for _ in range(20):
+            if self.injector.get_state() == state:
+                return
+
+            time.sleep(0.1)
+
+        raise AssertionError(f"Expected {state}, got {self.injector.get_state()}")
+
+    def test_take(self):
+        self.pool.fill()
+        self.assertEqual(len(self.pool._idle), 1)
+
+        preset = Preset()
+        preset.add(
+            Mapping.from_combination(
+                InputCombination(
+                    [
+                        InputConfig(
+                            type=EV_KEY,
+                            code=8,
+                            origin_hash=fixtures.foo_device_2_keyboard.get_device_hash(),
+                        )
+                    ]
+                ),
+                "keyboard",
+                "KEY_B",
+            )
+        )
+        group = groups.find(key="Foo Device 2")
+        self.injector = self.pool.take(group, preset, requested_at=time.monotonic())
+        self.assertIsNotNone(self.injector)
+        self.assertEqual(len(self.pool._idle), 0)
+        self.assertIs(self.injector.group, group)
+        self.assertIs(self.injector.preset, preset)
+
+        self.wait_for_state(InjectorState.RUNNING)
+        push_events(
+            fixtures.foo_device_2_keyboard,
+            [InputEvent.key(8, 1), InputEvent.key(8, 0)],
+        )
+        time.sleep(0.1)
+        self.assertEqual(
+            read_write_history_pipe(),
+            [(EV_KEY, KEY_B, 1), (EV_KEY, KEY_B, 0)],
+        )
+
+    def test_prepares_uinputs(self):
+        global_uinputs = GlobalUInputs(UInput)
+        pool = InjectorPool(MappingParser(global_uinputs), size=1)
+        self.assertEqual(len(global_uinputs.devices), 0)
+
+        pool.fill()
+        try:
+            # Otherwise the first take() would miss, and fill() would fork again
+            uinputs = {"keyboard", "mouse", "keyboard + mouse"}
+            self.assertEqual(set(global_uinputs.devices), uinputs)
+            self.assertEqual(pool._idle[0][1], uinputs)
+        finally:
+            pool.close()
+
+    def test_missing_uinput(self):
+        self.pool.fill()
+        idle_injector = self.pool._idle[0][0]
+
+        preset = Preset()
+        preset.add(
+            Mapping.from_combination(
+                InputCombination([InputConfig(type=EV_KEY, code=8)]),
+                "gamepad",
+                "BTN_A",
+            )
+        )
+        group = groups.find(key="Foo Device 2")
+        self.assertIsNone(self.pool.take(group, preset))
+
+        # After the daemon created the uinput, the idle injector is replaced
+        self.global_uinputs.prepare_single("gamepad")
+        self.pool.fill()
+        self.assertEqual(len(self.pool._idle), 1)
+        self.assertIsNot(self.pool._idle[0][0], idle_injector)
+        time.sleep(0.2)
+        self.assertFalse(idle_injector.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
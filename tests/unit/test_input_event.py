@@ -70,14 +70,11 @@ class TestInputEvent(unittest.TestCase):
         )
         self.assertEqual(e1.type_and_code, (evdev.ecodes.EV_KEY, evdev.ecodes.BTN_LEFT))
 
-        with self.assertRaises(
-            FrozenInstanceError
-        ):  # would be TypeError on a slotted class
+        # Depending on the python version, slotted dataclasses raise a TypeError
+        with self.assertRaises((FrozenInstanceError, TypeError)):
             e1.event_tuple = (1, 2, 3)
 
-        with self.assertRaises(
-            FrozenInstanceError
-        ):  # would be TypeError on a slotted class
+        with self.assertRaises((FrozenInstanceError, TypeError)):
             e1.type_and_code = (1, 2)
 
         with self.assertRaises(FrozenInstanceError):
@@ -100,6 +97,33 @@ class TestInputEvent(unittest.TestCase):
         self.assertEqual(e3.code, 0)
         self.assertEqual(e3.value, 0)
 
+    def test_input_match_hash(self):
+        e1 = InputEvent(1, 2, 3, 4, 5, origin_hash="foo")
+        self.assertEqual(e1.input_match_hash, (3, 4, "foo"))
+        # created only once
+        self.assertIs(e1.input_match_hash, e1.input_match_hash)
+
+        self.assertEqual(e1.modify(value=6).input_match_hash, (3, 4, "foo"))
+        self.assertEqual(e1.modify(code=7).input_match_hash, (3, 7, "foo"))
+        self.assertEqual(
+            e1.modify(origin_hash="bar").input_match_hash,
+            (3, 4, "bar"),
+        )
+
+        # not part of comparisons or the hash
+        self.assertEqual(hash(e1), hash(InputEvent(1, 2, 3, 4, 5, origin_hash="foo")))
+
+    def test_slots(self):
+        e1 = InputEvent(1, 2, 3, 4, 5)
+        self.assertFalse(hasattr(e1, "__dict__"))
+
+    def test_modify_keeps_pressed(self):
+        e1 = InputEvent(1, 2, 3, 4, 5)
+        self.assertTrue(e1.modify(value=0).pressed)
+        self.assertFalse(e1.modify(pressed=False).pressed)
+        self.assertFalse(InputEvent(1, 2, 3, 4, 0).modify(value=1).pressed)
+        self.assertIs(e1.modify(pressed=False).modify(direction=-1).pressed, False)
+
     def test_is_wheel_event(self):
         input_event_x = InputEvent(
             0,
@@ -22,22 +22,21 @@ import asyncio
 import multiprocessing
 import os
 import select
+import threading
 import time
 import unittest
 
 from inputremapper.ipc.pipe import Pipe
-from inputremapper.ipc.shared_dict import SharedDict
+from inputremapper.ipc.shared_memory_dict import _SEQUENCE, SharedMemoryDict
 from inputremapper.ipc.socket import Server, Client, Base
 from tests.lib.test_setup import test_setup
 from tests.lib.tmp import tmp
 
 
 @test_setup
-class TestSharedDict(unittest.TestCase):
+class TestSharedMemoryDict(unittest.TestCase):
     def setUp(self):
-        self.shared_dict = SharedDict()
-        self.shared_dict.start()
-        time.sleep(0.02)
+        self.shared_dict = SharedMemoryDict()
 
     def test_returns_none(self):
         self.assertIsNone(self.shared_dict.get("a"))
@@ -46,6 +45,144 @@ class TestSharedDict(unittest.TestCase):
         self.shared_dict.set("a", 3)
         self.assertEqual(self.shared_dict.get("a"), 3)
 
+        for value in [None, True, 1.5, "foo", "", 0]:
+            self.shared_dict.set("a", value)
+            self.assertEqual(self.shared_dict.get("a"), value)
+            self.assertIs(type(self.shared_dict.get("a")), type(value))
+
+    def test_collisions(self):
+        # more keys than slots would be needed without collisions
+        keys = [f"key_{i}" for i in range(SharedMemoryDict.slots // 2)]
+        for i, key in enumerate(keys):
+            self.shared_dict.set(key, i)
+
+        for i, key in enumerate(keys):
+            self.assertEqual(self.shared_dict.get(key), i)
+
+    def test_too_large(self):
+        self.shared_dict.set("a", 1)
+        self.shared_dict.set("a", "a" * SharedMemoryDict.slot_size)
+        self.assertEqual(self.shared_dict.get("a"), 1)
+
+        self.shared_dict.set("a" * 100, 1)
+        self.assertIsNone(self.shared_dict.get("a" * 100))
+
+    def test_clear(self):
+        self.shared_dict.set("a", 1)
+        self.shared_dict.set("b", 2)
+        version = self.shared_dict.get_version()
+        self.shared_dict._clear()
+        self.assertIsNone(self.shared_dict.get("a"))
+        self.assertIsNone(self.shared_dict.get("b"))
+        self.assertGreater(self.shared_dict.get_version(), version)
+
+    def test_shared_with_forked_processes(self):
+        def write():
+            for i in range(1000):
+                self.shared_dict.set("a", i)
+
+            self.shared_dict.set("b", "done")
+
+        process = multiprocessing.Process(target=write)
+        process.start()
+
+        # Reading while the other process is writing never yields broken values
+        while process.is_alive():
+            value = self.shared_dict.get("a")
+            self.assertTrue(value is None or 0 <= value < 1000)
+
+        process.join()
+        self.assertEqual(self.shared_dict.get("a"), 999)
+        self.assertEqual(self.shared_dict.get("b"), "done")
+        self.assertEqual(self.shared_dict.get_version(), 1001)
+
+    def _set_sequence(self, key: str, pid: int, change: int) -> None:
+        """Pretend that the process with the pid is writing to the key, or done."""
+        offset = self.shared_dict._get_offset(self.shared_dict._hash(key.encode()))
+        (sequence,) = _SEQUENCE.unpack_from(self.shared_dict._memory, offset)
+        _SEQUENCE.pack_into(self.shared_dict._memory, offset, sequence + change)
+        self.shared_dict._set_writer(pid)
+
+    def test_waits_for_writer(self):
+        self.shared_dict.set("a", 1)
+        self._set_sequence("a", os.getpid(), 1)
+
+        # The writer is preempted for a while
+        timer = threading.Timer(0.05, self._set_sequence, ("a", 0, 1))
+        timer.start()
+
+        start = time.time()
+        self.assertEqual(self.shared_dict.get("a"), 1)
+        self.assertGreater(time.time() - start, 0.04)
+        timer.join()
+
+    def test_writer_died(self):
+        process = multiprocessing.Process(target=lambda: None)
+        process.start()
+        process.join()
+
+        self.shared_dict.set("a", 1)
+        self._set_sequence("a", process.pid, 1)
+
+        start = time.time()
+        self.assertIsNone(self.shared_dict.get("a"))
+        self.assertLess(time.time() - start, 0.5)
+
+    def test_key_version(self):
+        self.assertEqual(self.shared_dict.get_key_version("a"), 0)
+        self.shared_dict.set("a", 1)
+        version = self.shared_dict.get_key_version("a")
+        self.assertGreater(version, 0)
+        self.shared_dict.set("b", 1)
+        self.assertEqual(self.shared_dict.get_key_version("a"), version)
+        self.shared_dict.set("a", 1)
+        self.assertGreater(self.shared_dict.get_key_version("a"), version)
+
+    def test_subscribe(self):
+        async def test():
+            calls = []
+            self.shared_dict.subscribe("a", lambda: calls.append("a"))
+            self.shared_dict.subscribe("b", lambda: calls.append("b"))
+
+            self.shared_dict.set("a", 1)
+            await asyncio.sleep(0.01)
+            self.assertEqual(calls, ["a"])
+
+            def write():
+                self.shared_dict.set("b", 1)
+                self.shared_dict.set("b", 2)
+
+            # changes from other processes are pushed as well
+            process = multiprocessing.Process(target=write)
+            process.start()
+            process.join()
+            await asyncio.sleep(0.01)
+            self.assertEqual(calls, ["a", "b"])
+
+        asyncio.run(test())
+
+    def test_wait_for(self):
+        def write():
+            time.sleep(0.05)
+            self.shared_dict.set("a", 1)
+            time.sleep(0.05)
+            self.shared_dict.set("a", 2)
+
+        async def test():
+            self.assertFalse(await self.shared_dict.wait_for("a", 2, timeout=0.01))
+
+            process = multiprocessing.Process(target=write)
+            process.start()
+            start = time.time()
+            self.assertTrue(await self.shared_dict.wait_for("a", 2, timeout=1))
+            self.assertGreater(time.time() - start, 0.09)
+            process.join()
+
+            # doesn't wait if it already has the value
+            self.assertTrue(await self.shared_dict.wait_for("a", 2, timeout=0))
+
+        asyncio.run(test())
+
 
 @test_setup
 class TestSocket(unittest.TestCase):
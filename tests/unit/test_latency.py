@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+import time
+import unittest
+from unittest.mock import patch
+
+from evdev.ecodes import KEY_A
+
+from inputremapper.injection.latency import (
+    LatencyHistogram,
+    LatencyOrigin,
+    LatencyStats,
+    FORWARDED,
+    get_handler_kind,
+)
+from inputremapper.injection.mapping_handlers.null_handler import NullHandler
+from inputremapper.input_event import InputEvent
+from tests.lib.test_setup import test_setup
+
+
+@test_setup
+class TestLatency(unittest.TestCase):
+    def test_histogram(self):
+        histogram = LatencyHistogram()
+        for latency in [0.0000001, 0.00005, 0.00005, 0.00005, 0.002, 5]:
+            histogram.add(latency)
+
+        result = histogram.to_dict()
+        self.assertEqual(result["count"], 6)
+        # 50µs is between 32µs and 64µs
+        self.assertEqual(result["p50_us"], 64)
+        # everything above about a second ends up in the last bucket
+        self.assertEqual(result["p99_us"], 2**21)
+        self.assertEqual(result["max_us"], 5000000)
+        self.assertEqual(result["buckets"][0], 1)
+        self.assertEqual(result["buckets"][6], 3)
+        self.assertEqual(result["buckets"][-1], 1)
+
+    def test_negative_latency(self):
+        # The clock might have been adjusted
+        histogram = LatencyHistogram()
+        histogram.add(-1)
+        self.assertEqual(histogram.to_dict()["buckets"][0], 1)
+
+    def test_stats(self):
+        stats = LatencyStats()
+        now = 1000.5
+
+        with patch.object(time, "time", lambda: now):
+            stats.record("abcd", FORWARDED, InputEvent(1000, 400000, 1, KEY_A, 1))
+            stats.record("abcd", "KeyHandler", InputEvent(1000, 490000, 1, KEY_A, 1))
+            # without a timestamp, the event didn't come from the kernel
+            stats.record("abcd", FORWARDED, InputEvent(0, 0, 1, KEY_A, 1))
+
+        result = stats.to_dict()
+        self.assertEqual(list(result.keys()), ["abcd"])
+        self.assertEqual(result["abcd"][FORWARDED]["count"], 1)
+        self.assertEqual(result["abcd"][FORWARDED]["max_us"], 100000)
+        self.assertEqual(result["abcd"]["KeyHandler"]["count"], 1)
+        self.assertEqual(result["abcd"]["KeyHandler"]["max_us"], 10000)
+
+    def test_origin_is_recorded_once(self):
+        stats = LatencyStats()
+        origin = LatencyOrigin(
+            stats,
+            "abcd",
+            "MacroHandler",
+            InputEvent(1000, 400000, 1, KEY_A, 1),
+        )
+
+        # For example a macro that writes multiple keys
+        origin.record()
+        origin.record()
+
+        self.assertEqual(stats.to_dict()["abcd"]["MacroHandler"]["count"], 1)
+
+    def test_get_handler_kind(self):
+        handler = NullHandler.__new__(NullHandler)
+        self.assertEqual(get_handler_kind(handler.notify), "NullHandler")
+
+
+if __name__ == "__main__":
+    unittest.main()
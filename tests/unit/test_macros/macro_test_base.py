@@ -35,10 +35,6 @@ from tests.lib.patches import InputDevice
 
 
 class MacroTestBase(unittest.IsolatedAsyncioTestCase):
-    @classmethod
-    def setUpClass(cls):
-        macro_variables.start()
-
     def setUp(self):
         self.result = []
         self.global_uinputs = GlobalUInputs(UInput)
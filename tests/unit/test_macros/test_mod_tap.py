@@ -341,7 +341,7 @@ class TestModTapIntegration(unittest.IsolatedAsyncioTestCase):
                 InputEvent(0, 0, EV_KEY, KEY_B, 0),
             ]
             for event in events:
-                yield event
+                yield [event]
                 # Wait a bit. During runtime, events don't come in that quickly
                 # and the mod_tap macro needs some loop iterations until it adds
                 # the listener to the context.
@@ -358,6 +358,45 @@ class TestModTapIntegration(unittest.IsolatedAsyncioTestCase):
         self.assertNotIn(InputEvent(0, 0, EV_KEY, KEY_B, 1), uinput_write_history)
         self.assertNotIn(InputEvent(0, 0, EV_KEY, KEY_B, 0), uinput_write_history)
 
+    async def test_replace_preset_while_holding_keys_back(self):
+        await self.input(EV_KEY, KEY_A, 1)
+        await asyncio.sleep(0.050)
+        await self.input(EV_KEY, KEY_B, 1)
+        await asyncio.sleep(0.020)
+        # mod_tap didn't decide yet, and holds b back
+        self.assertEqual(uinput_write_history, [])
+
+        # Like Injector._replace_preset
+        old_context = self.context
+        self.context = Context(
+            Preset(),
+            source_devices={self.origin_hash: self.source_device},
+            forward_devices={self.origin_hash: self.forward_uinput},
+            mapping_parser=self.mapping_parser,
+        )
+        old_context.reset()
+        self.event_reader.context = self.context
+        await asyncio.sleep(0.020)
+
+        # The old macro is gone, and b continues with the new preset
+        self.assertEqual(old_context.listeners, set())
+        self.assertEqual(
+            self.forward_uinput.write_history,
+            [InputEvent.from_tuple((EV_KEY, KEY_B, 1))],
+        )
+
+        # Nothing is held back anymore
+        await self.input(EV_KEY, KEY_B, 0)
+        await asyncio.sleep(0.020)
+        self.assertEqual(self.target_uinput.write_history, [])
+        self.assertEqual(
+            self.forward_uinput.write_history,
+            [
+                InputEvent.from_tuple((EV_KEY, KEY_B, 1)),
+                InputEvent.from_tuple((EV_KEY, KEY_B, 0)),
+            ],
+        )
+
 
 @test_setup
 class TestModTapUnit(MacroTestBase):
@@ -30,6 +30,14 @@ from inputremapper.configs.validation_errors import (
 from inputremapper.injection.macros.argument import Argument, ArgumentConfig
 from inputremapper.injection.macros.parse import Parser
 from inputremapper.injection.macros.raw_value import RawValue
+from inputremapper.injection.macros.syntax_tree import (
+    Call,
+    Chain,
+    SyntaxTreeParser,
+    Token,
+    Value,
+    tokenize,
+)
 from inputremapper.injection.macros.tasks.hold_keys import HoldKeysTask
 from inputremapper.injection.macros.tasks.if_tap import IfTapTask
 from inputremapper.injection.macros.tasks.key import KeyTask
@@ -105,24 +113,140 @@ class TestParsing(MacroTestBase):
             "bd",
         )
 
-    async def test_count_brackets(self):
-        self.assertEqual(Parser._count_brackets(""), 0)
-        self.assertEqual(Parser._count_brackets("()"), 2)
-        self.assertEqual(Parser._count_brackets("a()"), 3)
-        self.assertEqual(Parser._count_brackets("a(b)"), 4)
-        self.assertEqual(Parser._count_brackets("a(b())"), 6)
-        self.assertEqual(Parser._count_brackets("a(b(c))"), 7)
-        self.assertEqual(Parser._count_brackets("a(b(c))d"), 7)
-        self.assertEqual(Parser._count_brackets("a(b(c))d()"), 7)
-
-    def test_split_keyword_arg(self):
-        self.assertTupleEqual(Parser._split_keyword_arg("_A=b"), ("_A", "b"))
-        self.assertTupleEqual(Parser._split_keyword_arg("a_=1"), ("a_", "1"))
-        self.assertTupleEqual(
-            Parser._split_keyword_arg("a=repeat(2, KEY_A)"),
-            ("a", "repeat(2, KEY_A)"),
+    def test_tokenize(self):
+        self.assertListEqual(
+            tokenize('key( KEY_A ).set(a, "# x") # key(b)\n'),
+            [
+                Token("text", "key", 0),
+                Token("punctuation", "(", 3),
+                Token("text", "KEY_A", 5),
+                Token("punctuation", ")", 11),
+                Token("punctuation", ".", 12),
+                Token("text", "set", 13),
+                Token("punctuation", "(", 16),
+                Token("text", "a", 17),
+                Token("punctuation", ",", 18),
+                Token("string", '"# x"', 20),
+                Token("punctuation", ")", 25),
+            ],
+        )
+
+    def test_syntax_tree(self):
+        self.assertEqual(
+            SyntaxTreeParser("repeat(1, times=k(a).w(10))").parse(),
+            Chain(
+                "repeat(1,times=k(a).w(10))",
+                0,
+                (
+                    Call(
+                        "repeat",
+                        0,
+                        (Value("1", 7),),
+                        (
+                            (
+                                "times",
+                                Chain(
+                                    "k(a).w(10)",
+                                    16,
+                                    (
+                                        Call("k", 16, (Value("a", 18),), ()),
+                                        Call("w", 21, (Value("10", 23),), ()),
+                                    ),
+                                ),
+                            ),
+                        ),
+                    ),
+                ),
+            ),
         )
-        self.assertTupleEqual(Parser._split_keyword_arg('a="=,#+."'), ("a", '"=,#+."'))
+
+        self.assertEqual(SyntaxTreeParser('"foo(a)"').parse(), Value('"foo(a)"', 0))
+        self.assertEqual(SyntaxTreeParser("").parse(), Value("", 0))
+
+    async def test_split_arguments(self):
+        # splits the arguments, doesn't try to understand their meaning yet
+        def expect(raw, expectation):
+            call = SyntaxTreeParser(f"f({raw})").parse().calls[0]
+            self.assertListEqual(
+                [arg.text if isinstance(arg, Value) else arg.code for arg in call.args],
+                expectation,
+            )
+
+        expect("a", ["a"])
+        expect("a,b", ["a", "b"])
+        expect("a,b,c", ["a", "b", "c"])
+        expect("1.5, -1", ["1.5", "-1"])
+
+        expect("key(a)", ["key(a)"])
+        expect("key(a).key(b), key(a)", ["key(a).key(b)", "key(a)"])
+        expect("key(a), key(a).key(b)", ["key(a)", "key(a).key(b)"])
+
+        expect(
+            'a("foo(1,2,3)", ",,,,,,    "), , ""',
+            ['a("foo(1,2,3)",",,,,,,    ")', "", '""'],
+        )
+
+        expect(
+            ",1,   ,b,x(,a(),).y().z(),,",
+            ["", "1", "", "b", "x(,a(),).y().z()", "", ""],
+        )
+
+        expect("repeat(1, key(a))", ["repeat(1,key(a))"])
+        expect(
+            "repeat(1, key(a)), repeat(1, key(b))",
+            ["repeat(1,key(a))", "repeat(1,key(b))"],
+        )
+
+        # will be parsed as None
+        expect("", [""])
+        expect(",", ["", ""])
+        expect(",,", ["", "", ""])
+
+    def test_keyword_arguments(self):
+        def expect(raw, expectation):
+            call = SyntaxTreeParser(f"f({raw})").parse().calls[0]
+            self.assertDictEqual(
+                {
+                    key: arg.text if isinstance(arg, Value) else arg.code
+                    for key, arg in call.kwargs
+                },
+                expectation,
+            )
+
+        expect("_A=b", {"_A": "b"})
+        expect("a_=1", {"a_": "1"})
+        expect("a=repeat(2, KEY_A)", {"a": "repeat(2,KEY_A)"})
+        expect('a="=,#+."', {"a": '"=,#+."'})
+
+    def test_error_position(self):
+        def expect(code, position):
+            with self.assertRaises(MacroError) as context:
+                Parser.parse(code, self.context)
+
+            self.assertEqual(context.exception.position, position)
+
+        expect("key(KEY_A).\n  foo(KEY_B)", 14)
+        expect("key(KEY_A)key(KEY_B)", 10)
+        expect("repeat(1, key(KEY_A)) x", 22)
+        expect("key(KEY_A, (1))", 11)
+        expect("repeat(times=1, key(KEY_A))", 16)
+        expect("wait(1, 2, 3)", 0)
+
+    def test_parse_cache(self):
+        code = "repeat(2, key(KEY_A)).wait(10)"
+        Parser.parse(code, self.context, DummyMapping)
+        hits = Parser.parse_syntax_tree.cache_info().hits
+        macro_1 = Parser.parse(code, self.context, DummyMapping)
+        macro_2 = Parser.parse(code, self.context, DummyMapping)
+        self.assertEqual(Parser.parse_syntax_tree.cache_info().hits, hits + 2)
+
+        # Each macro still gets its own tasks
+        self.assertIsNot(macro_1, macro_2)
+        self.assertIsNot(macro_1.tasks[0], macro_2.tasks[0])
+
+        # Errors are raised every time
+        for _ in range(2):
+            self.assertRaises(MacroError, Parser.parse, "foo(", self.context)
 
     def test_is_this_a_macro(self):
         self.assertTrue(Parser.is_this_a_macro("key(1)"))
@@ -167,44 +291,6 @@ class TestParsing(MacroTestBase):
         macro = Parser.parse("key(a) # a + b")
         self.assertEqual(macro.code, "key(a)")
 
-    async def test_extract_params(self):
-        # splits strings, doesn't try to understand their meaning yet
-        def expect(raw, expectation):
-            self.assertListEqual(Parser._extract_args(raw), expectation)
-
-        expect("a", ["a"])
-        expect("a,b", ["a", "b"])
-        expect("a,b,c", ["a", "b", "c"])
-
-        expect("key(a)", ["key(a)"])
-        expect("key(a).key(b), key(a)", ["key(a).key(b)", "key(a)"])
-        expect("key(a), key(a).key(b)", ["key(a)", "key(a).key(b)"])
-
-        expect(
-            'a("foo(1,2,3)", ",,,,,,    "), , ""',
-            ['a("foo(1,2,3)", ",,,,,,    ")', "", '""'],
-        )
-
-        expect(
-            ",1,   ,b,x(,a(),).y().z(),,",
-            ["", "1", "", "b", "x(,a(),).y().z()", "", ""],
-        )
-
-        expect("repeat(1, key(a))", ["repeat(1, key(a))"])
-        expect(
-            "repeat(1, key(a)), repeat(1, key(b))",
-            ["repeat(1, key(a))", "repeat(1, key(b))"],
-        )
-        expect(
-            "repeat(1, key(a)), repeat(1, key(b)), repeat(1, key(c))",
-            ["repeat(1, key(a))", "repeat(1, key(b))", "repeat(1, key(c))"],
-        )
-
-        # will be parsed as None
-        expect("", [""])
-        expect(",", ["", ""])
-        expect(",,", ["", "", ""])
-
     async def test_parse_params(self):
         def test(value, types):
             argument = Argument(
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import asyncio
+import unittest
+
+from evdev.ecodes import EV_KEY, KEY_A, KEY_B
+
+from inputremapper.injection.macros.macro import macro_variables
+from inputremapper.injection.macros.parse import Parser
+from inputremapper.injection.macros.program import Op, compile_macro
+from inputremapper.input_event import InputEvent
+from tests.lib.test_setup import test_setup
+from tests.unit.test_macros.macro_test_base import DummyMapping, MacroTestBase
+
+
+class FastMapping(DummyMapping):
+    macro_key_sleep_ms = 0
+
+
+@test_setup
+class TestProgram(MacroTestBase):
+    async def run_both(self, code: str) -> None:
+        """Assert that the compiled macro injects the same events."""
+        macro = Parser.parse(code, self.context, FastMapping)
+        await macro.run(self.handler)
+        expected = self.result
+        self.result = []
+
+        macro = Parser.parse(code, self.context, FastMapping)
+        compile_macro(macro)
+        await macro.run(self.handler)
+        self.assertListEqual(self.result, expected)
+        self.assertFalse(macro.running)
+        self.result = []
+
+    async def test_same_events(self):
+        await self.run_both("key(KEY_A).key_down(KEY_B).key_up(KEY_B)")
+        await self.run_both("repeat(3, key(KEY_A).event(EV_REL, REL_X, 5))")
+        await self.run_both("repeat(2, repeat(3, key(KEY_A)).key(KEY_B))")
+        await self.run_both("repeat(0, key(KEY_A)).key(KEY_B)")
+        await self.run_both("key(KEY_A).wait(10).wait(5, 20).key(KEY_B)")
+        await self.run_both("set(foo, 2).repeat($foo, key(KEY_A))")
+        await self.run_both("set(foo, 1).if_eq($foo, 1, repeat(2, key(KEY_A)))")
+        await self.run_both('set(foo, "KEY_B").key_down($foo).key_up($foo)')
+
+    async def test_flat(self):
+        macro = Parser.parse(
+            "repeat(3, key(KEY_A).key(KEY_B))",
+            self.context,
+            FastMapping,
+        )
+        program = compile_macro(macro)
+        self.assertIs(macro.program, program)
+        ops = [instruction[0] for instruction in program.instructions]
+        self.assertListEqual(
+            ops,
+            [Op.LOOP] + [Op.EMIT, Op.SLEEP, Op.EMIT, Op.SLEEP] * 2 + [Op.END_LOOP],
+        )
+        self.assertEqual(program.instructions[1][1], (EV_KEY, KEY_A, 1))
+
+    async def test_fallback(self):
+        macro = Parser.parse(
+            "wait(10, 20).if_eq($foo, 1, repeat(2, key(KEY_A)))",
+            self.context,
+            FastMapping,
+        )
+        program = compile_macro(macro)
+        ops = [instruction[0] for instruction in program.instructions]
+        self.assertListEqual(ops, [Op.CALL, Op.CALL])
+
+        # The child macros of tasks that are called are compiled as well
+        child_macro = macro.tasks[1].child_macros[0]
+        self.assertIsNotNone(child_macro.program)
+
+        macro_variables.set("foo", 1)
+        await macro.run(self.handler)
+        expected = [(EV_KEY, KEY_A, 1), (EV_KEY, KEY_A, 0)] * 2
+        self.assertListEqual(self.result, expected)
+
+    async def test_hold(self):
+        macro = Parser.parse(
+            "key(KEY_A).hold(key(KEY_B)).key(KEY_A)",
+            self.context,
+            FastMapping,
+        )
+        compile_macro(macro)
+
+        await self.trigger_sequence(macro, InputEvent.key(KEY_A, 1))
+        await asyncio.sleep(0.1)
+        self.assertTrue(macro.running)
+        await self.release_sequence(macro, InputEvent.key(KEY_A, 0))
+        await asyncio.sleep(0.05)
+        self.assertFalse(macro.running)
+
+        self.assertEqual(self.result[0], (EV_KEY, KEY_A, 1))
+        self.assertEqual(self.result[-2:], [(EV_KEY, KEY_A, 1), (EV_KEY, KEY_A, 0)])
+        holding = self.result[2:-2]
+        self.assertGreater(len(holding), 10)
+        self.assertListEqual(
+            holding,
+            [(EV_KEY, KEY_B, 1), (EV_KEY, KEY_B, 0)] * (len(holding) // 2),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import asyncio
+import multiprocessing
+import time
+import unittest
+
+from evdev.ecodes import EV_KEY, KEY_A
+
+from inputremapper.configs.validation_errors import MacroError
+from inputremapper.injection.macros.macro import macro_variables
+from inputremapper.injection.macros.parse import Parser
+from tests.lib.test_setup import test_setup
+from tests.unit.test_macros.macro_test_base import DummyMapping, MacroTestBase
+
+
+@test_setup
+class TestWaitFor(MacroTestBase):
+    async def test_already_set(self):
+        macro = Parser.parse(
+            "set(foo, 1).wait_for(foo, 1).key(KEY_A)",
+            self.context,
+            DummyMapping,
+        )
+        await asyncio.wait_for(macro.run(self.handler), 1)
+        self.assertListEqual(self.result, [(EV_KEY, KEY_A, 1), (EV_KEY, KEY_A, 0)])
+
+    async def test_wait_for_other_macro(self):
+        waiting = Parser.parse(
+            'wait_for(foo, "b").key(KEY_A)',
+            self.context,
+            DummyMapping,
+        )
+        setting = Parser.parse(
+            'set(foo, "a").wait(50).set(foo, "b")',
+            self.context,
+            DummyMapping,
+        )
+
+        task = asyncio.ensure_future(waiting.run(self.handler))
+        await asyncio.sleep(0.02)
+        self.assertTrue(waiting.running)
+
+        await setting.run(self.handler)
+        await asyncio.sleep(0.02)
+        self.assertTrue(waiting.running)
+
+        await asyncio.wait_for(task, 1)
+        self.assertListEqual(self.result, [(EV_KEY, KEY_A, 1), (EV_KEY, KEY_A, 0)])
+
+    async def test_wait_for_other_process(self):
+        def set_foo():
+            time.sleep(0.1)
+            macro_variables.set("foo", 2)
+
+        macro = Parser.parse("wait_for(foo, 2).key(KEY_A)", self.context, DummyMapping)
+        task = asyncio.ensure_future(macro.run(self.handler))
+        await asyncio.sleep(0.02)
+
+        process = multiprocessing.Process(target=set_foo)
+        process.start()
+
+        await asyncio.wait_for(task, 1)
+        self.assertListEqual(self.result, [(EV_KEY, KEY_A, 1), (EV_KEY, KEY_A, 0)])
+        process.join()
+
+    async def test_timeout(self):
+        macro = Parser.parse(
+            "wait_for(foo, 1, 100).key(KEY_A)",
+            self.context,
+            DummyMapping,
+        )
+        start = time.time()
+        await macro.run(self.handler)
+        # Includes the pauses of key(), and whatever else the machine is busy with
+        duration = time.time() - start
+        self.assertGreaterEqual(duration, 0.1)
+        self.assertLess(duration, 0.5)
+        self.assertListEqual(self.result, [(EV_KEY, KEY_A, 1), (EV_KEY, KEY_A, 0)])
+
+    async def test_raises_error(self):
+        self.assertRaises(MacroError, Parser.parse, "wait_for(foo)", self.context)
+        self.assertRaises(MacroError, Parser.parse, "wait_for(1, 1)", self.context)
+        self.assertRaises(
+            MacroError,
+            Parser.parse,
+            "wait_for(foo, 1, a)",
+            self.context,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
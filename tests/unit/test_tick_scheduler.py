@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# input-remapper - GUI for device specific keyboard mappings
+# Copyright (C) 2025 sezanzeb <b8x45ygc9@mozmail.com>
+#
+# This file is part of input-remapper.
+#
+# input-remapper is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# input-remapper is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with input-remapper.  If not, see <https://www.gnu.org/licenses/>.
+
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from evdev.ecodes import EV_REL, REL_X, REL_Y, REL_WHEEL
+
+from inputremapper.injection.global_uinputs import GlobalUInputs, UInput
+from inputremapper.injection.latency import latency_origin
+from inputremapper.injection.tick_scheduler import TickScheduler
+from tests.lib.cleanup import cleanup
+from tests.lib.test_setup import test_setup
+
+
+@test_setup
+class TestTickScheduler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        cleanup()
+        self.global_uinputs = GlobalUInputs(UInput)
+        self.global_uinputs.prepare_all()
+        self.tick_scheduler = TickScheduler(self.global_uinputs)
+
+    def create_emitter(self, ticks, event):
+        """Write the event in each tick, and stop after the given number of ticks."""
+        remaining = ticks
+
+        def emit() -> bool:
+            nonlocal remaining
+            if remaining == 0:
+                return False
+
+            remaining -= 1
+            self.global_uinputs.write(event, "mouse")
+            return True
+
+        return emit
+
+    async def test_emitters_share_frames(self):
+        mouse = self.global_uinputs.get_uinput("mouse")
+        rate = 100
+
+        with patch.object(mouse, "syn") as syn:
+            await asyncio.gather(
+                self.tick_scheduler.run(
+                    rate,
+                    self.create_emitter(5, (EV_REL, REL_X, 1)),
+                ),
+                self.tick_scheduler.run(
+                    rate,
+                    self.create_emitter(5, (EV_REL, REL_Y, 1)),
+                ),
+                self.tick_scheduler.run(
+                    rate,
+                    self.create_emitter(5, (EV_REL, REL_WHEEL, 1)),
+                ),
+            )
+
+            self.assertEqual(mouse.write_count, 15)
+            # The first call of each emitter happens right away, in their own frame.
+            # The other 4 calls of each of them were synced together.
+            self.assertEqual(syn.call_count, 3 + 4)
+
+        # The clock stops once nothing is registered anymore
+        self.assertEqual(self.tick_scheduler.get_num_emitters(), 0)
+        self.assertEqual(self.tick_scheduler._clocks, {})
+
+    async def test_rate(self):
+        rate = 100
+        counter = 0
+
+        def emit() -> bool:
+            nonlocal counter
+            counter += 1
+            return True
+
+        task = asyncio.create_task(self.tick_scheduler.run(rate, emit))
+        await asyncio.sleep(0.2)
+        self.assertAlmostEqual(counter, 0.2 * rate, delta=3)
+
+        # Cancelling the task that awaits it stops the emitter
+        task.cancel()
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.tick_scheduler.get_num_emitters(), 0)
+        counter_after_cancel = counter
+        await asyncio.sleep(0.05)
+        self.assertEqual(counter, counter_after_cancel)
+
+    async def test_exception(self):
+        calls = 0
+
+        def emit() -> bool:
+            nonlocal calls
+            calls += 1
+            if calls == 3:
+                raise ValueError("foo")
+
+            return True
+
+        with self.assertRaises(ValueError):
+            await self.tick_scheduler.run(100, emit)
+
+        self.assertEqual(self.tick_scheduler.get_num_emitters(), 0)
+
+    async def test_latency_origins(self):
+        origins = {REL_X: [], REL_Y: []}
+
+        def start(code, origin):
+            def emit() -> bool:
+                origins[code].append(latency_origin.get())
+                return len(origins[code]) < 3
+
+            # Like a handler that starts a task while the EventReader notifies it
+            token = latency_origin.set(origin)
+            task = asyncio.create_task(self.tick_scheduler.run(100, emit))
+            latency_origin.reset(token)
+            return task
+
+        first = object()
+        second = object()
+        await asyncio.gather(start(REL_X, first), start(REL_Y, second))
+
+        # The clock was started by the first emitter, but each emitter keeps its own
+        self.assertEqual(origins[REL_X], [first] * 3)
+        self.assertEqual(origins[REL_Y], [second] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()